@@ -0,0 +1,83 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from cancellation import JobCancelled, current_token, set_current_token
+
+# --- Bounded Worker Pool for Batch Tools ---
+# The heavy lifting happens inside ffmpeg child processes, so plain threads are enough here.
+
+def cpu_count():
+    return os.cpu_count() or 2
+
+def default_job_count(threads_per_job=4, max_jobs=8):
+    """
+    Parallel jobs that fit the machine when every job runs an encoder
+    using `threads_per_job` threads (1 for audio / image work).
+    """
+    return max(1, min(max_jobs, cpu_count() // max(1, threads_per_job)))
+
+def threads_per_job(jobs):
+    """Encoder threads to give each job so the pool does not oversubscribe the CPU."""
+    return max(1, cpu_count() // max(1, jobs))
+
+def run_parallel(items, func, max_workers, on_progress=None):
+    """
+    Runs func(item) for every item with at most `max_workers` running at once.
+    Returns [(ok, result_or_error_string), ...] in the same order as `items`.
+    on_progress(done, running, total) is called from worker threads on every state change.
+    Pool threads share the caller's CancelToken: once it is cancelled, running items are
+    killed and the rest are skipped, all as (False, "Cancelled"). Finished items keep their results.
+    """
+    token = current_token()
+    items = list(items)
+    total = len(items)
+    results = [None] * total
+    state = {"done": 0, "running": 0}
+    lock = threading.Lock()
+
+    def report():
+        if on_progress: on_progress(state["done"], state["running"], total)
+
+    def run_one(idx):
+        set_current_token(token)
+        if token is not None and token.cancelled:
+            results[idx] = (False, "Cancelled")
+            return
+        with lock:
+            state["running"] += 1
+            report()
+        try:
+            results[idx] = (True, func(items[idx]))
+        except JobCancelled:
+            results[idx] = (False, "Cancelled")
+        except Exception as e:
+            results[idx] = (False, str(e))
+        finally:
+            with lock:
+                state["running"] -= 1
+                state["done"] += 1
+                report()
+
+    if total:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total))) as pool:
+            for idx in range(total):
+                pool.submit(run_one, idx)
+    return results
+
+def unique_output_paths(names, folder):
+    """
+    Maps a list of desired file names to paths in `folder`, suffixing duplicates
+    (_2, _3, ...) in input order so parallel jobs never write the same file.
+    """
+    used = set()
+    paths = []
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        candidate = name
+        n = 2
+        while candidate.lower() in used:
+            candidate = f"{stem}_{n}{ext}"
+            n += 1
+        used.add(candidate.lower())
+        paths.append(os.path.join(folder, candidate))
+    return paths
@@ -0,0 +1,235 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+
+# --- Backend Benchmarks (no GUI imports) ---
+# Times the media backends on synthetic ffmpeg lavfi media (testsrc2 video + sine
+# audio), so results are reproducible on any machine with ffmpeg:
+#
+#   python bench_backends.py --sizes 640x360,1920x1080 --durations 5,20 -o bench.json
+#   python bench_backends.py --baseline bench.json      # exit 1 on a regression
+#
+# Every case runs in a fresh child process so peak RSS belongs to that case alone
+# (the Python process and the largest ffmpeg child are reported separately).
+
+CASES = ["convert", "resize", "gif", "crop", "combine", "preview"]
+DEFAULT_SIZES = "640x360,1280x720,1920x1080"
+DEFAULT_DURATIONS = "5,20"
+FPS = 30
+RESULT_VERSION = 1
+
+def media_dir():
+    return os.path.join(tempfile.gettempdir(), "media_studio_bench")
+
+def make_test_media(folder, width, height, duration, fps=FPS):
+    """
+    Writes (once) a deterministic H.264/AAC clip: testsrc2 pattern + 440 Hz sine.
+    The bitexact flags keep the file identical between runs of the same ffmpeg build.
+    """
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"testsrc2_{width}x{height}_{duration:g}s_{fps}fps.mp4")
+    if os.path.exists(path) and os.path.getsize(path) > 0: return path
+    tmp_path = path + ".part.mp4"
+    cmd = ["ffmpeg", "-y", "-v", "error",
+           "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={duration}",
+           "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={duration}",
+           "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-g", str(fps),
+           "-c:a", "aac", "-b:a", "128k", "-shortest",
+           "-map_metadata", "-1", "-fflags", "+bitexact", "-flags:v", "+bitexact", "-flags:a", "+bitexact",
+           tmp_path]
+    subprocess.run(cmd, check=True)
+    os.replace(tmp_path, path)
+    return path
+
+# --- Cases ---
+# Each returns the seconds of source media it processed; frames = seconds * FPS.
+
+def _case_convert(src, out_dir, duration):
+    import media_backends as mb
+    ok, msg = mb.universal_convert_backend(src, os.path.join(out_dir, "convert.mkv"), quality="Medium",
+                                           speed="Medium", stream_copy=False)
+    if not ok: raise RuntimeError(msg)
+    return duration
+
+def _case_resize(src, out_dir, duration):
+    import media_backends as mb
+    mb.resize_clip_backend(src, 640, 360, os.path.join(out_dir, "resize.mp4"), mode="fit")
+    return duration
+
+def _case_gif(src, out_dir, duration):
+    import media_backends as mb
+    mb.convert_to_gif_backend(src, os.path.join(out_dir, "clip.gif"), fps=10, scale=0.5, raise_on_error=True)
+    return duration
+
+def _case_crop(src, out_dir, duration):
+    import media_backends as mb
+    start, end = duration * 0.25, duration * 0.75
+    if not mb.crop_video_backend(src, start, end, os.path.join(out_dir, "crop.mp4")): raise RuntimeError("Crop failed")
+    return end - start
+
+def _case_combine(src, out_dir, duration):
+    import media_backends as mb
+    mb.combine_video_clips_backend([src, src], os.path.join(out_dir, "combine.mp4"))
+    return duration * 2
+
+def _case_preview(src, out_dir, duration):
+    import media_backends as mb
+    images, _ = mb.get_preview_pil_images(src, duration=3.0, fps=8, height=250)
+    if not images: raise RuntimeError("No preview frames")
+    return min(3.0, duration)
+
+CASE_FUNCS = {"convert": _case_convert, "resize": _case_resize, "gif": _case_gif,
+              "crop": _case_crop, "combine": _case_combine, "preview": _case_preview}
+
+def _peak_rss_mb():
+    """(this process, largest waited-for child) in MB; None where `resource` is missing (Windows)."""
+    try: import resource
+    except ImportError: return None, None
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024  # ru_maxrss: bytes on macOS, KiB elsewhere
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(own / divisor, 1), round(child / divisor, 1)
+
+def run_case_in_process(case, src, duration):
+    """Child-process side of --run-case: one timed run, JSON on stdout."""
+    import result_cache
+    # The lavfi clips are bit-exact, so a shared result cache would turn every repeat into a file copy
+    result_cache.configure({"enabled": False})
+    out_dir = tempfile.mkdtemp(prefix=f"bench_{case}_")
+    try:
+        started = time.perf_counter()
+        media_seconds = CASE_FUNCS[case](src, out_dir, duration)
+        seconds = time.perf_counter() - started
+        rss, child_rss = _peak_rss_mb()
+        return {"seconds": seconds, "media_seconds": media_seconds, "peak_rss_mb": rss, "peak_child_rss_mb": child_rss}
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+def run_case(case, src, duration, repeat=1):
+    """Runs one case `repeat` times (fresh interpreter each) and keeps the median time."""
+    runs = []
+    for _ in range(repeat):
+        cmd = [sys.executable, os.path.abspath(__file__), "--run-case", case, src, str(duration)]
+        proc = subprocess.run(cmd, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            detail = (proc.stderr or proc.stdout).strip().splitlines()
+            return {"error": detail[-1] if detail else f"exit code {proc.returncode}"}
+        runs.append(json.loads(lines[-1]))
+
+    seconds = statistics.median(r["seconds"] for r in runs)
+    media_seconds = runs[0]["media_seconds"]
+    peaks = [r["peak_rss_mb"] for r in runs if r["peak_rss_mb"] is not None]
+    child_peaks = [r["peak_child_rss_mb"] for r in runs if r["peak_child_rss_mb"] is not None]
+    return {"seconds": round(seconds, 3),
+            "fps": round(media_seconds * FPS / seconds, 1) if seconds else None,
+            "realtime": round(media_seconds / seconds, 2) if seconds else None,
+            "peak_rss_mb": max(peaks) if peaks else None,
+            "peak_child_rss_mb": max(child_peaks) if child_peaks else None,
+            "runs": [round(r["seconds"], 3) for r in runs]}
+
+def _ffmpeg_version():
+    try:
+        out = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True).stdout
+        return out.splitlines()[0] if out else None
+    except OSError:
+        return None
+
+def result_key(r):
+    return f"{r['case']}@{r['size']}/{r['duration']:g}s"
+
+def compare_to_baseline(results, baseline, tolerance=0.10):
+    """
+    Returns (lines, regressions). A case regresses when it is more than `tolerance`
+    slower than the baseline or fails where the baseline succeeded.
+    """
+    base = {result_key(r): r for r in baseline.get("results", [])}
+    lines, regressions = [], []
+    for r in results:
+        key = result_key(r)
+        old = base.get(key)
+        if not old or "seconds" not in old:
+            lines.append(f"  {key:<28} new"); continue
+        if "seconds" not in r:
+            regressions.append(key)
+            lines.append(f"  {key:<28} FAILED ({r.get('error')})"); continue
+        ratio = r["seconds"] / old["seconds"] if old["seconds"] else 1.0
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  << REGRESSION"
+            regressions.append(key)
+        elif ratio < 1 - tolerance:
+            flag = "  (faster)"
+        lines.append(f"  {key:<28} {old['seconds']:8.3f}s -> {r['seconds']:8.3f}s  ({(ratio - 1) * 100:+.1f}%){flag}")
+    return lines, regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the media backends on synthetic lavfi media.")
+    parser.add_argument("--cases", default=",".join(CASES), help=f"Comma list of: {', '.join(CASES)}")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma list of WxH")
+    parser.add_argument("--durations", default=DEFAULT_DURATIONS, help="Comma list of clip lengths in seconds")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (median is reported)")
+    parser.add_argument("-o", "--output", default="", help="Write results JSON here")
+    parser.add_argument("--baseline", default="", help="Compare against a previous results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown vs. baseline (0.10 = 10%%)")
+    parser.add_argument("--media-dir", default="", help="Where the generated test clips are cached")
+    parser.add_argument("--run-case", nargs=3, metavar=("CASE", "SRC", "DURATION"), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.run_case:
+        case, src, duration = args.run_case
+        # Backends print progress chatter; keep stdout for the result line
+        real_stdout, sys.stdout = sys.stdout, sys.stderr
+        result = run_case_in_process(case, src, float(duration))
+        real_stdout.write(json.dumps(result) + "\n")
+        return 0
+
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+    unknown = [c for c in cases if c not in CASE_FUNCS]
+    if unknown:
+        print(f"Unknown case(s): {', '.join(unknown)}", file=sys.stderr); return 2
+    sizes = [tuple(int(v) for v in s.lower().split("x")) for s in args.sizes.split(",") if s.strip()]
+    durations = [float(d) for d in args.durations.split(",") if d.strip()]
+    folder = args.media_dir or media_dir()
+
+    results = []
+    for width, height in sizes:
+        for duration in durations:
+            src = make_test_media(folder, width, height, duration)
+            for case in cases:
+                r = dict(case=case, size=f"{width}x{height}", duration=duration)
+                r.update(run_case(case, src, duration, max(1, args.repeat)))
+                results.append(r)
+                if "error" in r: print(f"{result_key(r):<30} ERROR {r['error']}")
+                else: print(f"{result_key(r):<30} {r['seconds']:8.3f}s  {r['fps']:8.1f} fps  {r['realtime']:6.2f}x  "
+                            f"rss {r['peak_rss_mb']} MB / ffmpeg {r['peak_child_rss_mb']} MB")
+
+    report = {"version": RESULT_VERSION, "meta": {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+        "platform": platform.platform(), "cpu_count": os.cpu_count(), "ffmpeg": _ffmpeg_version(), "fps": FPS,
+    }, "results": results}
+    if args.output:
+        with open(args.output, 'w') as f: json.dump(report, f, indent=2)
+        print(f"Saved {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f: baseline = json.load(f)
+        lines, regressions = compare_to_baseline(results, baseline, args.tolerance)
+        print(f"\nCompared to {args.baseline} ({baseline.get('meta', {}).get('created', '?')}):")
+        print("\n".join(lines))
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
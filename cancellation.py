@@ -0,0 +1,90 @@
+import os
+import signal
+import threading
+import subprocess
+
+# --- Job Cancellation (no GUI imports) ---
+# A CancelToken belongs to one job. Every child process the job starts through
+# run_process / run_ffmpeg (process_supervisor.py) is attached to it, so cancel()
+# can kill the whole tree (ffmpeg, realesrgan, rife and anything they spawn)
+# instead of waiting it out.
+
+class JobCancelled(BaseException):
+    """
+    Raised inside a cancelled job. Derives from BaseException (like KeyboardInterrupt)
+    so the backends' `except Exception` fallbacks do not retry work the user stopped.
+    """
+    def __init__(self, message="Cancelled"):
+        super().__init__(message)
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._processes = set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        """Flags the job and kills its running processes. Safe to call from the UI thread."""
+        self._event.set()
+        with self._lock: processes = list(self._processes)
+        for process in processes: _kill_async(process)
+
+    def raise_if_cancelled(self):
+        if self.cancelled: raise JobCancelled()
+
+    def attach(self, process):
+        with self._lock: self._processes.add(process)
+        # cancel() may have run between the caller's check and Popen
+        if self.cancelled: _kill_async(process)
+
+    def detach(self, process):
+        with self._lock: self._processes.discard(process)
+
+
+_local = threading.local()
+
+def current_token():
+    """The CancelToken of the job running on this thread (None outside scheduled work)."""
+    return getattr(_local, "token", None)
+
+def set_current_token(token):
+    _local.token = token
+
+def check_cancelled():
+    token = current_token()
+    if token is not None: token.raise_if_cancelled()
+
+# --- Process Trees ---
+
+def process_group_kwargs():
+    """Popen kwargs that start the child as the leader of its own process group."""
+    if os.name == 'nt': return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+def _kill_async(process):
+    # Supervised processes bring their own non-blocking kill_tree(); plain Popen objects get a thread
+    if hasattr(process, "kill_tree"): process.kill_tree()
+    else: threading.Thread(target=kill_process_tree, args=(process,), daemon=True).start()
+
+def kill_process_tree(process, grace=3.0):
+    """
+    Stops `process` and its children. POSIX: SIGTERM to the process group (ffmpeg
+    finalizes what it can), SIGKILL after `grace` seconds. Windows: taskkill /T /F.
+    Only works for processes started with process_group_kwargs().
+    """
+    if process.poll() is not None: return
+    try:
+        if os.name == 'nt':
+            subprocess.run(["taskkill", "/T", "/F", "/PID", str(process.pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return
+        os.killpg(process.pid, signal.SIGTERM)
+        try: process.wait(timeout=grace)
+        except subprocess.TimeoutExpired: os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError, OSError) as e:
+        print(f"Kill failed for pid {process.pid}: {e}")
@@ -0,0 +1,210 @@
+import os
+import json
+import math
+import time
+import shutil
+import bisect
+import tempfile
+import threading
+from ffmpeg_utils import run_ffmpeg, FFmpegProgress
+from process_supervisor import run_process, PROBE_TIMEOUT
+from batch_pool import run_parallel, default_job_count, threads_per_job
+from cancellation import check_cancelled
+from tracing import span
+
+# --- Chunked Parallel Encoding (no GUI imports) ---
+# One long video is split at keyframes into segments that are encoded at the same
+# time, then joined with the concat demuxer (-c copy, no re-encode). Audio is
+# encoded once as its own stream and muxed at the end, so chunk boundaries cannot
+# leave audio gaps. Chunk boundaries are exact: every chunk starts on a source
+# keyframe and encodes a counted number of frames (-frames:v), so no frame is
+# dropped or doubled. The source's offset between its first video and audio
+# timestamps is restored when the audio is muxed back in. The joined file is then
+# checked for timestamp continuity and A/V start alignment.
+
+MIN_DURATION = 120.0        # shorter files gain little over one encoder with threads
+MIN_CHUNK_SECONDS = 20.0
+CHUNKS_PER_WORKER = 2       # a few spare chunks keep every worker busy when keyframes are uneven
+CHUNKABLE_EXTS = (".mp4", ".mkv", ".mov")
+AV_TOLERANCE = 0.05         # seconds of A/V start drift the check accepts (about lip-sync threshold)
+
+
+class ChunkedEncodeError(RuntimeError):
+    pass
+
+
+def probe_video_packets(path):
+    """(sorted pts of every video packet, sorted keyframe pts) in seconds. Demuxes only, no decode."""
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries", "packet=pts_time,flags",
+           "-of", "csv=p=0", path]
+    result = run_process(cmd, capture_output=True, idle_timeout=PROBE_TIMEOUT)
+    if result.returncode != 0: raise ChunkedEncodeError(f"ffprobe could not read packets of {os.path.basename(path)}")
+    pts, keys = [], []
+    for line in (result.stdout or "").splitlines():
+        parts = line.strip().split(",")
+        if len(parts) < 2: continue
+        try: t = float(parts[0])
+        except ValueError: continue  # N/A
+        pts.append(t)
+        if "K" in parts[1]: keys.append(t)
+    pts.sort(); keys.sort()
+    return pts, keys
+
+def _format_start_time(path):
+    """Container start time; -ss positions are relative to it."""
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "format=start_time", "-of", "csv=p=0", path]
+    try: return float(run_process(cmd, capture_output=True, timeout=PROBE_TIMEOUT).stdout.strip() or 0)
+    except (ValueError, AttributeError): return 0.0
+
+def probe_stream_starts(path):
+    """{"video": start_time, "audio": start_time} of the first stream of each type (missing types left out)."""
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "stream=codec_type,start_time", "-of", "json", path]
+    try: streams = json.loads(run_process(cmd, capture_output=True, timeout=PROBE_TIMEOUT).stdout or "{}").get("streams", [])
+    except ValueError: return {}
+    starts = {}
+    for stream in streams:
+        kind = stream.get("codec_type")
+        if kind in ("video", "audio") and kind not in starts:
+            try: starts[kind] = float(stream.get("start_time"))
+            except (TypeError, ValueError): pass
+    return starts
+
+def av_offset(starts):
+    """Audio start minus video start, or None without both streams."""
+    if "video" not in starts or "audio" not in starts: return None
+    return starts["audio"] - starts["video"]
+
+def frame_duration(pts):
+    """Median distance between frames (robust against the odd VFR hiccup)."""
+    deltas = sorted(b - a for a, b in zip(pts, pts[1:]) if b > a)
+    return deltas[len(deltas) // 2] if deltas else 1 / 30.0
+
+def plan_chunks(pts, keys, count, min_seconds=MIN_CHUNK_SECONDS):
+    """
+    [(start_pts, frames), ...]: cuts at the keyframes nearest to count evenly spaced
+    targets, skipping cuts that would leave a chunk shorter than min_seconds.
+    """
+    if not pts: return []
+    first, last = pts[0], pts[-1]
+    cuts = [first]
+    for i in range(1, count):
+        target = first + (last - first) * i / count
+        idx = bisect.bisect_left(keys, target)
+        candidates = [keys[j] for j in (idx - 1, idx) if 0 <= j < len(keys)]
+        if not candidates: continue
+        cut = min(candidates, key=lambda t: abs(t - target))
+        if cut - cuts[-1] >= min_seconds and last - cut >= min_seconds: cuts.append(cut)
+    chunks = []
+    for i, start in enumerate(cuts):
+        end = cuts[i + 1] if i + 1 < len(cuts) else math.inf
+        chunks.append((start, bisect.bisect_left(pts, end) - bisect.bisect_left(pts, start)))
+    return chunks
+
+def verify_continuity(path, expected_frames, source_pts, source_av_offset=None):
+    """
+    Raises ChunkedEncodeError if the joined video lost or doubled frames, has a gap
+    between frames that the source did not have (a bad chunk boundary), or (with
+    source_av_offset) its audio starts out of step with the video compared to the source.
+    """
+    pts, _ = probe_video_packets(path)
+    if len(pts) != expected_frames:
+        raise ChunkedEncodeError(f"joined video has {len(pts)} frames, expected {expected_frames}")
+    step = frame_duration(source_pts)
+    source_gap = max((b - a for a, b in zip(source_pts, source_pts[1:])), default=step)
+    allowed = max(1.5 * step, source_gap * 1.01) + 0.002  # ms-rounded timestamps jitter slightly
+    for a, b in zip(pts, pts[1:]):
+        if b <= a: raise ChunkedEncodeError(f"duplicate timestamp at {b:.3f}s")
+        if b - a > allowed: raise ChunkedEncodeError(f"gap of {b - a:.3f}s at {a:.3f}s")
+    if source_av_offset is not None:
+        offset = av_offset(probe_stream_starts(path))
+        if offset is None: raise ChunkedEncodeError("joined file lost its audio stream")
+        if abs(offset - source_av_offset) > AV_TOLERANCE:
+            raise ChunkedEncodeError(f"audio starts {offset - source_av_offset:+.3f}s off compared to the source")
+
+def _concat_line(path):
+    return "file '" + path.replace("'", "'\\''") + "'\n"
+
+def chunked_encode(input_path, output_path, video_args, audio_args, has_audio=True, jobs=0, threads=0, progress=None):
+    """
+    Encodes input_path with video_args (e.g. libx264 preset / crf) in parallel chunks and
+    audio_args for the single audio stream. jobs: concurrent chunk encoders (0 = auto),
+    threads: encoder threads per chunk (0 = cores / jobs). Returns the number of chunks.
+    Raises ChunkedEncodeError when the file cannot be split or the result fails the check.
+    """
+    jobs = jobs or default_job_count(threads_per_job=4)
+    threads = threads or threads_per_job(jobs)
+    with span("chunked.probe"):
+        pts, keys = probe_video_packets(input_path)
+    step = frame_duration(pts)
+    chunks = plan_chunks(pts, keys, jobs * CHUNKS_PER_WORKER)
+    if len(chunks) < 2: raise ChunkedEncodeError("not enough keyframes to split this file")
+    file_start = _format_start_time(input_path)
+    source_offset = av_offset(probe_stream_starts(input_path)) if has_audio else None
+    total_frames = sum(frames for _, frames in chunks)
+
+    work_dir = tempfile.mkdtemp(prefix=".chunks_", dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        done = [0.0] * len(chunks)
+        lock = threading.Lock()
+        started = time.monotonic()
+        def chunk_progress(n, frames):
+            if not progress: return None
+            def callback(info):
+                if info.fraction is None: return
+                with lock:
+                    done[n] = info.fraction * frames
+                    encoded = sum(done)
+                # Speed / ETA of the whole job (all chunks together), in media seconds per second
+                speed = encoded * step / max(0.001, time.monotonic() - started)
+                eta = (total_frames - encoded) * step / speed if speed else None
+                progress(FFmpegProgress(encoded / total_frames, encoded * step, speed, eta))
+            return callback
+
+        def encode(task):
+            kind, n = task
+            if kind == "audio":
+                with span("chunked.audio"):
+                    run_ffmpeg(["ffmpeg", "-y", "-i", input_path, "-map", "0:a:0", "-vn", *audio_args,
+                                os.path.join(work_dir, "audio.m4a")])
+                return
+            start, frames = chunks[n]
+            # Seek half a frame early: the keyframe at `start` is the first frame kept
+            seek = ["-ss", f"{max(0.0, start - file_start - step / 2):.6f}"] if n else []
+            with span("chunked.chunk", chunk=n, frames=frames):
+                run_ffmpeg(["ffmpeg", "-y", *seek, "-i", input_path, "-map", "0:v:0", "-frames:v", str(frames),
+                            "-an", "-sn", *video_args, "-threads", str(threads), os.path.join(work_dir, f"chunk_{n:04}.mp4")],
+                           progress=chunk_progress(n, frames), duration=frames * step)
+
+        tasks = ([("audio", 0)] if has_audio else []) + [("chunk", n) for n in range(len(chunks))]
+        results = run_parallel(tasks, encode, jobs + (1 if has_audio else 0))
+        check_cancelled()
+        failed = [msg for ok, msg in results if not ok]
+        if failed: raise ChunkedEncodeError(f"{len(failed)} chunk(s) failed: {failed[0]}")
+
+        list_path = os.path.join(work_dir, "chunks.txt")
+        with open(list_path, 'w', encoding="utf-8") as f:
+            for n in range(len(chunks)): f.write(_concat_line(os.path.join(work_dir, f"chunk_{n:04}.mp4")))
+        audio_path = os.path.join(work_dir, "audio.m4a")
+        # Chunks and audio.m4a each start near 0; shift one of them so the source's A/V offset comes back
+        shift = 0.0
+        if source_offset is not None:
+            pieces = av_offset({"video": probe_stream_starts(os.path.join(work_dir, "chunk_0000.mp4")).get("video", 0.0),
+                                "audio": probe_stream_starts(audio_path).get("audio", 0.0)})
+            shift = source_offset - pieces
+        cmd = ["ffmpeg", "-y"]
+        if shift < 0: cmd.extend(["-itsoffset", f"{-shift:.6f}"])
+        cmd.extend(["-f", "concat", "-safe", "0", "-i", list_path])
+        if has_audio:
+            if shift > 0: cmd.extend(["-itsoffset", f"{shift:.6f}"])
+            cmd.extend(["-i", audio_path, "-map", "0:v:0", "-map", "1:a:0"])
+        else: cmd.extend(["-map", "0:v:0"])
+        cmd.extend(["-c", "copy"])
+        if os.path.splitext(output_path)[1].lower() in (".mp4", ".mov"): cmd.extend(["-movflags", "+faststart"])
+        cmd.append(output_path)
+        with span("chunked.concat", chunks=len(chunks)):
+            run_ffmpeg(cmd)
+        with span("chunked.verify"):
+            verify_continuity(output_path, total_frames, pts, source_offset)
+        return len(chunks)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
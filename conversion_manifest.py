@@ -0,0 +1,97 @@
+import os
+import json
+import hashlib
+import threading
+
+# --- Batch Conversion Manifest ("skip if up-to-date") ---
+# One JSON file per output folder. Entries are keyed by output file name and remember
+# the source signature + conversion parameters that produced the output.
+
+MANIFEST_NAME = ".media_studio_manifest.json"
+MANIFEST_VERSION = 1  # bump when the encoder settings behind a preset change
+
+def file_stat_signature(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def file_sha256(path, chunk_size=4 * 1024 * 1024):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ConversionManifest:
+    """
+    use_hash=False: a source is unchanged if size + mtime match.
+    use_hash=True: a source whose size/mtime changed is re-hashed, so touched or
+    copied files with identical content still count as up to date.
+    """
+    def __init__(self, folder, use_hash=False):
+        self.folder = folder
+        self.path = os.path.join(folder, MANIFEST_NAME)
+        self.use_hash = use_hash
+        self.lock = threading.Lock()
+        self.entries = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data.get("entries", {})
+        except Exception:
+            self.entries = {}
+
+    def save(self):
+        with self.lock:
+            data = {"version": MANIFEST_VERSION, "entries": self.entries}
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, 'w') as f: json.dump(data, f, indent=2)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Manifest save failed: {e}")
+
+    def _key(self, output_path):
+        return os.path.basename(output_path)
+
+    def is_up_to_date(self, src, output_path, params):
+        with self.lock:
+            entry = self.entries.get(self._key(output_path))
+        if not entry or entry.get("params") != params: return False
+        if entry.get("source") != os.path.abspath(src): return False
+        try:
+            if file_stat_signature(output_path) != entry.get("output"): return False
+            src_sig = file_stat_signature(src)
+        except OSError:
+            return False
+
+        recorded = entry.get("source_sig", {})
+        if src_sig == {k: recorded.get(k) for k in src_sig}: return True
+        if not self.use_hash or not recorded.get("sha256"): return False
+
+        # Stat changed: fall back to content comparison and refresh the stat on a match
+        try: same = file_sha256(src) == recorded["sha256"]
+        except OSError: return False
+        if same:
+            with self.lock:
+                entry["source_sig"] = dict(src_sig, sha256=recorded["sha256"])
+        return same
+
+    def record(self, src, output_path, params):
+        try:
+            src_sig = file_stat_signature(src)
+            if self.use_hash: src_sig["sha256"] = file_sha256(src)
+            entry = {"source": os.path.abspath(src), "source_sig": src_sig,
+                     "params": params, "output": file_stat_signature(output_path)}
+        except OSError:
+            return
+        with self.lock:
+            self.entries[self._key(output_path)] = entry
+
+    def forget(self, output_path):
+        with self.lock:
+            self.entries.pop(self._key(output_path), None)
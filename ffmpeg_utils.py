@@ -0,0 +1,180 @@
+import json
+from collections import namedtuple
+from process_supervisor import get_supervisor, run_process, ProcessFailed, PROBE_TIMEOUT
+
+# --- FFmpeg / FFprobe Helpers (no GUI imports) ---
+
+def probe_media(path, ffprobe_cmd="ffprobe"):
+    """
+    Reads container + stream info with ffprobe.
+    Returns a dict with duration, fps, width, height, nb_frames and the raw stream list.
+    Missing values are left at 0 so callers can fall back to their own defaults.
+    """
+    info = {"duration": 0.0, "fps": 0.0, "width": 0, "height": 0, "nb_frames": 0, "streams": []}
+    cmd = [ffprobe_cmd, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", path]
+    try:
+        result = run_process(cmd, capture_output=True, timeout=PROBE_TIMEOUT)
+        if result.returncode != 0: return info
+        data = json.loads(result.stdout or "{}")
+    except Exception:
+        return info
+
+    info["streams"] = data.get("streams", [])
+    try: info["duration"] = float(data.get("format", {}).get("duration", 0) or 0)
+    except ValueError: pass
+
+    for stream in info["streams"]:
+        if stream.get("codec_type") != "video": continue
+        if stream.get("disposition", {}).get("attached_pic"): continue
+        info["width"] = int(stream.get("width", 0) or 0)
+        info["height"] = int(stream.get("height", 0) or 0)
+        info["fps"] = _parse_rate(stream.get("avg_frame_rate")) or _parse_rate(stream.get("r_frame_rate"))
+        try: info["nb_frames"] = int(stream.get("nb_frames", 0) or 0)
+        except ValueError: pass
+        if not info["duration"]:
+            try: info["duration"] = float(stream.get("duration", 0) or 0)
+            except ValueError: pass
+        break
+
+    if not info["nb_frames"] and info["duration"] and info["fps"]:
+        info["nb_frames"] = int(info["duration"] * info["fps"]) + 1
+    return info
+
+def _parse_rate(rate):
+    # "30000/1001" -> 29.97
+    try:
+        if not rate: return 0.0
+        if "/" in rate:
+            num, den = rate.split("/")
+            return float(num) / float(den) if float(den) else 0.0
+        return float(rate)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+# --- Stream Copy (Remux) Compatibility ---
+# (video codecs, audio codecs) each container takes without re-encoding. None = anything goes.
+_MP4_CODECS = ({"h264", "hevc", "mpeg4", "av1"}, {"aac", "mp3", "ac3", "eac3", "alac"})
+STREAM_COPY_CODECS = {
+    ".mp4": _MP4_CODECS,
+    ".m4v": _MP4_CODECS,
+    ".mov": ({"h264", "hevc", "mpeg4", "prores", "mjpeg"}, {"aac", "mp3", "ac3", "alac", "pcm_s16le", "pcm_s24le"}),
+    ".mkv": (None, None),
+    ".webm": ({"vp8", "vp9", "av1"}, {"opus", "vorbis"}),
+    ".avi": ({"mpeg4", "msmpeg4v3", "mjpeg"}, {"mp3", "ac3", "pcm_s16le"}),
+    ".m4a": (set(), {"aac", "alac"}),
+    ".mp3": (set(), {"mp3"}),
+    ".wav": (set(), {"pcm_s16le", "pcm_s24le", "pcm_s32le", "pcm_f32le", "pcm_u8"}),
+}
+AUDIO_ONLY_EXTS = (".mp3", ".wav", ".m4a")
+
+# The re-encode path always produces 8-bit 4:2:0, so only copy streams that already are
+_COPY_PIX_FMTS = {"yuv420p", "yuvj420p"}
+
+def stream_copy_args(info, output_ext):
+    """
+    Returns the ffmpeg args that remux `info` (from probe_media) into `output_ext`
+    with -c copy, or None when a stream would have to be re-encoded.
+    """
+    output_ext = output_ext.lower()
+    if output_ext not in STREAM_COPY_CODECS: return None
+    video_ok, audio_ok = STREAM_COPY_CODECS[output_ext]
+    streams = info.get("streams", [])
+    video = [s for s in streams if s.get("codec_type") == "video" and not s.get("disposition", {}).get("attached_pic")]
+    audio = [s for s in streams if s.get("codec_type") == "audio"]
+
+    if output_ext in AUDIO_ONLY_EXTS:
+        # Audio extraction: exactly one audio stream gets copied, like "-map a" with one track
+        if len(audio) != 1 or audio[0].get("codec_name") not in audio_ok: return None
+        return ["-vn", "-map", "0:a:0", "-c:a", "copy"]
+
+    if not video and not audio: return None
+    if video:
+        v = video[0]
+        if video_ok is not None and v.get("codec_name") not in video_ok: return None
+        if v.get("codec_name") in ("h264", "hevc") and v.get("pix_fmt") not in _COPY_PIX_FMTS: return None
+    if audio_ok is not None and any(a.get("codec_name") not in audio_ok for a in audio): return None
+
+    args = ["-map", "0:v:0?", "-map", "0:a?", "-sn", "-c", "copy"]
+    if output_ext in (".mp4", ".m4v", ".mov"):
+        args.extend(["-movflags", "+faststart"])
+        if video and video[0].get("codec_name") == "hevc": args.extend(["-tag:v", "hvc1"])
+    return args
+
+# --- Progress-Reporting FFmpeg Runner ---
+
+# fraction: 0.0-1.0 (None if the duration is unknown), out_time: seconds encoded,
+# speed: x realtime (None until ffmpeg reports it), eta: seconds left (None if unknown)
+FFmpegProgress = namedtuple("FFmpegProgress", ["fraction", "out_time", "speed", "eta"])
+
+class ProgressParser:
+    """Incremental parser for the key=value blocks ffmpeg writes with -progress."""
+    def __init__(self, duration=0.0):
+        self.duration = duration or 0.0
+        self.out_time = 0.0
+        self.speed = None
+
+    def feed(self, line):
+        """Feeds one line; returns an FFmpegProgress at the end of each block, else None."""
+        key, sep, value = line.strip().partition("=")
+        if not sep: return None
+        value = value.strip()
+        if key in ("out_time_us", "out_time_ms"):
+            # Both keys are in microseconds (out_time_ms is a historical misnomer)
+            try: self.out_time = max(0.0, int(value) / 1_000_000)
+            except ValueError: pass
+        elif key == "speed":
+            try: self.speed = float(value.rstrip("x")) or None
+            except ValueError: pass
+        elif key == "progress":
+            return self.snapshot(finished=(value == "end"))
+        return None
+
+    def snapshot(self, finished=False):
+        fraction, eta = None, None
+        if finished:
+            fraction, eta = 1.0, 0.0
+        elif self.duration > 0:
+            fraction = min(1.0, self.out_time / self.duration)
+            if self.speed: eta = max(0.0, (self.duration - self.out_time) / self.speed)
+        return FFmpegProgress(fraction, self.out_time, self.speed, eta)
+
+def media_duration(path):
+    return probe_media(path)["duration"]
+
+def run_ffmpeg(cmd, progress=None, duration=None, startupinfo=None, on_stderr=None, timeout=None, idle_timeout=None):
+    """
+    Runs an ffmpeg command with -progress on stdout and calls progress(FFmpegProgress)
+    as blocks arrive. `duration` is the expected output length in seconds; when omitted
+    the first -i input is probed. on_stderr(line) sees every log line (e.g. showinfo output).
+    Both callbacks run on the calling thread (the supervisor queues the lines for it).
+    Behaves like subprocess.run(check=True): raises ProcessFailed, a CalledProcessError
+    (stderr = last lines of the log), on a non-zero exit or timeout. Returns the stderr tail.
+    Raises JobCancelled if the current job is cancelled; the process tree is killed.
+    `startupinfo` overrides the hidden-window default on Windows.
+    """
+    cmd = list(cmd)
+    if progress is not None and duration is None:
+        duration = media_duration(cmd[cmd.index("-i") + 1]) if "-i" in cmd else 0.0
+    full_cmd = [cmd[0], "-hide_banner", "-nostats", "-progress", "pipe:1"] + cmd[1:]
+
+    parser = ProgressParser(duration)
+    def on_stdout(line):
+        info = parser.feed(line)
+        if info is not None and progress is not None: progress(info)
+
+    extra = {"startupinfo": startupinfo} if startupinfo is not None else {}
+    result = get_supervisor().run(full_cmd, on_stdout=on_stdout, on_stderr=on_stderr, timeout=timeout,
+                                  idle_timeout=idle_timeout, **extra)
+    if result.returncode != 0:
+        raise ProcessFailed(result.returncode, full_cmd, stderr=result.stderr, elapsed=result.elapsed)
+    return result.stderr
+
+def format_progress(info, label="Processing"):
+    """'Converting 42% · 3.1x · ETA 00:35' style status text."""
+    parts = [label]
+    if info.fraction is not None: parts[0] += f" {int(info.fraction * 100)}%"
+    if info.speed: parts.append(f"{info.speed:.1f}x")
+    if info.eta is not None:
+        mins, secs = divmod(int(info.eta), 60)
+        parts.append(f"ETA {mins:02}:{secs:02}")
+    return " · ".join(parts)
@@ -0,0 +1,191 @@
+import os
+import errno
+import shutil
+import tempfile
+
+# --- Intermediate Frame Store (used by the AI upscale / RIFE stages) ---
+
+# ext: file extension + name understood by realesrgan/rife "-f"
+# bpp: rough bytes-per-pixel on disk, used for the free-space estimate
+# level: (default, min, max) of the compression / quality knob
+FRAME_FORMATS = {
+    "png": {"label": "PNG (Fast)", "ext": "png", "bpp": 2.0, "level": (1, 0, 9)},
+    "jpeg": {"label": "JPEG", "ext": "jpg", "bpp": 0.4, "level": (2, 1, 31)},
+    "webp": {"label": "WebP (Lossless)", "ext": "webp", "bpp": 1.5, "level": (0, 0, 6)},
+}
+
+DEFAULT_FRAME_STORE_SETTINGS = {
+    "format": "auto",       # "auto" keeps each stage's own default (AI -> jpeg, RIFE -> png)
+    "level": None,          # None = format default
+    "scratch_dir": "",      # "" = current working directory (old behaviour)
+    "use_ram_disk": False,
+    "ram_disk_dir": "",     # "" = auto-detect (/dev/shm on Linux)
+    "ram_limit_mb": 2048,
+}
+
+SPACE_MARGIN = 1.10  # keep 10% headroom on top of the estimate
+RAM_FULL_BYTES = 64 * 1024 * 1024  # a RAM disk with less free than this after a failure counts as full
+
+
+class InsufficientSpaceError(OSError):
+    pass
+
+
+def is_out_of_space(error):
+    """True for ENOSPC raised here or reported by a child process (ffmpeg / AI tools)."""
+    if isinstance(error, OSError) and error.errno == errno.ENOSPC: return True
+    text = f"{error} {getattr(error, 'stderr', '') or ''}".lower()
+    return "no space left on device" in text
+
+def default_ram_disk_dir():
+    """Returns a tmpfs mount if one is available, otherwise ''."""
+    for candidate in ("/dev/shm", "/run/shm"):
+        if os.path.isdir(candidate) and os.access(candidate, os.W_OK):
+            return candidate
+    return ""
+
+
+class FrameStore:
+    """
+    Scratch directory for extracted frames.
+    Picks the location (RAM disk or disk), checks free space up front and
+    provides the ffmpeg / AI-tool arguments for the chosen frame format.
+    """
+    def __init__(self, prefix="TEMP_FRAMES", fmt="jpeg", level=None, scratch_dir="",
+                 use_ram_disk=False, ram_disk_dir="", ram_limit_mb=2048):
+        if fmt not in FRAME_FORMATS: fmt = "jpeg"
+        default_level, lo, hi = FRAME_FORMATS[fmt]["level"]
+        try: level = default_level if level is None else max(lo, min(hi, int(level)))
+        except (TypeError, ValueError): level = default_level
+
+        self.prefix = prefix
+        self.fmt = fmt
+        self.level = level
+        self.scratch_dir = scratch_dir or os.getcwd()
+        self.use_ram_disk = use_ram_disk
+        self.ram_disk_dir = ram_disk_dir or (default_ram_disk_dir() if use_ram_disk else "")
+        self.ram_limit_bytes = int(float(ram_limit_mb or 0) * 1024 * 1024)
+        self.root = None
+        self.on_ram_disk = False
+
+    @classmethod
+    def from_settings(cls, settings, prefix="TEMP_FRAMES", default_format="jpeg"):
+        s = dict(DEFAULT_FRAME_STORE_SETTINGS)
+        if settings: s.update(settings)
+        fmt = s.get("format") or "auto"
+        level = s.get("level")
+        if fmt == "auto":
+            # Auto keeps the stage's historical format, so the level setting does not apply
+            fmt, level = default_format, None
+        return cls(prefix=prefix, fmt=fmt, level=level, scratch_dir=s.get("scratch_dir", ""),
+                   use_ram_disk=s.get("use_ram_disk", False), ram_disk_dir=s.get("ram_disk_dir", ""),
+                   ram_limit_mb=s.get("ram_limit_mb", 2048))
+
+    @property
+    def ext(self):
+        return FRAME_FORMATS[self.fmt]["ext"]
+
+    def estimate_bytes(self, width, height, frames, scale=1.0):
+        """Rough on-disk size of `frames` frames at (width*scale x height*scale)."""
+        if not width or not height or not frames: return 0
+        pixels = (width * scale) * (height * scale)
+        bpp = FRAME_FORMATS[self.fmt]["bpp"]
+        if self.fmt == "jpeg":
+            # q:v 2 is near the top of the range; higher q:v values are much smaller
+            bpp = bpp * (2.0 / max(2, self.level)) ** 0.5
+        return int(pixels * bpp * frames)
+
+    def prepare(self, required_bytes=0):
+        """
+        Creates the scratch directory.
+        Uses the RAM disk when enabled and the estimate fits under both the size limit
+        and the free tmpfs space, otherwise spills to the disk scratch location.
+        Raises InsufficientSpaceError if the disk location cannot hold the estimate either.
+        The estimate can be low (noisy, high-entropy frames); run() handles a RAM disk
+        that fills up anyway.
+        """
+        needed = int(required_bytes * SPACE_MARGIN)
+        candidates = []
+        if self.use_ram_disk and self.ram_disk_dir:
+            fits_limit = (not self.ram_limit_bytes) or needed <= self.ram_limit_bytes
+            if fits_limit: candidates.append((self.ram_disk_dir, True))
+            else: print(f"Frame store: estimate {needed // (1024*1024)} MB exceeds RAM disk limit, spilling to disk.")
+        candidates.append((self.scratch_dir, False))
+
+        last_free = 0
+        for location, is_ram in candidates:
+            try:
+                os.makedirs(location, exist_ok=True)
+                last_free = shutil.disk_usage(location).free
+            except OSError as e:
+                print(f"Frame store: cannot use {location} ({e})")
+                continue
+            if needed and last_free < needed:
+                if is_ram: print("Frame store: RAM disk too full, spilling to disk.")
+                continue
+            self.root = tempfile.mkdtemp(prefix=f"{self.prefix}_", dir=location)
+            self.on_ram_disk = is_ram
+            return self.root
+
+        raise InsufficientSpaceError(
+            f"Not enough free space for intermediate frames in {self.scratch_dir}: "
+            f"need ~{needed // (1024*1024)} MB, {last_free // (1024*1024)} MB free.")
+
+    def _ram_disk_full(self, error):
+        if not self.on_ram_disk: return False
+        if is_out_of_space(error): return True
+        # realesrgan / rife often just report a failed frame write; look at the tmpfs itself
+        try: return shutil.disk_usage(self.root).free < RAM_FULL_BYTES
+        except OSError: return False
+
+    def spill_to_disk(self, required_bytes=0):
+        """Drops everything on the RAM disk and prepares a fresh scratch directory on disk."""
+        print("Frame store: RAM disk filled up, spilling to disk.")
+        self.cleanup()
+        self.use_ram_disk = False
+        return self.prepare(required_bytes)
+
+    def run(self, func, required_bytes=0):
+        """
+        Calls func(), which creates its frame folders through this store. If the RAM disk
+        fills up while it runs, the store moves to disk and func() starts over there.
+        """
+        try:
+            return func()
+        except Exception as e:
+            if not self._ram_disk_full(e): raise
+        self.spill_to_disk(required_bytes)
+        return func()
+
+    def subdir(self, name):
+        if self.root is None: self.prepare()
+        path = os.path.join(self.root, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def path(self, name):
+        if self.root is None: self.prepare()
+        return os.path.join(self.root, name)
+
+    def frame_pattern(self, name, stem="frame_"):
+        return os.path.join(self.subdir(name), f"{stem}%08d.{self.ext}")
+
+    def ffmpeg_args(self):
+        """Encoder args for writing frames in this store's format."""
+        if self.fmt == "png":
+            return ["-c:v", "png", "-compression_level", str(self.level)]
+        if self.fmt == "webp":
+            return ["-c:v", "libwebp", "-lossless", "1", "-compression_level", str(self.level)]
+        return ["-q:v", str(self.level)]
+
+    def cleanup(self):
+        if self.root:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self.root = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+        return False
@@ -0,0 +1,198 @@
+import time
+import heapq
+import itertools
+import threading
+from cancellation import CancelToken, JobCancelled, set_current_token
+from tracing import span
+
+# --- Job Scheduler (no GUI imports) ---
+# One queue for every long-running tool. Each job names the resources it needs
+# ({"cpu": 1}, {"gpu": 1, "disk": 1}, ...) and only starts once all of them have a
+# free slot, so an overnight batch across tools never oversubscribes the machine.
+# Higher priority runs first; equal priorities run in submission order.
+
+DEFAULT_LIMITS = {"cpu": 1, "gpu": 1, "disk": 1}
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+_local = threading.local()
+
+def current_job():
+    """The Job whose thread is calling (None outside scheduled work)."""
+    return getattr(_local, "job", None)
+
+
+class Job:
+    def __init__(self, job_id, name, func, args, resources, priority, on_start=None):
+        self.id = job_id
+        self.name = name
+        self.func = func
+        self.args = args
+        self.resources = dict(resources or {})
+        self.priority = priority
+        self.on_start = on_start
+        self.state = QUEUED
+        self.progress = 0.0
+        self.status = ""
+        self.error = None
+        self.result = None
+        self.token = CancelToken()
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def fail(self, message):
+        """Marks the job as failed without raising (for workers that report errors themselves)."""
+        self.error = message
+
+    def set_progress(self, fraction=None, status=None):
+        if fraction is not None: self.progress = max(0.0, min(1.0, fraction))
+        if status is not None: self.status = status
+        scheduler = getattr(self, "scheduler", None)
+        if scheduler: scheduler._notify(self)
+
+    @property
+    def elapsed(self):
+        if not self.started_at: return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def waited(self):
+        return (self.started_at or time.time()) - self.submitted_at
+
+    @property
+    def active(self):
+        return self.state in (QUEUED, RUNNING)
+
+
+class JobScheduler:
+    """
+    Priority queue with per-resource concurrency limits.
+    on_change(job) is called from worker threads whenever a job changes state or progress.
+    """
+    def __init__(self, limits=None, on_change=None):
+        self.limits = dict(DEFAULT_LIMITS)
+        if limits: self.limits.update(limits)
+        self.on_change = on_change
+        self.in_use = {}
+        self.jobs = []
+        self.paused = False
+        self._heap = []
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    def submit(self, name, func, args=(), resources=None, priority=0, on_start=None):
+        """Queues func(*args) and returns its Job. Unknown resources get a limit of 1."""
+        with self._lock:
+            job = Job(next(self._ids), name, func, args, resources or {"cpu": 1}, priority, on_start)
+            job.scheduler = self
+            self.jobs.append(job)
+            heapq.heappush(self._heap, (-priority, next(self._seq), job))
+        self._notify(job)
+        self._dispatch()
+        return job
+
+    def set_priority(self, job, priority):
+        with self._lock:
+            if job.state != QUEUED: return
+            job.priority = priority
+            self._heap = [(-j.priority, seq, j) for _, seq, j in self._heap]
+            heapq.heapify(self._heap)
+        self._notify(job)
+        self._dispatch()
+
+    def set_limits(self, limits):
+        with self._lock: self.limits.update(limits)
+        self._dispatch()
+
+    def set_paused(self, paused):
+        """A paused queue lets running jobs finish but starts nothing new."""
+        self.paused = paused
+        self._dispatch()
+
+    def cancel(self, job):
+        """
+        Drops a queued job, or stops a running one by killing its child processes
+        (the job turns CANCELLED once its worker returns). False if it already finished.
+        """
+        with self._lock:
+            if job.state == RUNNING:
+                job.token.cancel()
+                job.status = "Cancelling..."
+            elif job.state == QUEUED:
+                job.state = CANCELLED
+                job.finished_at = time.time()
+            else:
+                return False
+        self._notify(job)
+        return True
+
+    def cancel_running(self):
+        for job in self.snapshot():
+            if job.state == RUNNING: self.cancel(job)
+
+    def clear_finished(self):
+        with self._lock: self.jobs = [j for j in self.jobs if j.active]
+        self._notify(None)
+
+    def active_count(self):
+        with self._lock: return sum(1 for j in self.jobs if j.active)
+
+    def snapshot(self):
+        with self._lock: return list(self.jobs)
+
+    def _fits(self, job):
+        return all(self.in_use.get(r, 0) + n <= max(n, self.limits.get(r, 1)) for r, n in job.resources.items())
+
+    def _dispatch(self):
+        to_start = []
+        with self._lock:
+            if self.paused: return
+            waiting = []
+            while self._heap:
+                entry = heapq.heappop(self._heap)
+                job = entry[2]
+                if job.state != QUEUED: continue
+                if self._fits(job):
+                    for r, n in job.resources.items(): self.in_use[r] = self.in_use.get(r, 0) + n
+                    job.state = RUNNING
+                    job.started_at = time.time()
+                    to_start.append(job)
+                else:
+                    # Smaller jobs further down may still fit the free slots
+                    waiting.append(entry)
+            for entry in waiting: heapq.heappush(self._heap, entry)
+        for job in to_start:
+            threading.Thread(target=self._run, args=(job,), name=f"job-{job.id}", daemon=True).start()
+
+    def _run(self, job):
+        _local.job = job
+        set_current_token(job.token)
+        self._notify(job)
+        try:
+            if job.on_start: job.on_start()
+            with span(f"job: {job.name}", cat="job", id=job.id, waited=round(job.waited, 3)):
+                job.result = job.func(*job.args)
+            if job.token.cancelled: job.state = CANCELLED
+            else: job.state = FAILED if job.error else DONE
+            if job.state == DONE: job.progress = 1.0
+        except JobCancelled:
+            job.state = CANCELLED
+        except Exception as e:
+            job.state = FAILED
+            job.error = str(e)
+            print(f"Job '{job.name}' failed: {e}")
+        finally:
+            job.finished_at = time.time()
+            _local.job = None
+            set_current_token(None)
+            with self._lock:
+                for r, n in job.resources.items(): self.in_use[r] = self.in_use.get(r, 0) - n
+            self._notify(job)
+            self._dispatch()
+
+    def _notify(self, job):
+        if self.on_change:
+            try: self.on_change(job)
+            except Exception as e: print(f"Scheduler callback error: {e}")
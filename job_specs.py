@@ -0,0 +1,165 @@
+import os
+import sys
+import json
+from ffmpeg_utils import FFmpegProgress
+import media_backends as mb
+from pipeline import run_pipeline, validate_steps, enhance_video_ai_backend
+
+# --- Job Specs (no GUI imports) ---
+# A job spec is a plain dict, usually loaded from JSON:
+#   {"id": "clip1-web", "op": "convert", "input": "clip1.mov", "output": "out/clip1.mp4",
+#    "options": {"quality": "Medium"}}
+# "combine" takes "inputs": [...] instead of "input". Every operation returns the
+# written path(s) or raises, so callers only need one error path.
+
+OPERATIONS = {}
+
+def operation(name):
+    def register(func):
+        OPERATIONS[name] = func
+        return func
+    return register
+
+def _check(result):
+    """Turns the (success, msg) convention of some backends into an exception."""
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], bool):
+        if not result[0]: raise RuntimeError(result[1])
+    return result
+
+def _logger_progress(progress):
+    """Adapts backends that report a bare 0-1 fraction through `logger`."""
+    if progress is None: return None
+    return lambda pct: progress(FFmpegProgress(min(1.0, max(0.0, float(pct))), 0.0, None, None))
+
+@operation("combine")
+def _op_combine(spec, opts, progress, threads):
+    return mb.combine_video_clips_backend(spec["inputs"], spec["output"])
+
+@operation("convert")
+def _op_convert(spec, opts, progress, threads):
+    _check(mb.universal_convert_backend(spec["input"], spec["output"], quality=opts.get("quality", "High"),
+                                        speed=opts.get("speed", "Medium"), threads=threads,
+                                        stream_copy=opts.get("stream_copy", True), progress=progress,
+                                        **({"chunked": True, "chunk_jobs": opts.get("chunk_jobs", 0)} if opts.get("chunked") else {})))
+    return spec["output"]
+
+@operation("gif")
+def _op_gif(spec, opts, progress, threads):
+    keys = ("fps", "scale", "speed", "dither", "max_colors", "stats_mode", "two_pass")
+    mb.convert_to_gif_backend(spec["input"], spec["output"], progress=progress, raise_on_error=True,
+                              **{k: opts[k] for k in keys if k in opts})
+    return spec["output"]
+
+@operation("resize")
+def _op_resize(spec, opts, progress, threads):
+    renditions = opts.get("renditions") or [{"width": opts["width"], "height": opts["height"], "output": spec["output"]}]
+    # Copies: a retried or reused spec must not keep the defaults filled in by this run
+    renditions = [dict(r) for r in renditions]
+    for r in renditions:
+        r.setdefault("mode", opts.get("mode", "fit"))
+        r.setdefault("anchor", opts.get("anchor", "center"))
+    return mb.resize_renditions_backend(spec["input"], renditions, progress=progress, threads=threads)
+
+@operation("upscale")
+def _op_upscale(spec, opts, progress, threads):
+    return mb.upscale_media_backend(spec["input"], spec["output"], opts.get("scale_factor", 2), width=opts.get("width"),
+                                    height=opts.get("height"), algo=opts.get("algo", "lanczos"),
+                                    sharpen=opts.get("sharpen", True), progress=progress)
+
+@operation("upscale_ai")
+def _op_upscale_ai(spec, opts, progress, threads):
+    _check(mb.upscale_with_ai_backend(spec["input"], spec["output"], opts.get("scale_factor", 4),
+                                      logger=_logger_progress(progress), enhance_faces=opts.get("enhance_faces", False),
+                                      exe_dir=opts.get("exe_dir"), tile_size=opts.get("tile_size", 0),
+                                      frame_store=opts.get("frame_store")))
+    return spec["output"]
+
+@operation("interpolate")
+def _op_interpolate(spec, opts, progress, threads):
+    _check(mb.interpolate_video_backend(spec["input"], spec["output"], method=opts.get("method", "ffmpeg"),
+                                        target_fps=opts.get("target_fps", 60), multiplier=opts.get("multiplier", 2),
+                                        logger=_logger_progress(progress), exe_dir=opts.get("exe_dir"),
+                                        frame_store=opts.get("frame_store"), progress=progress))
+    return spec["output"]
+
+@operation("crop")
+def _op_crop(spec, opts, progress, threads):
+    return mb.crop_video_backend(spec["input"], float(opts["start"]), float(opts["end"]), spec["output"], progress=progress)
+
+@operation("extract_frames")
+def _op_extract_frames(spec, opts, progress, threads):
+    timestamps = opts.get("timestamps")
+    if isinstance(timestamps, str): timestamps = mb.parse_timestamp_list(timestamps)
+    frames = mb.extract_frames_batch_backend(spec["input"], spec["output"], timestamps=timestamps,
+                                             interval=opts.get("interval"), scene_threshold=opts.get("scene_threshold"),
+                                             name_prefix=opts.get("name_prefix", "frame"), ext=opts.get("ext", "jpg"),
+                                             progress=progress)
+    return [path for _, path in frames]
+
+@operation("thumbnail_sheet")
+def _op_thumbnail_sheet(spec, opts, progress, threads):
+    sheets, index_path = mb.thumbnail_sheet_backend(spec["input"], spec["output"], columns=opts.get("columns", 5),
+                                                    rows=opts.get("rows", 4), tile_width=opts.get("tile_width", 320),
+                                                    interval=opts.get("interval"), progress=progress)
+    return sheets + [index_path]
+
+@operation("pipeline")
+def _op_pipeline(spec, opts, progress, threads):
+    return run_pipeline(spec["input"], spec["output"], opts["steps"], progress=progress, exe_dir=opts.get("exe_dir"),
+                        frame_store=opts.get("frame_store"), threads=threads)
+
+@operation("enhance_ai")
+def _op_enhance_ai(spec, opts, progress, threads):
+    return enhance_video_ai_backend(spec["input"], spec["output"], scale_factor=opts.get("scale_factor", 2),
+                                    multiplier=opts.get("multiplier", 2), interpolate_first=opts.get("interpolate_first", False),
+                                    enhance_faces=opts.get("enhance_faces", False), tile_size=opts.get("tile_size", 0),
+                                    exe_dir=opts.get("exe_dir"), frame_store=opts.get("frame_store"), progress=progress)
+
+
+def validate_job_spec(spec):
+    """Raises ValueError describing the first problem with `spec`."""
+    if not isinstance(spec, dict): raise ValueError("Job spec must be an object")
+    op = spec.get("op")
+    if op not in OPERATIONS: raise ValueError(f"Unknown op '{op}' (expected one of: {', '.join(sorted(OPERATIONS))})")
+    if op == "combine":
+        if not spec.get("inputs"): raise ValueError("combine needs a non-empty 'inputs' list")
+    elif not spec.get("input"):
+        raise ValueError(f"{op} needs an 'input'")
+    if not spec.get("output"): raise ValueError(f"{op} needs an 'output'")
+    options = spec.get("options", {})
+    if not isinstance(options, dict): raise ValueError("'options' must be an object")
+    if op == "pipeline": validate_steps(options.get("steps"))
+    if op == "gif" and "scale" in options:
+        try: scale = float(options["scale"])
+        except (TypeError, ValueError): scale = 0.0
+        if not 0 < scale <= 1: raise ValueError("gif 'scale' is a fraction of the source width (0 < scale <= 1)")
+
+def run_job_spec(spec, progress=None, threads=0, defaults=None):
+    """
+    Runs one job spec. `defaults` fills options the spec leaves out (e.g. exe_dir, frame_store).
+    progress(FFmpegProgress) is forwarded to the backend. Returns what the operation wrote.
+    """
+    validate_job_spec(spec)
+    opts = dict(defaults or {})
+    opts.update(spec.get("options", {}))
+    out_dir = os.path.dirname(os.path.abspath(spec["output"]))
+    if spec["op"] == "extract_frames": out_dir = os.path.abspath(spec["output"])
+    os.makedirs(out_dir, exist_ok=True)
+    return OPERATIONS[spec["op"]](spec, opts, progress, threads)
+
+def load_job_specs(path):
+    """
+    Reads job specs from a JSON list, an object with a "jobs" list, a single job object,
+    or JSON lines (one job per line). "-" reads stdin. Jobs without an "id" get one.
+    """
+    if path == "-": text = sys.stdin.read()
+    else:
+        with open(path, 'r', encoding="utf-8") as f: text = f.read()
+    try:
+        data = json.loads(text)
+        jobs = data.get("jobs", [data]) if isinstance(data, dict) else data
+    except json.JSONDecodeError:
+        jobs = [json.loads(line) for line in text.splitlines() if line.strip()]
+    for n, job in enumerate(jobs, 1):
+        if isinstance(job, dict): job.setdefault("id", f"job-{n}")
+    return jobs
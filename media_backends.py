@@ -0,0 +1,1141 @@
+import os
+import subprocess
+import json
+import math
+import re
+from ffmpeg_utils import probe_media, stream_copy_args, run_ffmpeg
+from frame_store import FrameStore, InsufficientSpaceError
+from cancellation import JobCancelled
+from process_supervisor import run_process
+from tracing import span, traced
+from result_cache import cached_result
+from chunked_encode import chunked_encode, CHUNKABLE_EXTS, MIN_DURATION as CHUNKED_MIN_DURATION
+
+# --- Backend Video Logic (no GUI imports) ---
+# Shared by the desktop app (video_gui.py) and the headless CLI (media_cli.py).
+# MoviePy and PIL are imported inside the functions that need them so importing
+# this module stays cheap.
+# Every child process goes through run_ffmpeg / run_process so a cancelled job
+# (cancellation.py) kills it; JobCancelled is a BaseException and passes through
+# the `except Exception` fallbacks below.
+# Single-output backends are memoized by result_cache.cached_result (keyed on the
+# source content + parameters); it sits under @traced so hits still show up.
+
+def _discard_partial(path):
+    """Removes a half-written output left behind by a cancelled job."""
+    try:
+        if path and os.path.isfile(path): os.remove(path)
+    except OSError: pass
+
+@traced("backend.combine_video_clips")
+def combine_video_clips_backend(input_files, output_path, logger=None):
+    if not input_files: return None
+    try:
+        from moviepy import VideoFileClip, concatenate_videoclips
+        clips = []
+        for f in input_files:
+            if not os.path.exists(f): return None
+            clips.append(VideoFileClip(f))
+        
+        final_clip = concatenate_videoclips(clips, method="compose")
+        
+        final_clip.write_videofile(
+            output_path, 
+            codec='libx264', 
+            audio_codec='aac', 
+            temp_audiofile='temp-audio.m4a', 
+            remove_temp=True, 
+            preset='ultrafast',
+            threads=4,
+            logger=logger 
+        )
+
+        for clip in clips: clip.close()
+        return os.path.abspath(output_path)
+    except JobCancelled:
+        # MoviePy renders in-process; the logger raises this between frames
+        for clip in clips: clip.close()
+        _discard_partial(output_path)
+        raise
+    except Exception as e:
+        raise e
+
+GIF_DITHER_MODES = ["sierra2_4a", "floyd_steinberg", "bayer", "none"]
+GIF_STATS_MODES = ["full", "diff", "single"]
+
+@traced("backend.convert_to_gif")
+@cached_result("gif", source="video_path", on_hit=lambda output: True)
+def convert_to_gif_backend(video_path, output_path, fps=10, scale=0.5, speed=1.0, logger=None,
+                           dither="sierra2_4a", max_colors=256, stats_mode="full", two_pass=False, progress=None,
+                           raise_on_error=False):
+    """
+    GIF via one FFmpeg filter graph: setpts (speed) -> fps -> scale -> palettegen/paletteuse.
+    stats_mode: "full" (one palette for the clip), "diff" (favour moving areas), "single" (palette per frame)
+    two_pass: write the palette to a PNG first instead of split-ing the stream (lower memory on long clips)
+    Falls back to MoviePy's write_gif if FFmpeg is unavailable or fails.
+    raise_on_error: raise instead of returning False (batch workers use this to report the reason).
+    """
+    ffmpeg_error = None
+    try:
+        chain = []
+        if speed != 1.0: chain.append(f"setpts=PTS/{speed}")
+        chain.append(f"fps={fps}")
+        if scale != 1.0: chain.append(f"scale=trunc(iw*{scale}):-1:flags=lanczos")
+        chain = ",".join(chain)
+
+        max_colors = max(2, min(256, int(max_colors)))
+        if stats_mode not in GIF_STATS_MODES: stats_mode = "full"
+        if dither not in GIF_DITHER_MODES: dither = "sierra2_4a"
+        palettegen = f"palettegen=max_colors={max_colors}:stats_mode={stats_mode}"
+        paletteuse = f"paletteuse=dither={dither}"
+        if dither == "bayer": paletteuse += ":bayer_scale=3"
+        if stats_mode == "diff": paletteuse += ":diff_mode=rectangle"
+        if stats_mode == "single":
+            paletteuse += ":new=1"
+            two_pass = False # A per-frame palette cannot be precomputed into one PNG
+
+        duration = probe_media(video_path)["duration"] / (speed or 1.0)
+
+        if two_pass:
+            palette_path = os.path.splitext(output_path)[0] + "_palette.png"
+            try:
+                # Pass 1: palette (first half of the bar), Pass 2: dithered GIF (second half)
+                def pass_progress(offset):
+                    if not progress: return None
+                    def callback(info):
+                        if info.fraction is not None: progress(info._replace(fraction=offset + 0.5 * info.fraction))
+                    return callback
+                run_ffmpeg(["ffmpeg", "-y", "-i", video_path, "-vf", f"{chain},{palettegen}", palette_path],
+                           progress=pass_progress(0.0), duration=duration)
+                run_ffmpeg(["ffmpeg", "-y", "-i", video_path, "-i", palette_path,
+                            "-lavfi", f"[0:v]{chain}[x];[x][1:v]{paletteuse}", "-an", output_path],
+                           progress=pass_progress(0.5), duration=duration)
+            finally:
+                try: os.remove(palette_path)
+                except OSError: pass
+        else:
+            graph = f"[0:v]{chain},split[a][b];[a]{palettegen}[p];[b][p]{paletteuse}"
+            run_ffmpeg(["ffmpeg", "-y", "-i", video_path, "-filter_complex", graph, "-an", output_path],
+                       progress=progress, duration=duration)
+
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0: return True
+        raise Exception("FFmpeg produced empty GIF")
+    except JobCancelled:
+        _discard_partial(output_path)
+        raise
+    except Exception as e:
+        ffmpeg_error = e
+        print(f"FFmpeg GIF failed ({e}). Switching to MoviePy fallback...")
+
+    # --- MoviePy Fallback ---
+    try:
+        from moviepy import VideoFileClip
+        clip = VideoFileClip(video_path)
+        if speed != 1.0: clip = clip.with_speed_scaled(speed)
+        if scale != 1.0: clip = clip.resized(scale)
+        clip.write_gif(output_path, fps=fps, logger=logger)
+        clip.close()
+        return True
+    except Exception as e:
+        print(f"GIF Error: {e}")
+        if raise_on_error:
+            # Last line of ffmpeg's log is usually the actual reason
+            detail = (getattr(ffmpeg_error, "stderr", None) or str(ffmpeg_error)).strip().splitlines()
+            raise Exception(f"FFmpeg: {detail[-1] if detail else ffmpeg_error} / MoviePy: {e}")
+        return False
+    
+@traced("backend.universal_convert")
+@cached_result("convert", on_hit=lambda output: (True, "Success (cached)"))
+def universal_convert_backend(input_path, output_path, quality="High", speed="Medium", logger=None, threads=0, stream_copy=True, progress=None,
+                              chunked=False, chunk_jobs=0):
+    """
+    Backend with Speed/Preset control.
+    speed options: "Ultrafast", "Fast", "Medium", "Slow"
+    threads: encoder threads (0 = ffmpeg default). Set by the batch pool to avoid oversubscription.
+    stream_copy: remux with -c copy when the target container accepts the source codecs.
+    Same-container conversions only remux at the default quality and speed; otherwise they re-encode.
+    progress: callback(FFmpegProgress) with percentage, speed and ETA.
+    chunked: long H.264 encodes are split at keyframes and encoded by chunk_jobs encoders
+    at once (threads each), see chunked_encode.py. Falls back to one encoder on failure.
+    """
+    input_ext = os.path.splitext(input_path)[1].lower()
+    output_ext = os.path.splitext(output_path)[1].lower()
+    image_exts = ['.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tiff', '.ico']
+    
+    # --- 1. IMAGE MODE ---
+    if input_ext in image_exts:
+        try:
+            from PIL import Image
+            img = Image.open(input_path)
+            if output_ext in ['.jpg', '.jpeg', '.bmp'] and img.mode in ('RGBA', 'LA'):
+                bg = Image.new("RGB", img.size, (255, 255, 255))
+                bg.paste(img, mask=img.split()[3])
+                img = bg
+            
+            q_val = 100 if quality == "High" else (85 if quality == "Medium" else 60)
+            if output_ext == '.ico': img.save(output_path, format='ICO', sizes=[(256, 256)])
+            else: img.save(output_path, quality=q_val)
+            return True, "Success"
+        except Exception as e:
+            return False, f"Image Error: {e}"
+
+    # --- 2. VIDEO MODE ---
+    if output_ext == ".gif":
+        try:
+            fps = 15 if quality == "High" else 10
+            scale = 1.0 if quality == "High" else 0.5
+            if convert_to_gif_backend(input_path, output_path, fps=fps, scale=scale, progress=progress):
+                return True, "Success"
+            return False, "GIF Error: conversion failed"
+        except Exception as e:
+            return False, f"GIF Error: {e}"
+
+    ffmpeg_cmd = "ffmpeg"
+
+    # --- FAST PATH: Container-only change (e.g. MP4 -> MKV, AAC -> M4A) ---
+    # Within one container a remux would ignore the chosen quality / preset (and chunking)
+    info = probe_media(input_path)
+    if stream_copy and (input_ext != output_ext or (quality, speed) == ("High", "Medium")):
+        copy_args = stream_copy_args(info, output_ext)
+        if copy_args:
+            ok, msg = _run_convert_cmd([ffmpeg_cmd, "-y", "-i", input_path, *copy_args, output_path], output_path, progress, info["duration"])
+            if ok: return True, "Success (stream copy)"
+            print(f"Stream copy failed, re-encoding instead: {msg}")
+
+    cmd = [ffmpeg_cmd, "-y", "-i", input_path]
+
+    # --- SPEED & QUALITY SETTINGS ---
+    # Map UI Speed to FFmpeg Presets
+    preset_map = {
+        "Ultrafast": "ultrafast", # Fastest encoding, larger file
+        "Fast": "fast",
+        "Medium": "medium",
+        "Slow": "slow"            # Best compression, slowest
+    }
+    preset = preset_map.get(speed, "medium")
+    
+    crf = "18" if quality == "High" else ("23" if quality == "Medium" else "28")
+
+    # Audio Extraction
+    if output_ext in ['.mp3', '.wav', '.m4a']:
+        cmd.extend(["-vn", "-map", "a"]) 
+        if output_ext == '.mp3': cmd.extend(["-c:a", "libmp3lame", "-q:a", "2" if quality=="High" else "5"])
+        elif output_ext == '.m4a': cmd.extend(["-c:a", "aac", "-b:a", "192k"])
+    # Video Conversion
+    else:
+        if chunked and output_ext in CHUNKABLE_EXTS and info["duration"] >= CHUNKED_MIN_DURATION:
+            has_audio = any(st.get("codec_type") == "audio" for st in info["streams"])
+            try:
+                chunks = chunked_encode(input_path, output_path, ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-preset", preset, "-crf", crf],
+                                        ["-c:a", "aac", "-b:a", "192k"], has_audio=has_audio, jobs=chunk_jobs, threads=threads, progress=progress)
+                return True, f"Success ({chunks} chunks)"
+            except JobCancelled:
+                _discard_partial(output_path)
+                raise
+            except Exception as e:
+                print(f"Chunked encode failed ({e}). Encoding in one process...")
+
+        if output_ext == '.webm':
+            cmd.extend(["-c:v", "libvpx-vp9", "-crf", "30", "-b:v", "0"])
+        else:
+            cmd.extend(["-c:v", "libx264", "-pix_fmt", "yuv420p", "-preset", preset, "-crf", crf])
+        cmd.extend(["-c:a", "aac", "-b:a", "192k"])
+
+    if threads: cmd.extend(["-threads", str(threads)])
+    cmd.append(output_path)
+
+    return _run_convert_cmd(cmd, output_path, progress, info["duration"])
+
+def _run_convert_cmd(cmd, output_path, progress=None, duration=0.0):
+    # Execution
+    try:
+        try:
+            run_ffmpeg(cmd, progress=progress, duration=duration)
+        except subprocess.CalledProcessError as e:
+            return False, f"FFmpeg Error:\n{(e.stderr or '')[-300:]}"
+        except JobCancelled:
+            _discard_partial(output_path)
+            raise
+
+        if os.path.exists(output_path) and os.path.getsize(output_path) == 0:
+            return False, "File created but is empty (0 bytes)."
+
+        return True, "Success"
+    except FileNotFoundError:
+        return False, "FFmpeg.exe not found."
+    except Exception as e:
+        return False, f"General Error: {e}"
+
+def resize_filter(width, height, mode="stretch", anchor="center"):
+    """FFmpeg video filter for one target size (shared by single and multi-rendition resize)."""
+    if mode == "stretch":
+        # Simple stretch (distorts image)
+        return f"scale={width}:{height}"
+
+    elif mode == "fit":
+        # Fit inside + Black Bars (Letterbox)
+        # 1. Scale to fit inside box
+        # 2. Pad to fill box, centering the video
+        return (
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2"
+        )
+
+    elif mode == "crop":
+        # Crop to Fill (Zoom + Cut)
+        # 1. Scale so the SMALLEST dimension matches target (filling the box)
+        # 2. Crop the excess
+
+        # Step 1: Scale (force_original_aspect_ratio=increase ensures we fill the box)
+        scale_part = f"scale={width}:{height}:force_original_aspect_ratio=increase"
+
+        # Step 2: Crop
+        if anchor == "top-left":
+            # Crop from top-left (0,0)
+            crop_part = f"crop={width}:{height}:0:0"
+        elif anchor == "bottom-right":
+            # Crop from bottom-right (w-new_w, h-new_h)
+            # 'in_w' and 'in_h' refer to the size AFTER the scale filter
+            crop_part = f"crop={width}:{height}:in_w-{width}:in_h-{height}"
+        else: # center
+            # Crop from center
+            crop_part = f"crop={width}:{height}:(in_w-{width})/2:(in_h-{height})/2"
+
+        return f"{scale_part},{crop_part}"
+
+    return f"scale={width}:{height}"
+
+@traced("backend.resize_renditions")
+def resize_renditions_backend(input_path, renditions, progress=None, threads=0):
+    """
+    Produces several resized versions from ONE decode using a split filter graph.
+    renditions: [{"width": 1280, "height": 720, "mode": "fit", "anchor": "center", "output": "out_720.mp4"}, ...]
+    Returns the list of output paths. Falls back to one resize_clip_backend call per rendition.
+    """
+    if not renditions: return []
+    if len(renditions) == 1:
+        r = renditions[0]
+        return [resize_clip_backend(input_path, r["width"], r["height"], r["output"], mode=r.get("mode", "stretch"),
+                                    anchor=r.get("anchor", "center"), progress=progress, threads=threads)]
+    try:
+        labels = [f"s{i}" for i in range(len(renditions))]
+        graph = [f"[0:v]split={len(renditions)}" + "".join(f"[{l}]" for l in labels)]
+        for i, r in enumerate(renditions):
+            graph.append(f"[s{i}]{resize_filter(r['width'], r['height'], r.get('mode', 'stretch'), r.get('anchor', 'center'))}[v{i}]")
+
+        cmd = ["ffmpeg", "-y", "-i", input_path, "-filter_complex", ";".join(graph)]
+        for i, r in enumerate(renditions):
+            cmd.extend(["-map", f"[v{i}]", "-map", "0:a?", "-c:v", "libx264", "-preset", "ultrafast", "-crf", "23", "-c:a", "copy"])
+            if threads: cmd.extend(["-threads", str(threads)])
+            cmd.append(r["output"])
+
+        run_ffmpeg(cmd, progress=progress)
+        return [r["output"] for r in renditions]
+    except JobCancelled:
+        for r in renditions: _discard_partial(r["output"])
+        raise
+    except Exception as e:
+        print(f"Multi-rendition FFmpeg failed ({e}). Resizing one rendition at a time...")
+        outputs = []
+        for i, r in enumerate(renditions):
+            # One rendition after another: report the share of the whole list
+            part = None
+            if progress:
+                part = lambda info, i=i: progress(info._replace(fraction=None if info.fraction is None else (i + info.fraction) / len(renditions)))
+            outputs.append(resize_clip_backend(input_path, r["width"], r["height"], r["output"], mode=r.get("mode", "stretch"),
+                                               anchor=r.get("anchor", "center"), progress=part, threads=threads))
+        return outputs
+
+@traced("backend.resize_clip")
+@cached_result("resize_clip")
+def resize_clip_backend(input_path, width, height, output_path, mode="stretch", anchor="center", logger=None, progress=None, threads=0):
+    """
+    Resizes video.
+    mode: "stretch" (distort), "fit" (black bars), "crop" (fill screen/cut edges)
+    anchor: "center", "top-left", "bottom-right" (only used for 'crop')
+    progress: callback(FFmpegProgress) for the FFmpeg path (logger is used by the MoviePy fallback)
+    """
+    try:
+        # --- FFmpeg Command Generation ---
+        ffmpeg_cmd = "ffmpeg"
+        filter_str = resize_filter(width, height, mode, anchor)
+
+        cmd = [
+            ffmpeg_cmd, "-y",               
+            "-i", input_path,               
+            "-vf", filter_str, 
+            "-c:v", "libx264",              
+            "-preset", "ultrafast",         
+            "-crf", "23",                   
+            "-c:a", "copy",                 
+        ]
+        if threads: cmd.extend(["-threads", str(threads)])
+        cmd.append(output_path)
+        
+        run_ffmpeg(cmd, progress=progress)
+        return output_path
+
+    except JobCancelled:
+        _discard_partial(output_path)
+        raise
+    except Exception as e:
+        print(f"Direct FFmpeg failed ({e}). Switching to MoviePy fallback...")
+        
+        # --- MoviePy Fallback ---
+        try:
+            from moviepy import VideoFileClip, CompositeVideoClip
+            clip = VideoFileClip(input_path)
+            
+            if mode == "stretch":
+                new_clip = clip.resized(new_size=(width, height))
+            
+            elif mode == "fit":
+                # Fit logic (as before)
+                ratio_w = width / clip.w
+                ratio_h = height / clip.h
+                scale_factor = min(ratio_w, ratio_h)
+                resized = clip.resized(scale=scale_factor)
+                new_clip = CompositeVideoClip(
+                    [resized.with_position("center")], 
+                    size=(width, height), bg_color=(0,0,0)
+                )
+            
+            elif mode == "crop":
+                # Crop to Fill logic
+                ratio_w = width / clip.w
+                ratio_h = height / clip.h
+                scale_factor = max(ratio_w, ratio_h) # Scale up to fill
+                
+                resized = clip.resized(scale=scale_factor)
+                
+                # Calculate Crop Box
+                x1, y1 = 0, 0
+                if anchor == "center":
+                    x1 = (resized.w - width) / 2
+                    y1 = (resized.h - height) / 2
+                elif anchor == "bottom-right":
+                    x1 = resized.w - width
+                    y1 = resized.h - height
+                # top-left is 0,0
+                
+                new_clip = resized.cropped(x1=x1, y1=y1, width=width, height=height)
+
+            new_clip.write_videofile(
+                output_path, 
+                codec='libx264', audio_codec='aac', temp_audiofile='temp-audio-resize.m4a', 
+                remove_temp=True, preset='ultrafast', logger=logger
+            )
+            clip.close()
+            new_clip.close()
+            return output_path
+            
+        except Exception as e2:
+            raise e2
+
+def upscale_filter(scale_factor, width=None, height=None, algo="lanczos", sharpen=True):
+    if width and height:
+        scale_filter = f"scale={width}:{height}:flags={algo}"
+    else:
+        scale_filter = f"scale=iw*{scale_factor}:ih*{scale_factor}:flags={algo}"
+    if sharpen:
+        scale_filter += ",unsharp=5:5:1.0:5:5:0.0"
+    return scale_filter
+
+@traced("backend.upscale_media")
+@cached_result("upscale")
+def upscale_media_backend(input_path, output_path, scale_factor, width=None, height=None, algo="lanczos", sharpen=True, progress=None):
+    try:
+        ffmpeg_cmd = "ffmpeg"
+        scale_filter = upscale_filter(scale_factor, width, height, algo, sharpen)
+
+        cmd = [ffmpeg_cmd, "-y", "-i", input_path, "-vf", scale_filter]
+        
+        ext = os.path.splitext(output_path)[1].lower()
+        if ext in ['.jpg', '.png', '.bmp']:
+            cmd.extend(["-q:v", "2"]) 
+        else:
+            cmd.extend(["-c:v", "libx264", "-preset", "slow", "-crf", "18", "-c:a", "copy"])
+            
+        cmd.append(output_path)
+        
+        run_ffmpeg(cmd, progress=progress)
+        return output_path
+    except JobCancelled:
+        _discard_partial(output_path)
+        raise
+
+def find_ai_tool(name, exe_dir=None):
+    """Path of an ncnn tool ("realesrgan-ncnn-vulkan", "rife-ncnn-vulkan"): the Settings folder, else the working folder."""
+    exe_name = f"{name}.exe" if os.name == 'nt' else name
+    if exe_dir and os.path.exists(os.path.join(exe_dir, exe_name)):
+        return os.path.join(exe_dir, exe_name)
+    return os.path.abspath(exe_name)
+
+def find_codeformer(exe_dir=None):
+    bat_name = "run_codeformer.bat"
+    if exe_dir and os.path.exists(os.path.join(exe_dir, bat_name)): return os.path.join(exe_dir, bat_name)
+    if os.path.exists(os.path.abspath(bat_name)): return os.path.abspath(bat_name)
+    return None
+
+def run_realesrgan(exe_path, in_path, out_path, scale_factor, model, tile_size=0, safe_mode=False, out_format="jpg"):
+    """One realesrgan-ncnn-vulkan run over a file or a frame folder."""
+    cmd = [
+        exe_path,
+        "-i", in_path,
+        "-o", out_path,
+        "-n", model,
+        "-s", str(scale_factor),
+        "-f", out_format
+    ]
+
+    if tile_size > 0:
+        cmd.extend(["-t", str(tile_size)])
+        if tile_size >= 400:
+            cmd.extend(["-j", "2:2:2"])
+        else:
+            cmd.extend(["-j", "1:2:2"])
+    elif safe_mode:
+        cmd.extend(["-t", "64", "-j", "1:1:1"])
+    else:
+        cmd.extend(["-t", "256", "-j", "1:2:2"])
+
+    print(f"AI Command (Safe={safe_mode}, Tile={tile_size}):", " ".join(cmd))
+
+    with span("ai.realesrgan", model=model, safe_mode=safe_mode, tile=tile_size):
+        run_process(cmd, check=True)
+
+def upscale_frames_ai(exe_path, in_frames, out_frames, scale_factor, tile_size=0, out_format="jpg"):
+    """Video model over a frame folder, retried in Safe Mode (small tiles) if the GPU gives up."""
+    if tile_size > 0:
+        run_realesrgan(exe_path, in_frames, out_frames, scale_factor, "realesr-animevideov3", tile_size, out_format=out_format)
+        return
+    try:
+        run_realesrgan(exe_path, in_frames, out_frames, scale_factor, "realesr-animevideov3", out_format=out_format)
+    except subprocess.CalledProcessError:
+        print("Video AI crashed. Retrying in Safe Mode...")
+        run_realesrgan(exe_path, in_frames, out_frames, scale_factor, "realesr-animevideov3", safe_mode=True, out_format=out_format)
+
+def interpolate_frames_rife(exe_path, in_frames, out_frames, multiplier, ext):
+    """
+    RIFE passes (each doubles the frame count) until `multiplier` is reached.
+    Frames end up in out_frames as %08d.<ext>; in_frames is reused between passes.
+    """
+    import shutil
+    current_mult = 1
+    while current_mult < multiplier:
+        # Run RIFE (Input -> Output)
+        cmd = [exe_path, "-i", in_frames, "-o", out_frames, "-f", f"%08d.{ext}"]
+        with span("rife.interpolate", pass_multiplier=current_mult * 2):
+            run_process(cmd, check=True)
+
+        current_mult *= 2
+
+        # If we need another pass (e.g. going to 4x), move Output back to Input
+        if current_mult < multiplier:
+            with span("rife.shuffle_frames"):
+                # Clear Input
+                for f in os.listdir(in_frames):
+                    os.remove(os.path.join(in_frames, f))
+                # Move Output to Input
+                for f in os.listdir(out_frames):
+                    shutil.move(os.path.join(out_frames, f), os.path.join(in_frames, f))
+
+@traced("backend.upscale_with_ai")
+@cached_result("upscale_ai", on_hit=lambda output: (True, "Success (cached)"))
+def upscale_with_ai_backend(input_path, output_path, scale_factor, logger=None, enhance_faces=False, exe_dir=None, tile_size=0, frame_store=None):
+    exe_path = find_ai_tool("realesrgan-ncnn-vulkan", exe_dir)
+    if not os.path.exists(exe_path):
+        return False, f"Executable not found at: {exe_path}. Please set the correct path in Settings."
+
+    ext = os.path.splitext(input_path)[1].lower()
+    is_image = ext in ['.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tiff']
+
+    def run_ai_command(in_file, out_file, model, safe_mode=False, out_format="jpg"):
+        run_realesrgan(exe_path, in_file, out_file, scale_factor, model, tile_size, safe_mode, out_format)
+
+    if is_image:
+        try:
+            if logger: logger(0.1)
+            
+            if tile_size > 0:
+                run_ai_command(input_path, output_path, "realesrgan-x4plus", safe_mode=False)
+            else:
+                try:
+                    run_ai_command(input_path, output_path, "realesrgan-x4plus", safe_mode=False)
+                except subprocess.CalledProcessError:
+                    print("Standard AI crashed. Retrying in Safe Mode...")
+                    if logger: logger(0.2)
+                    run_ai_command(input_path, output_path, "realesr-animevideov3", safe_mode=True)
+
+            if logger: logger(0.5)
+
+            if enhance_faces:
+                codeformer_cmd = find_codeformer(exe_dir)
+                if codeformer_cmd:
+                    with span("ai.codeformer"): run_process([codeformer_cmd, output_path], check=True)
+
+            if logger: logger(1.0)
+            
+            if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+                return True, "Success"
+            else:
+                return False, "AI failed to generate output file."
+
+        except Exception as e:
+            return False, f"Image Upscale Error: {str(e)}"
+
+    else:
+        # Intermediate frames live in a FrameStore (format / location from Settings)
+        store = FrameStore.from_settings(frame_store, prefix="TEMP_AI", default_format="jpeg")
+        info = probe_media(input_path)
+        required = store.estimate_bytes(info["width"], info["height"], info["nb_frames"]) + \
+                   store.estimate_bytes(info["width"], info["height"], info["nb_frames"], scale=scale_factor)
+        try:
+            store.prepare(required)
+        except InsufficientSpaceError as e:
+            return False, f"Video Upscale Error: {e}"
+
+        def render():
+            # Frame folders are created in here: a full RAM disk restarts this on disk
+            in_frames = store.subdir("input")
+            out_frames = store.subdir("output")
+            final_frames = out_frames
+            if logger: logger(0.1)
+            
+            with span("ai.extract_frames", frames=info["nb_frames"], format=store.ext):
+                run_process([
+                    "ffmpeg", "-i", input_path, 
+                    *store.ffmpeg_args(),
+                    os.path.join(in_frames, f"frame_%08d.{store.ext}")
+                ], check=True)
+
+            if logger: logger(0.2)
+            
+            upscale_frames_ai(exe_path, in_frames, out_frames, scale_factor, tile_size, out_format=store.ext)
+
+            if logger: logger(0.7)
+
+            codeformer_cmd = find_codeformer(exe_dir)
+            if enhance_faces and codeformer_cmd:
+                with span("ai.codeformer"): run_process([codeformer_cmd, out_frames], check=True)
+
+            audio_path = store.path("audio.m4a")
+            has_audio = False
+            try:
+                with span("ai.extract_audio"):
+                    run_process(["ffmpeg", "-y", "-i", input_path, "-vn", "-acodec", "copy", audio_path])
+                if os.path.exists(audio_path) and os.path.getsize(audio_path) > 1000:
+                    has_audio = True
+            except Exception: pass
+
+            fps = info["fps"] or 30
+            if not info["fps"]:
+                try:
+                    from moviepy import VideoFileClip
+                    clip = VideoFileClip(input_path)
+                    fps = clip.fps
+                    clip.close()
+                except Exception: pass
+
+            combine_cmd = [
+                "ffmpeg", "-y", "-framerate", str(fps),
+                "-i", os.path.join(final_frames, f"frame_%08d.{store.ext}"),
+            ]
+            
+            if has_audio: combine_cmd.extend(["-i", audio_path])
+            
+            combine_cmd.extend([
+                "-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", "18",
+                "-c:a", "aac" if has_audio else "copy",
+                output_path
+            ])
+            
+            if has_audio:
+                combine_cmd.extend(["-map", "0:v:0", "-map", "1:a:0"])
+
+            with span("ai.mux"): run_process(combine_cmd, check=True)
+
+        try:
+            store.run(render, required)
+            if logger: logger(1.0)
+            return True, "Success"
+
+        except JobCancelled:
+            _discard_partial(output_path)
+            raise
+        except Exception as e:
+            return False, f"Video Upscale Error: {str(e)}"
+        finally:
+            store.cleanup()
+
+def minterpolate_filter(target_fps):
+    return f"minterpolate=fps={target_fps}:mi_mode=mci:mc_mode=aobmc:me_mode=bidir:vsbmc=1"
+
+@traced("backend.interpolate_video")
+@cached_result("interpolate", on_hit=lambda output: (True, "Success (cached)"))
+def interpolate_video_backend(input_path, output_path, method="ffmpeg", target_fps=60, multiplier=2, logger=None, exe_dir=None, frame_store=None,
+                              progress=None):
+    """progress(FFmpegProgress) is used by the ffmpeg method; logger(fraction) by both."""
+    try:
+        if method == "ffmpeg":
+            filter_str = minterpolate_filter(target_fps)
+            
+            cmd = [
+                "ffmpeg", "-y", 
+                "-i", input_path,
+                "-vf", filter_str,
+                "-c:v", "libx264", "-preset", "veryfast", "-crf", "20",
+                "-c:a", "copy",
+                output_path
+            ]
+            
+            if progress is None and logger:
+                progress = lambda info: info.fraction is not None and logger(info.fraction)
+            try:
+                run_ffmpeg(cmd, progress=progress)
+            except JobCancelled:
+                _discard_partial(output_path)
+                raise
+            return True, "Success"
+
+        elif method == "rife":
+            exe_path = find_ai_tool("rife-ncnn-vulkan", exe_dir)
+            if not os.path.exists(exe_path):
+                return False, f"RIFE Executable not found at: {exe_path}. Please set path in Settings."
+
+            target_mult = multiplier if multiplier in [2, 4] else 2
+
+            # Peak usage: input + output frames of the last pass (4x moves 2N frames back to input)
+            store = FrameStore.from_settings(frame_store, prefix="TEMP_RIFE", default_format="png")
+            info = probe_media(input_path)
+            peak_frames = info["nb_frames"] * (1 + target_mult + (target_mult // 2 if target_mult > 2 else 0))
+            required = store.estimate_bytes(info["width"], info["height"], peak_frames)
+            try:
+                store.prepare(required)
+            except InsufficientSpaceError as e:
+                return False, f"RIFE Error: {e}"
+
+            def render():
+                # Frame folders are created in here: a full RAM disk restarts this on disk
+                in_frames = store.subdir("input")
+                out_frames = store.subdir("output")
+                if logger: logger(0.1)
+                
+                # Extract frames
+                with span("rife.extract_frames", frames=info["nb_frames"], format=store.ext):
+                    run_process([
+                        "ffmpeg", "-i", input_path, 
+                        *store.ffmpeg_args(),
+                        os.path.join(in_frames, f"frame_%08d.{store.ext}")
+                    ], check=True)
+
+                if logger: logger(0.2)
+
+                # --- RIFE LOOP FOR MULTIPLIER (2x, 4x) ---
+                interpolate_frames_rife(exe_path, in_frames, out_frames, target_mult, store.ext)
+
+                if logger: logger(0.8)
+
+                # Calculate new FPS
+                orig_fps = info["fps"] or 30
+                if not info["fps"]:
+                    try:
+                        from moviepy import VideoFileClip
+                        clip = VideoFileClip(input_path)
+                        orig_fps = clip.fps if clip.fps else 30
+                        clip.close()
+                    except Exception: pass
+                
+                new_fps = orig_fps * target_mult
+
+                # Handle Audio
+                audio_path = store.path("audio.m4a")
+                has_audio = False
+                try:
+                    with span("rife.extract_audio"):
+                        run_process(["ffmpeg", "-y", "-i", input_path, "-vn", "-acodec", "copy", audio_path])
+                    if os.path.exists(audio_path) and os.path.getsize(audio_path) > 1000:
+                        has_audio = True
+                except Exception: pass
+
+                # Recombine
+                combine_cmd = [
+                    "ffmpeg", "-y", "-framerate", str(new_fps),
+                    "-i", os.path.join(out_frames, f"%08d.{store.ext}"), 
+                ]
+                
+                if has_audio: combine_cmd.extend(["-i", audio_path])
+                
+                combine_cmd.extend([
+                    "-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", "18",
+                    "-c:a", "aac" if has_audio else "copy",
+                    output_path
+                ])
+                
+                if has_audio:
+                    combine_cmd.extend(["-map", "0:v:0", "-map", "1:a:0"])
+
+                with span("rife.mux"): run_process(combine_cmd, check=True)
+
+            try:
+                store.run(render, required)
+                if logger: logger(1.0)
+                return True, "Success"
+
+            except JobCancelled:
+                _discard_partial(output_path)
+                raise
+            except Exception as e:
+                return False, f"RIFE Error: {str(e)}"
+            finally:
+                store.cleanup()
+
+    except Exception as e:
+        return False, str(e)
+
+@traced("backend.crop_video")
+@cached_result("crop", source="video_path")
+def crop_video_backend(video_path, start_time, end_time, output_path, progress=None):
+    duration = end_time - start_time
+    if duration <= 0: return None
+    try:
+        ffmpeg_cmd = "ffmpeg"
+
+        cmd = [
+            ffmpeg_cmd, "-y", "-ss", str(start_time), "-i", video_path, "-t", str(duration),
+            "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", output_path
+        ]
+        run_ffmpeg(cmd, progress=progress, duration=duration)
+        return output_path
+    except JobCancelled:
+        _discard_partial(output_path)
+        raise
+    except Exception:
+        pass
+
+    try:
+        from moviepy import VideoFileClip
+        clip = VideoFileClip(video_path)
+        trimmed = clip.subclipped(start_time, end_time)
+        trimmed.write_videofile(output_path, codec='libx264', audio_codec='aac', temp_audiofile='temp-audio.m4a', remove_temp=True, preset='ultrafast')
+        clip.close(); trimmed.close()
+        return output_path
+    except Exception as e:
+        raise e
+
+@traced("backend.extract_frame")
+def extract_frame_backend(video_path, time_in_seconds, output_path):
+    """Saves one still. Returns True, raises RuntimeError if neither FFmpeg nor MoviePy could write it."""
+    # Safety margin: If we are at the very end, step back slightly to capture the actual last frame.
+    # We do this calculation before running FFmpeg or MoviePy.
+    try:
+        # Quick probe to get duration/fps without full load (optional, but safer to use hard logic)
+        # We'll rely on the Fallback block for precise FPS math, but for FFmpeg CLI, 
+        # just subtracting 0.1s is usually enough to save the last frame safezone.
+        pass 
+    except: pass
+
+    # --- FIX: LOGIC TO PREVENT OVERSHOOTING DURATION ---
+    # We will refine 'time_in_seconds' inside the blocks below.
+
+    # 1. Try Direct FFmpeg
+    try:
+        ffmpeg_cmd = "ffmpeg"
+            
+        # If we are effectively at 0 (start), keep it. 
+        # If we are > 0, we trust the time, but if it fails, we fall back to MoviePy which has the smart fix below.
+        
+        cmd = [ffmpeg_cmd, "-y", "-ss", str(time_in_seconds), "-i", video_path, "-frames:v", "1", "-q:v", "2", output_path]
+        run_process(cmd, check=True)
+        
+        # Check if FFmpeg actually created a valid file (size > 0)
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            return True
+        else:
+            # If FFmpeg made an empty file (common at end of video), delete and fallback
+            if os.path.exists(output_path): os.remove(output_path)
+            raise Exception("FFmpeg produced empty file")
+
+    except Exception:
+        pass # Switch to MoviePy fallback
+
+    # 2. MoviePy Fallback (With The Fix)
+    try:
+        from moviepy import VideoFileClip
+        clip = VideoFileClip(video_path)
+        
+        # --- THE FIX IS HERE ---
+        # If the requested time is very close to (or past) the end, shift back by 1 frame.
+        total_dur = clip.duration
+        t = time_in_seconds
+
+        if t >= total_dur - 0.05:
+            # Calculate duration of a single frame
+            frame_dur = (1.0 / clip.fps) if (clip.fps and clip.fps > 0) else 0.05
+            # Set time to (Duration - 1 Frame) to ensure we hit valid data
+            t = max(0, total_dur - frame_dur)
+        
+        # Clamp t to be safe regardless
+        t = min(t, total_dur - 0.01)
+        if t < 0: t = 0
+            
+        clip.save_frame(output_path, t=t)
+        clip.close()
+        return True
+    except Exception as e:
+        raise RuntimeError(f"Failed: {e}")
+
+_SHOWINFO_PTS = re.compile(r"Parsed_showinfo.*?\bn:\s*(\d+).*?\bpts_time:\s*([-\d.]+)")
+
+def frame_select_expr(timestamps=None, interval=None, scene_threshold=None):
+    """
+    Builds the `select` expression for a batch frame export:
+    timestamps -> first frame at or after each time, interval -> one frame every N seconds,
+    scene_threshold -> frames whose scene score is above the threshold (0-1).
+    """
+    if timestamps:
+        terms = []
+        for t in sorted(set(float(t) for t in timestamps)):
+            # A frame is picked when the timestamp falls between the previous frame and this one.
+            # The first frame has no previous one (prev_pts is NaN): it takes every time up to its own
+            terms.append(f"gte(t,{t:.6f})*(isnan(prev_pts)+lt(prev_pts*TB,{t:.6f}))")
+        return "+".join(terms)
+    if interval:
+        return f"isnan(prev_selected_t)+gte(t-prev_selected_t,{float(interval):.6f})"
+    if scene_threshold is not None:
+        return f"gt(scene,{float(scene_threshold):.4f})"
+    raise ValueError("No frame selection given")
+
+@traced("backend.extract_frames_batch")
+def extract_frames_batch_backend(video_path, output_dir, timestamps=None, interval=None, scene_threshold=None,
+                                 name_prefix="frame", ext="jpg", progress=None):
+    """
+    Writes every requested frame from one sequential decode (select + showinfo) instead of
+    one seek and one ffmpeg launch per frame. Files are named after their timestamp.
+    Returns [(time_in_seconds, path), ...]. Raises on failure.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    info = probe_media(video_path)
+    duration, fps = info["duration"], info["fps"] or 30.0
+    if timestamps and duration:
+        # Past-the-end requests snap to the last frame, like extract_frame_backend does
+        last = max(0.0, duration - 1.0 / fps)
+        timestamps = [min(float(t), last) for t in timestamps]
+
+    tmp_pattern = os.path.join(output_dir, f".{name_prefix}_batch_%06d.{ext}")
+    pts_times = {}
+    def on_stderr(line):
+        m = _SHOWINFO_PTS.search(line)
+        if m: pts_times[int(m.group(1))] = float(m.group(2))
+
+    expr = frame_select_expr(timestamps, interval, scene_threshold)
+    cmd = ["ffmpeg", "-y", "-i", video_path, "-an", "-sn",
+           "-vf", f"select='{expr}',showinfo", "-vsync", "vfr"]
+    if ext.lower() in ("jpg", "jpeg"): cmd.extend(["-q:v", "2"])
+    cmd.append(tmp_pattern)
+
+    try:
+        run_ffmpeg(cmd, progress=progress, duration=duration, on_stderr=on_stderr)
+    except Exception as e:
+        print(f"Batch frame export failed, falling back to single frames: {e}")
+        if scene_threshold is not None and not timestamps and not interval: raise
+        if not timestamps:
+            count = int(duration // float(interval)) + 1 if duration else 0
+            timestamps = [i * float(interval) for i in range(count)]
+        results = []
+        for t in sorted(set(timestamps)):
+            out = os.path.join(output_dir, f"{name_prefix}_{t:09.3f}s.{ext}")
+            extract_frame_backend(video_path, t, out)
+            results.append((t, out))
+        return results
+
+    # Rename the numbered outputs after the timestamps showinfo reported (same order as written)
+    results = []
+    for i, n in enumerate(sorted(pts_times)):
+        src = tmp_pattern % (i + 1)
+        if not os.path.exists(src): continue
+        t = pts_times[n]
+        out = os.path.join(output_dir, f"{name_prefix}_{t:09.3f}s.{ext}")
+        os.replace(src, out)
+        results.append((t, out))
+    return results
+
+@traced("backend.thumbnail_sheet")
+def thumbnail_sheet_backend(video_path, output_path, columns=5, rows=4, tile_width=320, interval=None,
+                            padding=4, margin=8, progress=None):
+    """
+    Builds thumbnail grids from one decode (select + scale + tile).
+    interval=None: contact sheet, columns*rows frames spread over the whole clip, one image at output_path.
+    interval=N: sprite sheets, one frame every N seconds, as many pages (<stem>_001.jpg, ...) as needed.
+    Writes <stem>.json mapping each tile's timestamp to its sheet and pixel rectangle.
+    Returns (sheet_paths, index_path). Raises on failure.
+    """
+    info = probe_media(video_path)
+    duration = info["duration"]
+    if not duration: raise ValueError("Could not read the video duration.")
+    src_w, src_h = info["width"] or 16, info["height"] or 9
+    tile_w = max(16, int(tile_width) // 2 * 2)
+    tile_h = max(16, int(round(tile_w * src_h / src_w / 2)) * 2)
+    per_sheet = columns * rows
+
+    stem, ext = os.path.splitext(output_path)
+    if interval:
+        expr = frame_select_expr(interval=interval)
+        out_pattern = f"{stem}_%03d{ext}"
+    else:
+        # Sample the middle of each slice so the first tile is not a black lead-in frame
+        step = duration / per_sheet
+        expr = frame_select_expr(timestamps=[(i + 0.5) * step for i in range(per_sheet)])
+        out_pattern = output_path
+
+    pts_times = {}
+    def on_stderr(line):
+        m = _SHOWINFO_PTS.search(line)
+        if m: pts_times[int(m.group(1))] = float(m.group(2))
+
+    vf = (f"select='{expr}',showinfo,scale={tile_w}:{tile_h},"
+          f"tile={columns}x{rows}:padding={padding}:margin={margin}")
+    cmd = ["ffmpeg", "-y", "-i", video_path, "-an", "-sn", "-vf", vf, "-vsync", "vfr"]
+    if ext.lower() in (".jpg", ".jpeg"): cmd.extend(["-q:v", "3"])
+    if not interval: cmd.extend(["-frames:v", "1", "-update", "1"])
+    cmd.append(out_pattern)
+
+    run_ffmpeg(cmd, progress=progress, duration=duration, on_stderr=on_stderr)
+
+    times = [pts_times[n] for n in sorted(pts_times)]
+    if not interval: times = times[:per_sheet]
+    page_count = max(1, math.ceil(len(times) / per_sheet))
+    sheets = [output_path] if not interval else [out_pattern % (i + 1) for i in range(page_count)]
+    sheets = [p for p in sheets if os.path.exists(p)]
+    if not sheets: raise RuntimeError("FFmpeg did not write any sheet.")
+
+    tiles = []
+    for i, t in enumerate(times):
+        page, slot = divmod(i, per_sheet)
+        if page >= len(sheets): break
+        row, col = divmod(slot, columns)
+        tiles.append({"time": round(t, 3), "sheet": os.path.basename(sheets[page]),
+                      "x": margin + col * (tile_w + padding), "y": margin + row * (tile_h + padding),
+                      "w": tile_w, "h": tile_h})
+    index = {"source": os.path.abspath(video_path), "duration": duration, "columns": columns, "rows": rows,
+             "tile_width": tile_w, "tile_height": tile_h, "interval": interval,
+             "sheets": [os.path.basename(p) for p in sheets], "tiles": tiles}
+    index_path = stem + ".json"
+    with open(index_path, 'w') as f: json.dump(index, f, indent=2)
+    return sheets, index_path
+
+@traced("backend.preview_frames")
+def get_preview_pil_images(video_path, duration=3.0, fps=8, height=250):
+    pil_images = []
+    clip = None
+    try:
+        from moviepy import VideoFileClip
+        from PIL import Image
+        clip = VideoFileClip(video_path, audio=False)
+        max_duration = min(duration, clip.duration)
+        total_frames = int(max_duration * fps)
+        if total_frames < 1: total_frames = 1
+        step = 1.0 / fps
+        for i in range(total_frames):
+            t = i * step
+            if t > clip.duration: break
+            frame_data = clip.get_frame(t)
+            img = Image.fromarray(frame_data).copy()
+            aspect = img.width / img.height
+            new_width = int(height * aspect)
+            img = img.resize((new_width, height), Image.Resampling.LANCZOS)
+            pil_images.append(img)
+        return pil_images, int(step * 1000)
+    except Exception as e:
+        print(f"Loader Error: {e}")
+        return [], 100
+    finally:
+        if clip:
+            try: clip.close()
+            except: pass
+
+@traced("backend.delete_section")
+def delete_section_backend(video_path, start_remove, end_remove, output_path):
+    try:
+        from moviepy import VideoFileClip, concatenate_videoclips
+        clip = VideoFileClip(video_path)
+        if start_remove <= 0:
+            final = clip.subclipped(end_remove, clip.duration)
+        elif end_remove >= clip.duration:
+            final = clip.subclipped(0, start_remove)
+        else:
+            clip1 = clip.subclipped(0, start_remove)
+            clip2 = clip.subclipped(end_remove, clip.duration)
+            final = concatenate_videoclips([clip1, clip2])
+        final.write_videofile(output_path, codec='libx264', audio_codec='aac', temp_audiofile='temp-audio.m4a', remove_temp=True, preset='ultrafast')
+        clip.close(); final.close()
+        return output_path
+    except Exception as e:
+        raise e
+
+@traced("backend.insert_clip")
+def insert_clip_backend(main_video_path, insert_video_path, insert_time, output_path):
+    try:
+        from moviepy import VideoFileClip, concatenate_videoclips
+        main = VideoFileClip(main_video_path)
+        insert = VideoFileClip(insert_video_path)
+        if insert_time <= 0: final = concatenate_videoclips([insert, main])
+        elif insert_time >= main.duration: final = concatenate_videoclips([main, insert])
+        else:
+            part1 = main.subclipped(0, insert_time)
+            part2 = main.subclipped(insert_time, main.duration)
+            final = concatenate_videoclips([part1, insert, part2])
+        final.write_videofile(output_path, codec='libx264', audio_codec='aac', temp_audiofile='temp-audio.m4a', remove_temp=True, preset='ultrafast')
+        main.close(); insert.close(); final.close()
+        return output_path
+    except Exception as e:
+        raise e
+
+# --- Helper Utils ---
+
+RESOLUTION_PRESETS = {"2160p": (3840, 2160), "1440p": (2560, 1440), "1080p": (1920, 1080),
+                      "720p": (1280, 720), "480p": (854, 480), "360p": (640, 360)}
+
+def parse_rendition_list(text, default_mode="fit", default_anchor="center"):
+    """
+    "1280x720, 480p crop top-left, 640x360 stretch" -> [(w, h, mode, anchor), ...]
+    Each entry is WxH or a preset name, optionally followed by a mode and a crop anchor.
+    Raises ValueError on entries it cannot read.
+    """
+    renditions = []
+    for entry in [e.strip() for e in text.split(",") if e.strip()]:
+        parts = entry.lower().split()
+        size = parts[0]
+        if size in RESOLUTION_PRESETS: w, h = RESOLUTION_PRESETS[size]
+        else:
+            try: w, h = [int(v) for v in size.split("x")]
+            except ValueError: raise ValueError(f"Invalid rendition: {entry}")
+        mode = parts[1] if len(parts) > 1 else default_mode
+        anchor = parts[2] if len(parts) > 2 else default_anchor
+        if w <= 0 or h <= 0 or mode not in ("stretch", "fit", "crop") or anchor not in ("center", "top-left", "bottom-right"):
+            raise ValueError(f"Invalid rendition: {entry}")
+        renditions.append((w, h, mode, anchor))
+    return renditions
+
+def parse_timestamp_list(text):
+    """"5, 1:30, 01:02:03.5" -> [5.0, 90.0, 3723.5]. Raises ValueError on entries it cannot read."""
+    times = []
+    for entry in [e.strip() for e in text.replace(";", ",").split(",") if e.strip()]:
+        try:
+            seconds = 0.0
+            for part in entry.split(":"): seconds = seconds * 60 + float(part)
+        except ValueError: raise ValueError(f"Invalid timestamp: {entry}")
+        if seconds < 0: raise ValueError(f"Invalid timestamp: {entry}")
+        times.append(seconds)
+    return times
+
+def get_file_size_string(path):
+    try:
+        size_bytes = os.path.getsize(path)
+        if size_bytes == 0: return "0B"
+        size_name = ("B", "KB", "MB", "GB", "TB")
+        i = int(math.floor(math.log(size_bytes, 1024)))
+        p = math.pow(1024, i)
+        s = round(size_bytes / p, 2)
+        return "%s %s" % (s, size_name[i])
+    except: return "Unknown"
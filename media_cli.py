@@ -0,0 +1,144 @@
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+from batch_pool import run_parallel, default_job_count, threads_per_job
+from job_specs import run_job_spec, load_job_specs, validate_job_spec
+from cancellation import CancelToken, JobCancelled, set_current_token
+from render_worker import Coordinator
+import tracing
+import result_cache
+
+# --- Headless Command-Line Entry Point ---
+# Runs JSON job specs (see job_specs.py) on machines without a display.
+# stdout carries one JSON event per line; anything the backends print goes to stderr.
+#
+#   python media_cli.py jobs.json -j 4
+#   {"event": "start", "id": "job-1", "op": "convert"}
+#   {"event": "progress", "id": "job-1", "fraction": 0.42, "speed": 3.1, "eta": 35.0}
+#   {"event": "done", "id": "job-1", "ok": true, "result": "out/clip1.mp4", "elapsed": 12.3}
+#   {"event": "summary", "total": 1, "ok": 1, "failed": 0, "elapsed": 12.3}
+# Ctrl+C / SIGTERM kills the running ffmpeg / AI processes, skips the remaining
+# jobs and exits with 130 after the summary.
+#
+#   python media_cli.py jobs.json --workers 10.0.0.5:7601,unix:/tmp/worker1.sock
+# runs the jobs on render workers (render_worker.py) instead; events then carry the "worker".
+
+class EventWriter:
+    """Thread-safe JSON-lines writer with per-job progress throttling."""
+    def __init__(self, stream, progress_interval=0.5):
+        self.stream = stream
+        self.progress_interval = progress_interval
+        self.lock = threading.Lock()
+        self.last_progress = {}
+
+    def emit(self, event, **fields):
+        line = json.dumps(dict(event=event, **fields), default=str)
+        with self.lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def progress(self, job_id, info):
+        now = time.monotonic()
+        last_time, last_fraction = self.last_progress.get(job_id, (0, None))
+        finished = info.fraction == 1.0 and last_fraction != 1.0
+        if not finished and now - last_time < self.progress_interval: return
+        self.last_progress[job_id] = (now, info.fraction)
+        self.emit("progress", id=job_id, fraction=None if info.fraction is None else round(info.fraction, 4),
+                  out_time=round(info.out_time, 2), speed=info.speed,
+                  eta=None if info.eta is None else round(info.eta, 1))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run Media Studio jobs without the GUI.")
+    parser.add_argument("specs", nargs="+", help="Job spec files (JSON list, {\"jobs\": [...]}, or JSON lines); - for stdin")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="Parallel jobs (0 = auto)")
+    parser.add_argument("--threads", type=int, default=0, help="Encoder threads per job (0 = cores / jobs)")
+    parser.add_argument("--ai-tools-dir", default="", help="Folder with realesrgan / rife executables")
+    parser.add_argument("--scratch-dir", default="", help="Where AI stages write intermediate frames")
+    parser.add_argument("--progress-interval", type=float, default=0.5, help="Seconds between progress events per job")
+    parser.add_argument("--validate", action="store_true", help="Only check the specs, do not run them")
+    parser.add_argument("--cache-dir", default="", help="Result cache folder (default: per-user cache)")
+    parser.add_argument("--no-cache", action="store_true", help="Always recompute; do not read or fill the result cache")
+    parser.add_argument("--trace", default="", help="Write a Chrome trace of every stage / process here (summary on stderr)")
+    parser.add_argument("--workers", default="", help="Comma list of render workers (host:port or unix:/path) to run the jobs on")
+    parser.add_argument("--transfer", choices=("shared", "stream"), default="shared",
+                        help="Workers read inputs from shared storage, or get them (and send outputs back) over the connection")
+    parser.add_argument("--worker-secret", "--secret", default=os.environ.get("MEDIA_WORKER_SECRET", ""),
+                        help="Shared secret of the workers (default: $MEDIA_WORKER_SECRET)")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Runs per job when workers are lost")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.trace: tracing.enable(args.trace)
+    result_cache.configure({"enabled": not args.no_cache, "cache_dir": os.path.abspath(args.cache_dir) if args.cache_dir else ""})
+    events = EventWriter(sys.stdout, args.progress_interval)
+    # Backends print warnings; keep stdout clean for the event stream
+    sys.stdout = sys.stderr
+
+    jobs = []
+    for path in args.specs:
+        try: jobs.extend(load_job_specs(path))
+        except (OSError, ValueError) as e:
+            events.emit("error", id=None, error=f"{path}: {e}")
+            return 2
+
+    invalid = 0
+    for job in jobs:
+        try: validate_job_spec(job)
+        except ValueError as e:
+            invalid += 1
+            events.emit("invalid", id=job.get("id") if isinstance(job, dict) else None, error=str(e))
+    if invalid or args.validate:
+        events.emit("summary", total=len(jobs), ok=0, failed=invalid, elapsed=0.0)
+        return 1 if invalid else 0
+
+    max_jobs = args.jobs or default_job_count(threads_per_job=4)
+    threads = args.threads or threads_per_job(min(max_jobs, len(jobs)))
+    defaults = {"exe_dir": args.ai_tools_dir or None}
+    if args.scratch_dir: defaults["frame_store"] = {"scratch_dir": os.path.abspath(args.scratch_dir)}
+
+    def run_one(job):
+        started = time.monotonic()
+        events.emit("start", id=job["id"], op=job["op"])
+        try:
+            with tracing.span(f"job: {job['id']}", cat="job", op=job["op"]):
+                result = run_job_spec(job, progress=lambda info: events.progress(job["id"], info), threads=threads, defaults=defaults)
+        except (Exception, JobCancelled) as e:
+            events.emit("done", id=job["id"], ok=False, error=str(e), elapsed=round(time.monotonic() - started, 2))
+            raise
+        events.emit("done", id=job["id"], ok=True, result=result, elapsed=round(time.monotonic() - started, 2))
+        return result
+
+    # Children run in their own process groups, so Ctrl+C / SIGTERM must stop them through the token
+    token = CancelToken()
+    set_current_token(token)
+    def on_signal(signum, frame):
+        if not token.cancelled: events.emit("cancelling", id=None, signal=signum)
+        token.cancel()
+    signal.signal(signal.SIGINT, on_signal)
+    if hasattr(signal, "SIGTERM"): signal.signal(signal.SIGTERM, on_signal)
+
+    started = time.monotonic()
+    if args.workers:
+        coordinator = Coordinator([a.strip() for a in args.workers.split(",") if a.strip()], transfer=args.transfer,
+                                  secret=args.worker_secret, max_attempts=args.max_attempts, on_event=events.emit,
+                                  on_progress=events.progress)
+        try: results = coordinator.run(jobs)
+        except ConnectionError as e:
+            events.emit("error", id=None, error=str(e))
+            return 2
+    else:
+        results = run_parallel(jobs, run_one, max_jobs)
+    ok = sum(1 for success, _ in results if success)
+    events.emit("summary", total=len(jobs), ok=ok, failed=len(jobs) - ok, elapsed=round(time.monotonic() - started, 2),
+                cancelled=token.cancelled)
+    if token.cancelled: return 130
+    return 0 if ok == len(jobs) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+import os
+import math
+import shutil
+from ffmpeg_utils import probe_media, run_ffmpeg, FFmpegProgress
+from frame_store import FrameStore
+from cancellation import JobCancelled
+from process_supervisor import run_process
+from tracing import span, traced
+from result_cache import cached_result
+import media_backends as mb
+
+# --- Fused Pipelines (no GUI imports) ---
+# Chains of operations run as ONE ffmpeg filter graph: one decode, one encode, no
+# lossy intermediate files.
+#
+#   run_pipeline("in.mp4", "out.mp4", [
+#       {"op": "upscale", "scale_factor": 2},
+#       {"op": "interpolate", "target_fps": 60},
+#       {"op": "resize", "width": 1920, "height": 1080, "mode": "fit"},
+#       {"op": "format", "quality": "High", "speed": "Slow"}])
+#
+# Every trim is moved to the front as one input seek (-ss/-t). The other steps keep
+# timestamps, and "speed" only rescales them, so each trim maps back to a single
+# window of the source. AI steps (upscale_ai, interpolate with method "rife") cannot
+# run inside ffmpeg; they split the chain into stages. The ncnn tools only read and
+# write frame folders, so stages hand over raw frames through one FrameStore (RAM
+# disk when enabled) instead of encoded intermediate videos.
+
+PIPELINE_OPS = ["upscale", "upscale_ai", "interpolate", "resize", "trim", "speed", "format"]
+QUALITY_CRF = {"High": "18", "Medium": "23", "Low": "28"}
+PRESETS = {"Ultrafast": "ultrafast", "Fast": "fast", "Medium": "medium", "Slow": "slow"}
+
+# Rough relative cost of each stage kind, used to split the progress bar
+_STAGE_WEIGHT = {"ffmpeg": 1.0, "upscale_ai": 4.0, "rife": 2.0}
+
+def is_ai_step(step):
+    return step.get("op") == "upscale_ai" or (step.get("op") == "interpolate" and step.get("method") == "rife")
+
+def validate_steps(steps):
+    """Raises ValueError describing the first problem with a step list."""
+    if not isinstance(steps, list) or not steps: raise ValueError("pipeline needs a non-empty 'steps' list")
+    for n, step in enumerate(steps, 1):
+        if not isinstance(step, dict): raise ValueError(f"step {n} must be an object")
+        op = step.get("op")
+        if op not in PIPELINE_OPS:
+            raise ValueError(f"step {n}: unknown op '{op}' (expected one of: {', '.join(PIPELINE_OPS)})")
+        if op == "format" and n != len(steps): raise ValueError(f"step {n}: 'format' must be the last step")
+        if op == "resize" and not (step.get("width") and step.get("height")):
+            raise ValueError(f"step {n}: resize needs 'width' and 'height'")
+        if op == "speed" and not float(step.get("factor", 0)) > 0: raise ValueError(f"step {n}: speed needs a 'factor' > 0")
+        if op == "trim":
+            start, end = float(step.get("start", 0)), step.get("end")
+            if start < 0 or (end is not None and float(end) <= start):
+                raise ValueError(f"step {n}: trim needs 0 <= start < end")
+        if op == "interpolate" and step.get("method") == "rife" and step.get("multiplier", 2) not in (2, 4):
+            raise ValueError(f"step {n}: RIFE multiplier must be 2 or 4")
+
+def atempo_chain(factor):
+    """atempo only accepts 0.5-2.0 (per instance), so larger changes are chained."""
+    filters = []
+    while factor > 2.0: filters.append("atempo=2.0"); factor /= 2.0
+    while factor < 0.5: filters.append("atempo=0.5"); factor /= 0.5
+    if abs(factor - 1.0) > 1e-9: filters.append(f"atempo={factor:.6g}")
+    return filters
+
+def plan_pipeline(steps, info):
+    """
+    Compiles steps into stages:
+    {"window": (start, end|None), "audio_filters": [...], "encode": {...}, "out_duration": s,
+     "stages": [{"kind": "ffmpeg", "filters": [...], "fps": in_fps, "duration": out_s},
+                {"kind": "upscale_ai" | "rife", "step": {...}, "width", "height", "fps", "frames"}, ...]}
+    The first and last stages are always ffmpeg stages (decode / encode).
+    """
+    fps = info.get("fps") or 30.0
+    width, height = info.get("width", 0), info.get("height", 0)
+    start, end = 0.0, None  # source window; end stays None unless a trim sets it
+    rate = 1.0  # product of the speed factors so far (output time = source time / rate)
+    audio_filters, encode = [], {}
+    stages = [{"kind": "ffmpeg", "filters": [], "fps": fps, "rate": rate}]
+
+    for step in steps:
+        op = step["op"]
+        if op == "trim":
+            # Map the trim (in the current timeline) back to source time
+            new_start = start + float(step.get("start", 0)) * rate
+            if step.get("end") is not None:
+                new_end = start + float(step["end"]) * rate
+                end = min(end, new_end) if end is not None else new_end
+            start = new_start
+            if end is not None and end <= start: raise ValueError("trim steps leave nothing of the clip")
+            continue
+        if op == "format":
+            encode = dict(step); continue
+
+        if is_ai_step(step):
+            kind = "upscale_ai" if op == "upscale_ai" else "rife"
+            stages.append({"kind": kind, "step": step, "width": width, "height": height, "fps": fps, "rate": rate})
+            if kind == "upscale_ai":
+                factor = int(step.get("scale_factor", 2))
+                width, height = width * factor, height * factor
+            else:
+                fps = fps * int(step.get("multiplier", 2))
+            stages.append({"kind": "ffmpeg", "filters": [], "fps": fps, "rate": rate})
+            continue
+
+        filters = stages[-1]["filters"]
+        if op == "upscale":
+            filters.append(mb.upscale_filter(step.get("scale_factor", 2), step.get("width"), step.get("height"),
+                                             step.get("algo", "lanczos"), step.get("sharpen", True)))
+            if step.get("width") and step.get("height"): width, height = int(step["width"]), int(step["height"])
+            else: width, height = int(width * float(step.get("scale_factor", 2))), int(height * float(step.get("scale_factor", 2)))
+        elif op == "resize":
+            filters.append(mb.resize_filter(step["width"], step["height"], step.get("mode", "fit"), step.get("anchor", "center")))
+            width, height = int(step["width"]), int(step["height"])
+        elif op == "interpolate":
+            fps = float(step.get("target_fps", 60))
+            filters.append(mb.minterpolate_filter(step.get("target_fps", 60)))
+        elif op == "speed":
+            factor = float(step["factor"])
+            filters.append(f"setpts=PTS/{factor:.6g}")
+            audio_filters.extend(atempo_chain(factor))
+            rate *= factor
+        stages[-1]["rate"] = rate
+
+    # An AI step directly after another one leaves an empty ffmpeg stage between them; drop it
+    stages = [s for i, s in enumerate(stages)
+              if not (s["kind"] == "ffmpeg" and not s["filters"] and 0 < i < len(stages) - 1)]
+    source_end = end if end is not None else (info.get("duration") or None)
+    window = source_end - start if source_end else None  # seconds of source used (None = unknown)
+    if window is not None and window <= 0: raise ValueError("trim starts after the end of the clip")
+    for stage in stages:
+        seconds = window / stage["rate"] if window else 0.0
+        if stage["kind"] == "ffmpeg": stage["duration"] = seconds
+        else: stage["frames"] = int(math.ceil(seconds * stage["fps"]))
+    return {"window": (start, end), "stages": stages, "audio_filters": audio_filters, "encode": encode,
+            "out_duration": window / rate if window else 0.0}
+
+def encode_args(output_ext, quality="High", speed="Medium", threads=0):
+    """Final encoder args (same presets / CRFs as the Universal Converter)."""
+    if output_ext == ".webm":
+        args = ["-c:v", "libvpx-vp9", "-crf", "30", "-b:v", "0", "-c:a", "libopus", "-b:a", "160k"]
+    else:
+        args = ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-preset", PRESETS.get(speed, "medium"),
+                "-crf", QUALITY_CRF.get(quality, "18"), "-c:a", "aac", "-b:a", "192k"]
+    if threads: args.extend(["-threads", str(threads)])
+    return args
+
+def _estimate_scratch(store, stages):
+    """Peak frame-store bytes: the largest AI stage's input + output frames."""
+    peak = 0
+    for s in stages:
+        if s["kind"] == "upscale_ai":
+            factor = int(s["step"].get("scale_factor", 2))
+            need = store.estimate_bytes(s["width"], s["height"], s["frames"]) + \
+                   store.estimate_bytes(s["width"], s["height"], s["frames"], scale=factor)
+        elif s["kind"] == "rife":
+            mult = int(s["step"].get("multiplier", 2))
+            need = store.estimate_bytes(s["width"], s["height"], s["frames"] * (1 + mult + (mult // 2 if mult > 2 else 0)))
+        else: continue
+        peak = max(peak, need)
+    return peak
+
+def _stage_progress(progress, offset, share):
+    if not progress: return None
+    def callback(info):
+        if info.fraction is not None: progress(info._replace(fraction=offset + share * info.fraction))
+    return callback
+
+@traced("backend.pipeline")
+@cached_result("pipeline")
+def run_pipeline(input_path, output_path, steps, progress=None, exe_dir=None, frame_store=None, threads=0):
+    """
+    Runs `steps` (see PIPELINE_OPS) on input_path with one decode and one encode.
+    Returns output_path; raises on failure (ProcessFailed / RuntimeError / ValueError).
+    """
+    validate_steps(steps)
+    info = probe_media(input_path)
+    plan = plan_pipeline(steps, info)
+    stages = plan["stages"]
+    out_ext = os.path.splitext(output_path)[1].lower()
+    has_audio = out_ext != ".gif" and any(s.get("codec_type") == "audio" for s in info["streams"])
+
+    start, end = plan["window"]
+    source_args = (["-ss", f"{start:.6f}"] if start > 0 else []) + (["-t", f"{end - start:.6f}"] if end is not None else [])
+    source_args += ["-i", input_path]
+
+    weights = [_STAGE_WEIGHT[s["kind"]] for s in stages]
+    total_weight = sum(weights)
+    store = None
+    if len(stages) > 1:
+        default_format = "png" if any(s["kind"] == "rife" for s in stages) else "jpeg"
+        store = FrameStore.from_settings(frame_store, prefix="TEMP_PIPELINE", default_format=default_format)
+        scratch = _estimate_scratch(store, stages)
+        store.prepare(scratch)
+
+    def render():
+        # Frame folders are created in here: a full RAM disk restarts every stage on disk
+        frames_in = None  # (folder, file pattern) of the previous stage's frames
+        done = 0.0
+        for n, stage in enumerate(stages):
+            share = weights[n] / total_weight
+            last = n == len(stages) - 1
+
+            if stage["kind"] == "ffmpeg":
+                if frames_in is None: video_input = source_args
+                else: video_input = ["-framerate", f"{stage['fps']:.6g}", "-i", frames_in[1]]
+                chain = ",".join(stage["filters"])
+                cmd = ["ffmpeg", "-y", *video_input]
+                if not last:
+                    folder = store.subdir(f"stage{n}")
+                    if chain: cmd.extend(["-vf", chain])
+                    cmd.extend(["-an", *store.ffmpeg_args(), os.path.join(folder, f"frame_%08d.{store.ext}")])
+                    next_frames = (folder, os.path.join(folder, f"frame_%08d.{store.ext}"))
+                elif out_ext == ".gif":
+                    chain = f"{chain}," if chain else ""
+                    cmd.extend(["-filter_complex", f"[0:v]{chain}split[a][b];[a]palettegen[p];[b][p]paletteuse", "-an", output_path])
+                else:
+                    audio_input = 0
+                    if frames_in is not None and has_audio:
+                        cmd.extend(source_args); audio_input = 1
+                    if chain: cmd.extend(["-vf", chain])
+                    cmd.extend(["-map", "0:v:0"])
+                    if has_audio:
+                        cmd.extend(["-map", f"{audio_input}:a:0"])
+                        if plan["audio_filters"]: cmd.extend(["-af", ",".join(plan["audio_filters"])])
+                    else: cmd.append("-an")
+                    fmt = plan["encode"]
+                    cmd.extend(encode_args(out_ext, fmt.get("quality", "High"), fmt.get("speed", "Medium"), threads))
+                    cmd.append(output_path)
+                with span("pipeline.ffmpeg", stage=n, filters=len(stage["filters"])):
+                    run_ffmpeg(cmd, progress=_stage_progress(progress, done, share), duration=stage["duration"])
+                if frames_in is not None: shutil.rmtree(frames_in[0], ignore_errors=True)
+                if not last: frames_in = next_frames
+
+            else:
+                step = stage["step"]
+                folder = store.subdir(f"stage{n}")
+                if stage["kind"] == "upscale_ai":
+                    exe_path = mb.find_ai_tool("realesrgan-ncnn-vulkan", exe_dir)
+                    if not os.path.exists(exe_path): raise RuntimeError(f"Executable not found at: {exe_path}. Please set the correct path in Settings.")
+                    with span("pipeline.upscale_ai", stage=n, frames=stage["frames"]):
+                        mb.upscale_frames_ai(exe_path, frames_in[0], folder, int(step.get("scale_factor", 2)),
+                                             int(step.get("tile_size", 0)), out_format=store.ext)
+                        codeformer_cmd = mb.find_codeformer(exe_dir)
+                        if step.get("enhance_faces") and codeformer_cmd:
+                            with span("ai.codeformer"): run_process([codeformer_cmd, folder], check=True)
+                    pattern = os.path.join(folder, os.path.basename(frames_in[1]))  # realesrgan keeps the names
+                else:
+                    exe_path = mb.find_ai_tool("rife-ncnn-vulkan", exe_dir)
+                    if not os.path.exists(exe_path): raise RuntimeError(f"RIFE Executable not found at: {exe_path}. Please set path in Settings.")
+                    with span("pipeline.rife", stage=n, frames=stage["frames"]):
+                        mb.interpolate_frames_rife(exe_path, frames_in[0], folder, int(step.get("multiplier", 2)), store.ext)
+                    pattern = os.path.join(folder, f"%08d.{store.ext}")
+                shutil.rmtree(frames_in[0], ignore_errors=True)
+                frames_in = (folder, pattern)
+                if progress: progress(FFmpegProgress(done + share, 0.0, None, None))
+            done += share
+
+    try:
+        if store: store.run(render, scratch)
+        else: render()
+        if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+            raise RuntimeError("Pipeline produced an empty output file")
+        return output_path
+    except JobCancelled:
+        try:
+            if os.path.isfile(output_path): os.remove(output_path)
+        except OSError: pass
+        raise
+    finally:
+        if store: store.cleanup()
+
+@traced("backend.enhance_video_ai")
+def enhance_video_ai_backend(input_path, output_path, scale_factor=2, multiplier=2, interpolate_first=False,
+                             enhance_faces=False, tile_size=0, exe_dir=None, frame_store=None, quality="High", progress=None):
+    """
+    Real-ESRGAN upscale + RIFE interpolation as one job: frames are extracted once,
+    handed from one tool to the other inside a single FrameStore, and encoded once.
+    interpolate_first runs RIFE on the small source frames (cheaper) and upscales after.
+    Returns output_path, raises on failure.
+    """
+    upscale = {"op": "upscale_ai", "scale_factor": int(scale_factor), "tile_size": int(tile_size), "enhance_faces": bool(enhance_faces)}
+    smooth = {"op": "interpolate", "method": "rife", "multiplier": int(multiplier)}
+    steps = [smooth, upscale] if interpolate_first else [upscale, smooth]
+    steps.append({"op": "format", "quality": quality})
+    return run_pipeline(input_path, output_path, steps, progress=progress, exe_dir=exe_dir, frame_store=frame_store)
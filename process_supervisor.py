@@ -0,0 +1,226 @@
+import os
+import sys
+import time
+import queue
+import signal
+import asyncio
+import threading
+import subprocess
+from collections import deque, namedtuple
+from cancellation import current_token, check_cancelled, process_group_kwargs
+from tracing import span
+
+# --- Process Supervisor (no GUI imports) ---
+# Every ffmpeg / ffprobe / AI child process is launched and watched by one asyncio
+# loop on a background thread. The loop reads stdout/stderr of all children, queues
+# the lines for their callers, enforces timeouts and kills process trees, so running
+# dozens of encodes costs one thread instead of a reader thread (or two) per process.
+# Callers stay synchronous: run_process() / run_ffmpeg() block until the child exits.
+# Line callbacks run on the calling thread, so a callback that waits on the Tk main
+# thread never stalls the other children.
+
+PROBE_TIMEOUT = 60  # ffprobe on a stalled network share should not hang a job forever
+_LINE_LIMIT = 1024 * 1024  # AI tools print long progress lines without newlines
+
+def hidden_window_kwargs():
+    """Popen kwargs that stop a console window flashing up on Windows ({} elsewhere)."""
+    if os.name != 'nt': return {}
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    return {"startupinfo": startupinfo}
+
+# NTSTATUS codes the ncnn/Vulkan tools die with when the GPU driver gives up
+_WINDOWS_CRASH_CODES = {
+    0xC0000005: "access violation", 0xC00000FD: "stack overflow", 0xC0000409: "stack buffer overrun",
+    0xC000001D: "illegal instruction", 0xC0000135: "DLL not found", 0xC0000142: "DLL init failed",
+}
+
+def describe_exit(returncode):
+    """'exit code 1', 'killed by SIGKILL', 'crashed (access violation, 0xC0000005)'..."""
+    if returncode is None: return "still running"
+    if returncode == 0: return "exited normally"
+    code = returncode & 0xFFFFFFFF
+    if code in _WINDOWS_CRASH_CODES: return f"crashed ({_WINDOWS_CRASH_CODES[code]}, 0x{code:08X})"
+    if returncode < 0:
+        try: return f"killed by {signal.Signals(-returncode).name}"
+        except ValueError: return f"killed by signal {-returncode}"
+    return f"exit code {returncode}"
+
+
+class ProcessFailed(subprocess.CalledProcessError):
+    """
+    CalledProcessError with exit diagnostics (callers catching CalledProcessError keep working).
+    stderr holds the last lines of the log, str() is a one-line summary.
+    """
+    def __init__(self, returncode, cmd, output=None, stderr=None, elapsed=0.0, timed_out=None):
+        super().__init__(returncode, cmd, output=output, stderr=stderr)
+        self.elapsed = elapsed
+        self.timed_out = timed_out
+
+    @property
+    def diagnostics(self):
+        lines = [l.strip() for l in (self.stderr or "").splitlines() if l.strip()]
+        reason = self.timed_out or describe_exit(self.returncode)
+        text = f"{os.path.basename(str(self.cmd[0]))} {reason} after {self.elapsed:.1f}s"
+        return text + (f": {lines[-1]}" if lines else "")
+
+    def __str__(self):
+        return self.diagnostics
+
+class ProcessTimeout(ProcessFailed):
+    pass
+
+
+# returncode, stdout (None unless captured), stderr (last lines), elapsed seconds
+ProcessResult = namedtuple("ProcessResult", ["cmd", "returncode", "stdout", "stderr", "elapsed"])
+
+class _Handle:
+    """What a CancelToken holds for a supervised child: kill_tree() is safe from any thread."""
+    def __init__(self, supervisor, process):
+        self.supervisor = supervisor
+        self.process = process
+        self.pid = process.pid
+
+    def kill_tree(self):
+        asyncio.run_coroutine_threadsafe(self.supervisor._terminate(self.process), self.supervisor._loop)
+
+
+def _use_pidfd_watcher(loop):
+    # Before 3.12 asyncio waits for every child on its own waitpid thread; a pidfd
+    # lets the loop itself notice the exit (Linux 5.3+). 3.12+ picks this by default.
+    if sys.version_info >= (3, 12) or not hasattr(os, "pidfd_open") or not hasattr(asyncio, "PidfdChildWatcher"): return
+    try: os.close(os.pidfd_open(os.getpid()))
+    except OSError: return
+    watcher = asyncio.PidfdChildWatcher()
+    watcher.attach_loop(loop)
+    asyncio.set_child_watcher(watcher)
+
+
+class ProcessSupervisor:
+    def __init__(self, tail_lines=40, kill_grace=3.0):
+        self.tail_lines = tail_lines
+        self.kill_grace = kill_grace
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is not None: return self._loop
+            loop = asyncio.new_event_loop()
+            _use_pidfd_watcher(loop)
+            threading.Thread(target=loop.run_forever, name="process-supervisor", daemon=True).start()
+            self._loop = loop
+            return loop
+
+    def run(self, cmd, on_stdout=None, on_stderr=None, capture_stdout=False, timeout=None, idle_timeout=None, **popen_kwargs):
+        """
+        Runs cmd to completion and returns a ProcessResult (a non-zero exit is not an error here).
+        on_stdout / on_stderr get each decoded line. timeout: seconds of wall time;
+        idle_timeout: seconds without any output. Either kills the process tree and
+        raises ProcessTimeout. The current job's CancelToken can kill it too (JobCancelled).
+        """
+        check_cancelled()
+        cmd = [str(c) for c in cmd]
+        lines = queue.SimpleQueue()
+        def relay(callback):
+            return (lambda line: lines.put((callback, line))) if callback else None
+        with span(f"process.{os.path.splitext(os.path.basename(cmd[0]))[0]}", cat="process") as trace:
+            future = asyncio.run_coroutine_threadsafe(
+                self._supervise(cmd, relay(on_stdout), relay(on_stderr), capture_stdout, timeout, idle_timeout, current_token(), popen_kwargs),
+                self._ensure_loop())
+            # Every line is queued before the coroutine finishes, so None comes last
+            future.add_done_callback(lambda f: lines.put(None))
+            while True:
+                item = lines.get()
+                if item is None: break
+                callback, line = item
+                try: callback(line)
+                except Exception as e: print(f"Process output callback error: {e}")
+            result, timed_out = future.result()
+            trace.set(returncode=result.returncode, timed_out=bool(timed_out))
+        check_cancelled()
+        if timed_out:
+            raise ProcessTimeout(result.returncode, cmd, output=result.stdout, stderr=result.stderr,
+                                 elapsed=result.elapsed, timed_out=timed_out)
+        return result
+
+    async def _supervise(self, cmd, on_stdout, on_stderr, capture_stdout, timeout, idle_timeout, token, popen_kwargs):
+        started = time.monotonic()
+        kwargs = dict(hidden_window_kwargs())
+        kwargs.update(process_group_kwargs())
+        kwargs.update(popen_kwargs)
+        process = await asyncio.create_subprocess_exec(*cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                                       stderr=subprocess.PIPE, limit=_LINE_LIMIT, **kwargs)
+        handle = _Handle(self, process)
+        if token is not None: token.attach(handle)
+
+        stdout_lines = [] if capture_stdout else None
+        stderr_tail = deque(maxlen=self.tail_lines)
+        last_output = [started]
+
+        async def pump(stream, sink, callback):
+            while True:
+                try: raw = await stream.readline()
+                except ValueError: continue  # readline drops a line longer than the limit; keep going
+                if not raw: return
+                last_output[0] = time.monotonic()
+                line = raw.decode("utf-8", errors="replace")
+                if sink is not None: sink.append(line)
+                if callback is not None: callback(line)
+
+        pumps = asyncio.ensure_future(asyncio.gather(pump(process.stdout, stdout_lines, on_stdout),
+                                                     pump(process.stderr, stderr_tail, on_stderr)))
+        timed_out = None
+        try:
+            while not pumps.done():
+                await asyncio.wait({pumps}, timeout=1.0)
+                if pumps.done(): break
+                now = time.monotonic()
+                if timeout and now - started > timeout:
+                    timed_out = f"timed out (limit {timeout:g}s)"
+                elif idle_timeout and now - last_output[0] > idle_timeout:
+                    timed_out = f"stalled (no output for {idle_timeout:g}s)"
+                if timed_out:
+                    await self._terminate(process)
+                    break
+            await pumps
+            returncode = await process.wait()
+        finally:
+            if token is not None: token.detach(handle)
+
+        stdout = "".join(stdout_lines) if stdout_lines is not None else None
+        return ProcessResult(cmd, returncode, stdout, "".join(stderr_tail), time.monotonic() - started), timed_out
+
+    async def _terminate(self, process):
+        """SIGTERM to the process group, SIGKILL after kill_grace. Windows: taskkill /T /F."""
+        if process.returncode is not None: return
+        try:
+            if os.name == 'nt':
+                killer = await asyncio.create_subprocess_exec("taskkill", "/T", "/F", "/PID", str(process.pid),
+                                                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                                              **hidden_window_kwargs())
+                await killer.wait()
+                return
+            os.killpg(process.pid, signal.SIGTERM)
+            try: await asyncio.wait_for(process.wait(), self.kill_grace)
+            except asyncio.TimeoutError: os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError, OSError) as e:
+            print(f"Kill failed for pid {process.pid}: {e}")
+
+
+_supervisor = ProcessSupervisor()
+
+def get_supervisor():
+    return _supervisor
+
+def run_process(cmd, check=False, capture_output=False, timeout=None, idle_timeout=None, on_stderr=None, **popen_kwargs):
+    """
+    subprocess.run() replacement backed by the supervisor. Output is always text;
+    stdout is only kept with capture_output, stderr always holds the last log lines.
+    check=True raises ProcessFailed (a CalledProcessError) with exit diagnostics.
+    """
+    result = _supervisor.run(cmd, on_stderr=on_stderr, capture_stdout=capture_output, timeout=timeout,
+                             idle_timeout=idle_timeout, **popen_kwargs)
+    if check and result.returncode:
+        raise ProcessFailed(result.returncode, result.cmd, output=result.stdout, stderr=result.stderr, elapsed=result.elapsed)
+    return subprocess.CompletedProcess(result.cmd, result.returncode, result.stdout, result.stderr)
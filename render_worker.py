@@ -0,0 +1,514 @@
+import os
+import sys
+import json
+import hmac
+import time
+import copy
+import shutil
+import signal
+import socket
+import argparse
+import ipaddress
+import tempfile
+import threading
+from collections import deque
+from ffmpeg_utils import FFmpegProgress
+from batch_pool import default_job_count, threads_per_job
+from job_specs import run_job_spec
+from cancellation import CancelToken, JobCancelled, current_token, set_current_token
+import tracing
+import result_cache
+
+# --- Render Workers (no GUI imports) ---
+# Runs job specs (job_specs.py) on other processes or machines. A worker listens on
+# a TCP port or a Unix socket; a Coordinator (media_cli.py --workers ...) connects to
+# every worker and hands out the jobs. Messages are JSON lines; a message that
+# announces "files" is followed by the raw bytes of those files, in order.
+#
+#   MEDIA_WORKER_SECRET=... python render_worker.py --listen 0.0.0.0:7601 --slots 2
+#   python render_worker.py --listen unix:/tmp/worker1.sock
+#
+#   coordinator -> worker   {"type": "hello", "version": 1, "secret": "..."}
+#   worker -> coordinator   {"type": "hello", "version": 1, "worker": "host:pid", "slots": 2}
+#   coordinator -> worker   {"type": "job", "seq": 3, "spec": {...}, "attempt": 1, "files": [{"name": "a.mov", "size": 123}]}
+#   worker -> coordinator   {"type": "progress", "seq": 3, "fraction": 0.4, "out_time": 12.0, "speed": 2.1, "eta": 30.0}
+#   worker -> coordinator   {"type": "done", "seq": 3, "ok": true, "result": "...", "files": [...]}
+#   coordinator -> worker   {"type": "cancel", "seq": 3}
+#   worker -> coordinator   {"type": "ping"}   (every HEARTBEAT_INTERVAL seconds)
+#
+# With "shared" transfer the spec paths are used as they are (shared storage mounted
+# at the same path everywhere). With "stream" the inputs are sent over the connection
+# and the output comes back in the "done" message.
+#
+# Each worker has its own queue of jobs. A worker whose queue runs dry steals from
+# the back of the longest queue. When a worker drops its connection or stops sending
+# heartbeats, its running jobs go back into the queues (up to max_attempts).
+#
+# A worker only listens beyond loopback with a secret set. The AI tool folder and the
+# frame store come from the worker's own flags; a coordinator cannot pick them.
+
+PROTOCOL_VERSION = 1
+DEFAULT_ADDRESS = "127.0.0.1:7601"
+HEARTBEAT_INTERVAL = 5.0
+HEARTBEAT_TIMEOUT = 30.0   # no message for this long = the worker is gone
+CONNECT_TIMEOUT = 10.0
+MAX_LINE = 16 * 1024 * 1024
+_CHUNK = 1024 * 1024
+
+# Ops whose only output is spec["output"]; others write several files and need shared storage
+# Options only the worker's own config may set: they choose which executables run and where frames go
+WORKER_ONLY_OPTIONS = {"exe_dir", "frame_store"}
+
+STREAMABLE_OPS = {"combine", "convert", "gif", "upscale", "upscale_ai", "interpolate", "crop", "pipeline", "enhance_ai"}
+
+
+def parse_address(text):
+    """'unix:/path' or a path -> (AF_UNIX, path); 'host:port' or ':port' -> (AF_INET, (host, port))."""
+    if text.startswith("unix:"): return socket.AF_UNIX, text[5:]
+    if "/" in text or os.sep in text: return socket.AF_UNIX, text
+    host, _, port = text.rpartition(":")
+    try: return socket.AF_INET, (host or "127.0.0.1", int(port))
+    except ValueError: raise ValueError(f"Bad worker address '{text}' (expected host:port or unix:/path)")
+
+def is_local_address(text):
+    """True for Unix sockets and loopback TCP addresses (only this machine can connect)."""
+    family, target = parse_address(text)
+    if family == socket.AF_UNIX: return True
+    host = target[0].strip("[]")
+    if host == "localhost": return True
+    try: return ipaddress.ip_address(host).is_loopback
+    except ValueError: return False
+
+def connect(address, timeout=CONNECT_TIMEOUT):
+    family, target = parse_address(address)
+    if family == socket.AF_INET: return socket.create_connection(target, timeout=timeout)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try: sock.connect(target)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+def listen(address):
+    family, target = parse_address(address)
+    if family == socket.AF_INET: return socket.create_server(target)
+    if os.path.exists(target): os.remove(target)  # stale socket from a killed worker
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(target)
+    server.listen()
+    return server
+
+
+class Connection:
+    """JSON-lines framing over a stream socket, plus raw file payloads. send() is thread-safe."""
+    def __init__(self, sock):
+        self.sock = sock
+        self.reader = sock.makefile('rb')
+        self.lock = threading.Lock()
+
+    def send(self, msg, paths=()):
+        """Sends msg; with paths, msg gets a "files" list and the file bytes follow it."""
+        if paths: msg = dict(msg, files=[{"name": os.path.basename(p), "size": os.path.getsize(p)} for p in paths])
+        data = (json.dumps(msg, default=str) + "\n").encode("utf-8")
+        with self.lock:
+            self.sock.sendall(data)
+            for path, info in zip(paths, msg.get("files", [])):
+                with open(path, 'rb') as f: sent = self.sock.sendfile(f, count=info["size"])
+                if sent != info["size"]: raise ConnectionError(f"{os.path.basename(path)} changed while it was sent")
+
+    def recv(self):
+        line = self.reader.readline(MAX_LINE)
+        if not line: raise ConnectionError("connection closed")
+        if not line.endswith(b"\n"): raise ConnectionError("message too long")
+        return json.loads(line)
+
+    def recv_files(self, msg, folder):
+        """Reads the payload announced by msg["files"] into folder. Returns the written paths."""
+        paths = []
+        for info in msg.get("files") or []:
+            path = os.path.join(folder, os.path.basename(info["name"]) or "file")
+            remaining = int(info["size"])
+            with open(path, 'wb') as f:
+                while remaining:
+                    chunk = self.reader.read(min(_CHUNK, remaining))
+                    if not chunk: raise ConnectionError("connection closed during file transfer")
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            paths.append(path)
+        return paths
+
+    def close(self):
+        try: self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError: pass
+        self.sock.close()
+
+
+# --- Worker ---
+
+class RenderWorker:
+    def __init__(self, slots=0, threads=0, defaults=None, work_dir="", secret="", progress_interval=0.5):
+        self.slots = slots or default_job_count(threads_per_job=4)
+        self.threads = threads or threads_per_job(self.slots)
+        self.defaults = defaults or {}
+        self.work_dir = work_dir or os.path.join(tempfile.gettempdir(), "media_worker")
+        self.secret = secret
+        self.progress_interval = progress_interval
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.tokens = set()
+        self.conns = set()
+        self.stopping = False
+        self.lock = threading.Lock()
+
+    def serve(self, address):
+        """Accepts coordinators until stop() (or a signal) closes the server socket."""
+        self.server = listen(address)
+        print(f"Render worker {self.name} listening on {address} ({self.slots} slot(s))", file=sys.stderr)
+        while True:
+            try: sock, _ = self.server.accept()
+            except OSError: break
+            threading.Thread(target=self.handle, args=(sock,), daemon=True).start()
+
+    def stop(self):
+        """
+        Stops accepting connections, drops every coordinator connection and kills the
+        running jobs. The coordinators see a lost worker and requeue those jobs elsewhere.
+        """
+        with self.lock:
+            self.stopping = True
+            conns, tokens = list(self.conns), list(self.tokens)
+        try: self.server.close()
+        except (OSError, AttributeError): pass
+        # Close first: a killed job must not reach its coordinator as a final "done"
+        for conn in conns: conn.close()
+        for token in tokens: token.cancel()
+
+    def handle(self, sock):
+        sock.settimeout(None)
+        conn = Connection(sock)
+        running = {}  # seq -> CancelToken
+        closed = threading.Event()
+        with self.lock:
+            if self.stopping:
+                conn.close()
+                return
+            self.conns.add(conn)
+        try:
+            hello = conn.recv()
+            if hello.get("type") != "hello" or not hmac.compare_digest(str(hello.get("secret", "")), self.secret):
+                conn.send({"type": "error", "error": "bad hello or secret"})
+                return
+            conn.send({"type": "hello", "version": PROTOCOL_VERSION, "worker": self.name, "slots": self.slots})
+            threading.Thread(target=self._heartbeat, args=(conn, closed), daemon=True).start()
+            while True:
+                msg = conn.recv()
+                kind = msg.get("type")
+                if kind == "job":
+                    if self.stopping: break  # shutting down: the coordinator requeues it
+                    self._start_job(conn, msg, running)
+                elif kind == "cancel":
+                    token = running.get(msg.get("seq"))
+                    if token: token.cancel()
+                elif kind == "bye":
+                    break
+        except (OSError, ValueError) as e:
+            if running and not self.stopping: print(f"Coordinator connection lost ({e}); cancelling {len(running)} job(s)", file=sys.stderr)
+        finally:
+            closed.set()
+            # Jobs of a lost coordinator are retried elsewhere; stop them here
+            for token in list(running.values()): token.cancel()
+            with self.lock: self.conns.discard(conn)
+            conn.close()
+
+    def _heartbeat(self, conn, closed):
+        while not closed.wait(HEARTBEAT_INTERVAL):
+            try: conn.send({"type": "ping"})
+            except OSError: return
+
+    def _start_job(self, conn, msg, running):
+        seq, spec = msg["seq"], copy.deepcopy(msg["spec"])
+        options = spec.get("options")
+        if isinstance(options, dict):
+            spec["options"] = {k: v for k, v in options.items() if k not in WORKER_ONLY_OPTIONS}
+        os.makedirs(self.work_dir, exist_ok=True)
+        job_dir = tempfile.mkdtemp(prefix=f"job_{seq}_", dir=self.work_dir) if msg.get("files") else None
+        if job_dir:
+            # Streamed inputs are read here, on the connection thread, before the next message
+            in_dir = os.path.join(job_dir, "in")
+            os.makedirs(in_dir)
+            inputs = conn.recv_files(msg, in_dir)
+            if spec["op"] == "combine": spec["inputs"] = inputs
+            else: spec["input"] = inputs[0]
+            spec["output"] = os.path.join(job_dir, "out", os.path.basename(spec["output"]))
+        token = CancelToken()
+        running[seq] = token
+        with self.lock: self.tokens.add(token)
+        threading.Thread(target=self._run_job, args=(conn, seq, spec, job_dir, token, running), daemon=True).start()
+
+    def _run_job(self, conn, seq, spec, job_dir, token, running):
+        set_current_token(token)
+        last = [0.0]
+        def on_progress(info):
+            now = time.monotonic()
+            if info.fraction != 1.0 and now - last[0] < self.progress_interval: return
+            last[0] = now
+            try: conn.send({"type": "progress", "seq": seq, "fraction": info.fraction, "out_time": info.out_time,
+                            "speed": info.speed, "eta": info.eta})
+            except OSError: pass
+        try:
+            try:
+                with tracing.span(f"job: {spec.get('id', seq)}", cat="job", op=spec.get("op")):
+                    result = run_job_spec(spec, progress=on_progress, threads=self.threads, defaults=self.defaults)
+                reply, paths = {"type": "done", "seq": seq, "ok": True, "result": result}, ()
+                if job_dir: paths = (spec["output"],)
+            except (Exception, JobCancelled) as e:
+                reply, paths = {"type": "done", "seq": seq, "ok": False, "error": str(e) or type(e).__name__}, ()
+            if self.stopping: return  # the coordinator retries it on another worker
+            try: conn.send(reply, paths)
+            except OSError as e: print(f"Could not report job {seq}: {e}", file=sys.stderr)
+        finally:
+            running.pop(seq, None)
+            with self.lock: self.tokens.discard(token)
+            if job_dir: shutil.rmtree(job_dir, ignore_errors=True)
+
+
+# --- Coordinator ---
+
+class _Remote:
+    """One connected worker as the coordinator sees it."""
+    def __init__(self, address, conn, info):
+        self.address = address
+        self.conn = conn
+        self.worker = info.get("worker", address)
+        self.slots = max(1, int(info.get("slots") or 1))
+        self.queue = deque()
+        self.running = {}  # seq -> started (monotonic)
+        self.alive = True
+
+
+class Coordinator:
+    """
+    Runs job specs on remote workers. run(jobs) returns [(ok, result_or_error), ...] in
+    job order, like batch_pool.run_parallel. on_event(event, **fields) gets start / done /
+    retry / steal / worker_lost events; on_progress(job_id, FFmpegProgress) the progress.
+    The calling thread's CancelToken cancels the remote jobs.
+    """
+    def __init__(self, addresses, transfer="shared", secret="", max_attempts=3, on_event=None, on_progress=None):
+        self.addresses = list(addresses)
+        self.transfer = transfer
+        self.secret = secret
+        self.max_attempts = max_attempts
+        self.on_event = on_event or (lambda event, **fields: None)
+        self.on_progress = on_progress
+        self.cond = threading.Condition()
+        self.remotes = []
+
+    def _connect(self, address):
+        sock = connect(address)
+        sock.settimeout(HEARTBEAT_TIMEOUT)
+        conn = Connection(sock)
+        try:
+            conn.send({"type": "hello", "version": PROTOCOL_VERSION, "secret": self.secret})
+            info = conn.recv()
+            if info.get("type") != "hello": raise ConnectionError(info.get("error") or "unexpected reply")
+            if info.get("version") != PROTOCOL_VERSION: raise ConnectionError(f"protocol version {info.get('version')}")
+        except (OSError, ValueError):
+            conn.close()
+            raise
+        return _Remote(address, conn, info)
+
+    def _streamed(self, job):
+        return job.get("transfer", self.transfer) == "stream"
+
+    def run(self, jobs):
+        self.jobs = list(jobs)
+        self.results = [None] * len(self.jobs)
+        self.attempts = [0] * len(self.jobs)
+        self.unresolved = len(self.jobs)
+        self.cancelled = False
+        token = current_token()
+
+        for address in self.addresses:
+            try: self.remotes.append(self._connect(address))
+            except (OSError, ValueError) as e: self.on_event("worker_lost", worker=address, error=f"connect failed: {e}")
+        if not self.remotes: raise ConnectionError("No render worker could be reached")
+
+        # Deal the jobs out by slots; stealing evens out whatever this gets wrong
+        seats = [r for r in self.remotes for _ in range(r.slots)]
+        with self.cond:
+            for seq, job in enumerate(self.jobs):
+                if self._streamed(job) and job.get("op") not in STREAMABLE_OPS:
+                    self._resolve(seq, False, f"{job.get('op')} writes several files; it needs shared storage")
+                else:
+                    seats[seq % len(seats)].queue.append(seq)
+
+        readers = [threading.Thread(target=self._serve_remote, args=(r,), daemon=True) for r in self.remotes]
+        for t in readers: t.start()
+        while True:
+            with self.cond:
+                if not self.unresolved: break
+                if not any(r.alive for r in self.remotes):
+                    for seq, result in enumerate(self.results):
+                        if result is None: self._resolve(seq, False, "Cancelled" if self.cancelled else "No render workers left")
+                    break
+                self.cond.wait(0.5)
+            if token is not None and token.cancelled and not self.cancelled: self._cancel_all()
+
+        with self.cond:
+            for r in self.remotes: r.alive = False  # the readers see the close below as the end, not a loss
+        for r in self.remotes:
+            try: r.conn.send({"type": "bye"})
+            except OSError: pass
+            r.conn.close()
+        for t in readers: t.join(timeout=5)
+        return self.results
+
+    def _resolve(self, seq, ok, value):
+        # Caller holds self.cond
+        if self.results[seq] is not None: return
+        self.results[seq] = (ok, value)
+        self.unresolved -= 1
+        self.cond.notify_all()
+
+    def _take(self, remote):
+        """Next job for remote: its own queue first, else steal from the back of the longest queue."""
+        if self.cancelled: return None
+        if remote.queue: return remote.queue.popleft()
+        victim = max(self.remotes, key=lambda r: len(r.queue))
+        if not victim.queue: return None
+        seq = victim.queue.pop()
+        self.on_event("steal", id=self.jobs[seq].get("id"), worker=remote.worker, victim=victim.worker)
+        return seq
+
+    def _dispatch(self, remote):
+        """Fills remote's free slots. Raises OSError if the worker cannot be reached."""
+        while True:
+            with self.cond:
+                if not remote.alive or len(remote.running) >= remote.slots: return
+                seq = self._take(remote)
+                if seq is None: return
+                remote.running[seq] = time.monotonic()
+                self.attempts[seq] += 1
+                attempt = self.attempts[seq]
+            job = self.jobs[seq]
+            self.on_event("start", id=job.get("id"), op=job.get("op"), worker=remote.worker, attempt=attempt)
+            paths = ()
+            if self._streamed(job): paths = tuple(job["inputs"]) if job.get("op") == "combine" else (job["input"],)
+            remote.conn.send({"type": "job", "seq": seq, "spec": job, "attempt": attempt}, paths)
+
+    def _serve_remote(self, remote):
+        download_dir = None
+        try:
+            self._dispatch(remote)
+            while remote.alive:
+                msg = remote.conn.recv()
+                kind = msg.get("type")
+                if kind == "progress":
+                    seq = msg.get("seq")
+                    if self.on_progress and seq in remote.running:
+                        self.on_progress(self.jobs[seq].get("id"), FFmpegProgress(msg.get("fraction"), msg.get("out_time") or 0.0,
+                                                                                   msg.get("speed"), msg.get("eta")))
+                elif kind == "done":
+                    seq = msg["seq"]
+                    value = msg.get("result") if msg.get("ok") else msg.get("error")
+                    if msg.get("files"):
+                        output = self.jobs[seq]["output"]
+                        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+                        download_dir = tempfile.mkdtemp(prefix=".download_", dir=os.path.dirname(os.path.abspath(output)))
+                        received = remote.conn.recv_files(msg, download_dir)
+                        os.replace(received[0], output)
+                        shutil.rmtree(download_dir, ignore_errors=True); download_dir = None
+                        value = output
+                    with self.cond:
+                        started = remote.running.pop(seq, None)
+                        if started is not None:
+                            self._resolve(seq, bool(msg.get("ok")), value)
+                    if started is not None:
+                        job = self.jobs[seq]
+                        elapsed = round(time.monotonic() - started, 2)
+                        if msg.get("ok"): self.on_event("done", id=job.get("id"), ok=True, result=value, elapsed=elapsed, worker=remote.worker)
+                        else: self.on_event("done", id=job.get("id"), ok=False, error=value, elapsed=elapsed, worker=remote.worker)
+                self._dispatch(remote)
+        except (OSError, ValueError) as e:
+            if remote.alive: self._lose(remote, e)
+        finally:
+            if download_dir: shutil.rmtree(download_dir, ignore_errors=True)
+
+    def _lose(self, remote, error):
+        """Worker gone: requeue its running jobs (they stay stealable in its queue) and wake the others."""
+        self.on_event("worker_lost", worker=remote.worker, error=str(error) or type(error).__name__)
+        with self.cond:
+            remote.alive = False
+            for seq in list(remote.running):
+                if self.cancelled:
+                    self._resolve(seq, False, "Cancelled")
+                elif self.attempts[seq] < self.max_attempts:
+                    remote.queue.appendleft(seq)
+                    self.on_event("retry", id=self.jobs[seq].get("id"), worker=remote.worker, attempt=self.attempts[seq] + 1)
+                else:
+                    self._resolve(seq, False, f"Worker lost {self.attempts[seq]} time(s): {error}")
+            remote.running.clear()
+            self.cond.notify_all()
+        remote.conn.close()
+        for other in self.remotes:
+            if other is remote or not other.alive: continue
+            try: self._dispatch(other)
+            except OSError: pass  # its own reader thread notices and handles the loss
+
+    def _cancel_all(self):
+        with self.cond:
+            self.cancelled = True
+            for r in self.remotes:
+                for seq in r.queue: self._resolve(seq, False, "Cancelled")
+                r.queue.clear()
+            running = [(r, seq) for r in self.remotes if r.alive for seq in r.running]
+        for r, seq in running:
+            try: r.conn.send({"type": "cancel", "seq": seq})
+            except OSError: pass
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Media Studio jobs to a coordinator (media_cli.py --workers).")
+    parser.add_argument("--listen", default=DEFAULT_ADDRESS, help="host:port or unix:/path/to.sock")
+    parser.add_argument("--slots", type=int, default=0, help="Jobs run at once (0 = auto)")
+    parser.add_argument("--threads", type=int, default=0, help="Encoder threads per job (0 = cores / slots)")
+    parser.add_argument("--ai-tools-dir", default="", help="Folder with realesrgan / rife executables")
+    parser.add_argument("--scratch-dir", default="", help="Where AI stages write intermediate frames")
+    parser.add_argument("--work-dir", default="", help="Where streamed inputs and outputs are kept while a job runs")
+    parser.add_argument("--secret", default=os.environ.get("MEDIA_WORKER_SECRET", ""),
+                        help="Shared secret coordinators must send (default: $MEDIA_WORKER_SECRET)")
+    parser.add_argument("--cache-dir", default="", help="Result cache folder (default: per-user cache)")
+    parser.add_argument("--no-cache", action="store_true", help="Always recompute; do not read or fill the result cache")
+    parser.add_argument("--trace", default="", help="Write a Chrome trace of every job here on exit")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.trace: tracing.enable(args.trace)
+    result_cache.configure({"enabled": not args.no_cache, "cache_dir": os.path.abspath(args.cache_dir) if args.cache_dir else ""})
+    # Backends print to stdout; keep it for nothing but the worker's own log
+    sys.stdout = sys.stderr
+    defaults = {"exe_dir": args.ai_tools_dir or None}
+    if args.scratch_dir: defaults["frame_store"] = {"scratch_dir": os.path.abspath(args.scratch_dir)}
+    if not args.secret and not is_local_address(args.listen):
+        print(f"Refusing to listen on {args.listen} without a secret: set --secret or MEDIA_WORKER_SECRET "
+              "(or listen on 127.0.0.1 / a Unix socket)", file=sys.stderr)
+        return 2
+    worker = RenderWorker(slots=args.slots, threads=args.threads, defaults=defaults,
+                          work_dir=os.path.abspath(args.work_dir) if args.work_dir else "", secret=args.secret)
+
+    # Children run in their own process groups: a signal must stop them through their tokens
+    def on_signal(signum, frame):
+        print(f"Render worker stopping (signal {signum})", file=sys.stderr)
+        worker.stop()
+    signal.signal(signal.SIGINT, on_signal)
+    if hasattr(signal, "SIGTERM"): signal.signal(signal.SIGTERM, on_signal)
+    try: worker.serve(args.listen)
+    except (OSError, ValueError) as e:
+        print(f"Render worker could not listen on {args.listen}: {e}", file=sys.stderr)
+        return 2
+    time.sleep(1.0)  # let the supervisor deliver the kills before the process exits
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
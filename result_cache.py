@@ -0,0 +1,370 @@
+import os
+import sys
+import json
+import time
+import inspect
+import hashlib
+import threading
+import functools
+import contextlib
+from conversion_manifest import file_sha256
+from ffmpeg_utils import FFmpegProgress
+from tracing import span
+
+# --- Result Cache (no GUI imports) ---
+# Memoizes backend outputs. The key is the SHA-256 of the source content plus the
+# canonicalized parameters of the call (and the output extension), so renaming or
+# copying a source still hits, and any changed option misses. Outputs live in one
+# size-capped directory with LRU eviction; a hit places the stored file at the
+# requested output path as a reflink (copy-on-write) or a plain copy. Hardlinked hits
+# are opt-in: they are instant on any filesystem, but every output served from the
+# same entry is then the same file on disk.
+#
+#   @cached_result("resize_clip", source="input_path", on_hit=lambda output: output)
+#   def resize_clip_backend(input_path, width, height, output_path, ...): ...
+
+RESULT_CACHE_VERSION = 1  # bump when the encoder settings behind an operation change
+INDEX_NAME = "index.json"
+LOCK_NAME = "index.lock"
+ORPHAN_GRACE = 3600  # unindexed objects / temp files older than this are leftovers of a crash
+MAX_HASH_MEMO = 5000
+
+DEFAULT_RESULT_CACHE_SETTINGS = {
+    "enabled": True,
+    "cache_dir": "",     # "" = per-user cache folder (see default_cache_dir)
+    "max_gb": 10.0,
+    "hardlink_hits": False,  # True: serve hits as hardlinks (instant, but outputs share one inode)
+}
+
+# Arguments that change how a backend runs, not what it writes
+NON_KEY_ARGS = {"logger", "progress", "threads", "exe_dir", "frame_store", "raise_on_error", "tile_size", "chunk_jobs"}
+
+def default_cache_dir():
+    if os.name == 'nt':
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "media_studio", "results")
+
+# --- Cross-Process Lock ---
+# The app, media_cli, render workers and the watch folder can share one cache; the
+# lock file serializes their index read-modify-write cycles.
+
+def _lock_file(f):
+    if os.name == 'nt':
+        import msvcrt
+        f.seek(0)
+        while True:
+            try: msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1); return
+            except OSError: time.sleep(0.05)  # LK_LOCK gives up after ~10 s; keep waiting
+    import fcntl
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+def _unlock_file(f):
+    if os.name == 'nt':
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        return
+    import fcntl
+    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+# --- Linking ---
+
+_FICLONE = 0x40049409  # linux/fs.h
+
+def _reflink(src, dst):
+    """Copy-on-write clone (Btrfs, XFS, bcachefs...). False where the filesystem cannot."""
+    if not sys.platform.startswith("linux"): return False
+    import fcntl
+    try:
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        return True
+    except OSError:
+        try: os.remove(dst)
+        except OSError: pass
+        return False
+
+def place_file(src, dst, hardlinks=True):
+    """
+    Puts a copy of src at dst (replacing it atomically): reflink, else hardlink, else copy.
+    Returns the method used.
+    """
+    import shutil
+    tmp = f"{dst}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if _reflink(src, tmp): method = "reflink"
+        else:
+            method = None
+            if hardlinks:
+                try: os.link(src, tmp); method = "hardlink"
+                except OSError: pass
+            if method is None:
+                shutil.copy2(src, tmp); method = "copy"
+        os.replace(tmp, dst)
+        return method
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+
+def _canonical(value):
+    """JSON-stable form of a parameter: 2.0 and 2 hash the same, tuples become lists."""
+    if isinstance(value, float) and value.is_integer(): return int(value)
+    if isinstance(value, (list, tuple)): return [_canonical(v) for v in value]
+    if isinstance(value, dict): return {str(k): _canonical(v) for k, v in value.items()}
+    if value is None or isinstance(value, (bool, int, float, str)): return value
+    return str(value)
+
+
+class ResultCache:
+    """
+    objects/<key><ext> holds the outputs; index.json maps keys to them with size,
+    mtime and last use, and memoizes source hashes by (path, size, mtime).
+    An object whose size or mtime changed (a hardlinked output was edited) is dropped.
+    """
+    def __init__(self, root, max_bytes, hardlink_hits=False):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, INDEX_NAME)
+        self.lock_path = os.path.join(root, LOCK_NAME)
+        self.max_bytes = int(max_bytes)
+        self.hardlink_hits = hardlink_hits
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Thread lock plus an exclusive lock on index.lock, so other processes wait too."""
+        with self.lock:
+            try:
+                os.makedirs(self.root, exist_ok=True)
+                f = open(self.lock_path, 'a+b')
+            except OSError as e:
+                print(f"Result cache lock unavailable ({e}); locking this process only")
+                yield
+                return
+            with f:
+                _lock_file(f)
+                try: yield
+                finally: _unlock_file(f)
+
+    # The index is re-read for every operation so the GUI and the CLI can share a cache
+    def _load(self):
+        try:
+            with open(self.index_path, 'r') as f: data = json.load(f)
+            if data.get("version") == RESULT_CACHE_VERSION: return data
+        except (OSError, ValueError):
+            pass
+        return {"version": RESULT_CACHE_VERSION, "entries": {}, "hashes": {}}
+
+    def _save(self, data):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f: json.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Result cache index save failed: {e}")
+
+    def source_hash(self, path):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        with self._locked():
+            memo = self._load()["hashes"].get(path)
+        if memo and memo.get("size") == st.st_size and memo.get("mtime_ns") == st.st_mtime_ns:
+            return memo["sha256"]
+        digest = file_sha256(path)  # outside the lock: hashing a large source takes a while
+        with self._locked():
+            data = self._load()
+            hashes = data["hashes"]
+            hashes[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest, "seen": time.time()}
+            if len(hashes) > MAX_HASH_MEMO:
+                for old in sorted(hashes, key=lambda p: hashes[p].get("seen", 0))[:len(hashes) - MAX_HASH_MEMO]:
+                    del hashes[old]
+            self._save(data)
+        return digest
+
+    def make_key(self, op, sources, params, output_ext=""):
+        payload = {"v": RESULT_CACHE_VERSION, "op": op, "sources": [self.source_hash(s) for s in sources],
+                   "params": _canonical(params), "ext": output_ext.lower()}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _object_path(self, entry):
+        return os.path.join(self.objects_dir, entry["file"])
+
+    def fetch(self, key, output_path):
+        """Places the cached output at output_path. Returns False on a miss."""
+        with self._locked():
+            data = self._load()
+            entry = data["entries"].get(key)
+            if not entry: return False
+            obj = self._object_path(entry)
+            try:
+                st = os.stat(obj)
+                if st.st_size != entry["size"] or st.st_mtime_ns != entry["mtime_ns"]: raise OSError("changed")
+            except OSError:
+                # Object vanished or was modified through a hardlink: treat as a miss
+                self._drop(data, key)
+                self._save(data)
+                return False
+        # Outside the lock: copying a multi-GB object must not hold up other threads and processes
+        try:
+            if os.path.abspath(output_path) != os.path.abspath(obj):
+                os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+                place_file(obj, output_path, self.hardlink_hits)
+        except OSError:
+            # Evicted meanwhile, or could not be placed: treat as a miss
+            with self._locked():
+                data = self._load()
+                if data["entries"].get(key) == entry:
+                    self._drop(data, key)
+                    self._save(data)
+            return False
+        with self._locked():
+            data = self._load()
+            current = data["entries"].get(key)
+            if current and current["file"] == entry["file"]:
+                current["last_used"] = time.time()
+                current["hits"] = current.get("hits", 0) + 1
+                self._save(data)
+        return True
+
+    def store(self, key, output_path, op=""):
+        """Adds a finished output to the cache, then evicts least recently used entries over the cap."""
+        try: size = os.path.getsize(output_path)
+        except OSError: return False
+        if size <= 0 or size > self.max_bytes: return False
+        name = key + os.path.splitext(output_path)[1].lower()
+        obj = os.path.join(self.objects_dir, name)
+        with self._locked():
+            try:
+                os.makedirs(self.objects_dir, exist_ok=True)
+                # A hardlink is safe here: if the output is edited later the stat check drops the entry
+                place_file(output_path, obj, hardlinks=True)
+                st = os.stat(obj)
+            except OSError as e:
+                print(f"Result cache store failed: {e}")
+                return False
+            data = self._load()
+            now = time.time()
+            data["entries"][key] = {"file": name, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "op": op,
+                                    "created": now, "last_used": now, "hits": 0}
+            self._evict(data)
+            self._save(data)
+            return True
+
+    def _drop(self, data, key):
+        entry = data["entries"].pop(key, None)
+        if entry:
+            try: os.remove(self._object_path(entry))
+            except OSError: pass
+
+    def _evict(self, data):
+        entries = data["entries"]
+        self._remove_orphans(entries)
+        total = sum(e["size"] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k].get("last_used", 0)):
+            if total <= self.max_bytes: break
+            total -= entries[key]["size"]
+            self._drop(data, key)
+
+    def _remove_orphans(self, entries):
+        """Deletes objects no index entry points at (a crash between writing an object and the index)."""
+        known = {e["file"] for e in entries.values()}
+        cutoff = time.time() - ORPHAN_GRACE
+        try: names = os.listdir(self.objects_dir)
+        except OSError: return
+        for name in names:
+            if name in known: continue
+            path = os.path.join(self.objects_dir, name)
+            try:
+                if os.stat(path).st_mtime < cutoff: os.remove(path)
+            except OSError: pass
+
+    def usage(self):
+        """(entries, bytes) currently in the cache."""
+        with self._locked():
+            entries = self._load()["entries"]
+        return len(entries), sum(e["size"] for e in entries.values())
+
+    def clear(self):
+        import shutil
+        with self._locked():
+            shutil.rmtree(self.objects_dir, ignore_errors=True)
+            self._save({"version": RESULT_CACHE_VERSION, "entries": {}, "hashes": self._load()["hashes"]})
+
+
+_cache = None
+_settings = dict(DEFAULT_RESULT_CACHE_SETTINGS)
+_config_lock = threading.Lock()
+
+def configure(settings=None):
+    """Applies result_cache settings (GUI config / CLI flags). Unknown keys are ignored."""
+    global _cache
+    with _config_lock:
+        if settings: _settings.update({k: v for k, v in settings.items() if k in DEFAULT_RESULT_CACHE_SETTINGS})
+        _cache = None
+
+def get_cache():
+    """The shared ResultCache, or None when caching is disabled."""
+    global _cache
+    with _config_lock:
+        if not _settings.get("enabled"): return None
+        if _cache is None:
+            try: max_gb = float(_settings.get("max_gb") or 0)
+            except (TypeError, ValueError): max_gb = DEFAULT_RESULT_CACHE_SETTINGS["max_gb"]
+            _cache = ResultCache(_settings.get("cache_dir") or default_cache_dir(), max_gb * 1024 ** 3,
+                                 hardlink_hits=_settings.get("hardlink_hits", False))
+        return _cache
+
+def _detach_output(path):
+    """
+    Unlinks an existing output that shares its inode with the cache (or with another
+    output), so the backend's `ffmpeg -y` writes a new file instead of truncating the shared one.
+    """
+    try:
+        if os.stat(path).st_nlink > 1: os.remove(path)
+    except OSError: pass
+
+def _succeeded(result, output_path):
+    if isinstance(result, tuple) and result and isinstance(result[0], bool) and not result[0]: return False
+    if result is None or result is False: return False
+    return os.path.isfile(output_path) and os.path.getsize(output_path) > 0
+
+def cached_result(op, source="input_path", output="output_path", on_hit=None):
+    """
+    Decorator for backends that turn one source file into one output file.
+    Every other argument (minus NON_KEY_ARGS) is part of the key. on_hit(output_path)
+    builds the return value for a cache hit, in the backend's own convention.
+    """
+    def decorate(func):
+        signature = inspect.signature(func)
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            if cache is None: return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            src, out = bound.arguments[source], bound.arguments[output]
+            params = {k: v for k, v in bound.arguments.items() if k not in NON_KEY_ARGS and k not in (source, output)}
+            with span("cache.lookup", cat="cache", op=op) as trace:
+                try: key = cache.make_key(op, [src], params, os.path.splitext(out)[1])
+                except OSError: key = None
+                hit = key is not None and cache.fetch(key, out)
+                trace.set(hit=hit)
+            if key is None: return func(*args, **kwargs)  # missing source: let the backend report it
+            if hit:
+                progress = bound.arguments.get("progress")
+                if progress: progress(FFmpegProgress(1.0, 0.0, None, None))
+                return on_hit(out) if on_hit else out
+
+            _detach_output(out)
+            result = func(*args, **kwargs)
+            if _succeeded(result, out):
+                with span("cache.store", cat="cache", op=op): cache.store(key, out, op)
+            return result
+        return wrapper
+    return decorate
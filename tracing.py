@@ -0,0 +1,138 @@
+import os
+import time
+import atexit
+import threading
+import functools
+
+# --- Stage Tracing (no GUI imports) ---
+# Spans around backend stages, child processes and UI hot paths. Off by default:
+# span() then returns a shared no-op object and traced() adds one flag check.
+# Turn it on with MEDIA_STUDIO_TRACE=trace.json (or --trace on the app / CLI);
+# the Chrome trace (chrome://tracing, ui.perfetto.dev) is written at exit and a
+# summary table goes to stderr.
+#
+#   with span("ai.realesrgan", frames=1200): run_process(cmd)
+#   @traced("backend.crop_video")
+#   def crop_video_backend(...): ...
+
+_enabled = False
+_events = []
+_lock = threading.Lock()
+_t0 = time.perf_counter()
+_export_path = None
+
+def is_enabled():
+    return _enabled
+
+def enable(export_path=None):
+    """Starts recording. With export_path the trace + summary are written when the process exits."""
+    global _enabled, _export_path
+    _enabled = True
+    if export_path and _export_path is None: atexit.register(_export_at_exit)
+    if export_path: _export_path = export_path
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def reset():
+    with _lock: _events.clear()
+
+
+class _NullSpan:
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+    def set(self, **args): pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name, self.cat, self.args = name, cat, args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def set(self, **args):
+        """Adds arguments once they are known (frame counts, exit codes...)."""
+        self.args.update(args)
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None: self.args["error"] = exc_type.__name__
+        thread = threading.current_thread()
+        event = (self.name, self.cat, self.start, end - self.start, thread.ident, thread.name, self.args)
+        with _lock: _events.append(event)
+        return False
+
+def span(name, cat="stage", **args):
+    """Context manager timing one stage. Costs a global lookup when tracing is off."""
+    if not _enabled: return _NULL_SPAN
+    return _Span(name, cat, args)
+
+def traced(name=None, cat="backend"):
+    """Decorator form of span(); the name defaults to the function name."""
+    def decorate(func):
+        label = name or func.__qualname__
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled: return func(*args, **kwargs)
+            with _Span(label, cat, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# --- Export ---
+
+def chrome_trace():
+    """The recorded spans as a Chrome trace-event dict ("X" complete events, microseconds)."""
+    with _lock: events = list(_events)
+    pid = os.getpid()
+    trace, threads = [], {}
+    for name, cat, start, dur, tid, thread_name, args in events:
+        threads[tid] = thread_name
+        trace.append({"name": name, "cat": cat, "ph": "X", "pid": pid, "tid": tid,
+                      "ts": round((start - _t0) * 1e6, 1), "dur": round(dur * 1e6, 1),
+                      "args": {k: v if isinstance(v, (int, float, bool, type(None))) else str(v) for k, v in args.items()}})
+    for tid, thread_name in threads.items():
+        trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+    return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+def export_chrome_trace(path):
+    import json
+    with open(path, 'w') as f: json.dump(chrome_trace(), f)
+    return path
+
+def summary():
+    """[(name, count, total_s, mean_s, max_s)] sorted by total time."""
+    with _lock: events = list(_events)
+    stats = {}
+    for name, cat, start, dur, tid, thread_name, args in events:
+        s = stats.setdefault(name, [0, 0.0, 0.0])
+        s[0] += 1; s[1] += dur; s[2] = max(s[2], dur)
+    rows = [(name, n, total, total / n, peak) for name, (n, total, peak) in stats.items()]
+    return sorted(rows, key=lambda r: r[2], reverse=True)
+
+def format_summary(rows=None):
+    rows = summary() if rows is None else rows
+    if not rows: return "No spans recorded."
+    width = max(24, max(len(r[0]) for r in rows))
+    lines = [f"{'Span':<{width}} {'Count':>6} {'Total s':>10} {'Mean ms':>10} {'Max ms':>10}"]
+    for name, n, total, mean, peak in rows:
+        lines.append(f"{name:<{width}} {n:>6} {total:>10.3f} {mean * 1000:>10.1f} {peak * 1000:>10.1f}")
+    return "\n".join(lines)
+
+def _export_at_exit():
+    if not _export_path: return
+    import sys
+    try:
+        export_chrome_trace(_export_path)
+        print(f"Trace written to {_export_path}\n{format_summary()}", file=sys.stderr)
+    except OSError as e:
+        print(f"Trace export failed: {e}", file=sys.stderr)
+
+if os.environ.get("MEDIA_STUDIO_TRACE"):
+    enable(os.environ["MEDIA_STUDIO_TRACE"])
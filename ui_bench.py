@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from types import SimpleNamespace
+
+# --- UI Responsiveness Benchmark ---
+# Drives the real VideoCombinerApp with synthetic playlists and times the Tk
+# callbacks that scale with playlist size: the time each callback blocks the event
+# loop, including the idle redraw it triggers. Needs a display; on a headless
+# machine run it under Xvfb:
+#
+#   xvfb-run -s "-screen 0 1600x1000x24" python ui_bench.py -o ui.json
+#   python ui_bench.py --xvfb --sizes 100,1000 --baseline ui.json
+#
+# Playlist entries point at files that do not exist, so selecting one never
+# starts a decode; preview loading is timed separately with synthetic frames.
+
+DEFAULT_SIZES = "100,1000,5000"
+RESULT_VERSION = 1
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(pct / 100.0 * len(ordered))))
+    return ordered[rank - 1]
+
+def start_xvfb(display=":97"):
+    """Starts a private Xvfb when there is no display. Returns the process (or None)."""
+    if os.environ.get("DISPLAY") or os.name == 'nt' or sys.platform == "darwin": return None
+    if not shutil.which("Xvfb"): raise RuntimeError("No DISPLAY and Xvfb is not installed")
+    proc = subprocess.Popen(["Xvfb", display, "-screen", "0", "1600x1000x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    time.sleep(1.0)
+    if proc.poll() is not None: raise RuntimeError(f"Xvfb exited with code {proc.returncode}")
+    return proc
+
+
+class UIBench:
+    def __init__(self, app, seed=1234, budget=20.0):
+        self.app = app
+        self.rng = random.Random(seed)
+        self.budget = budget  # seconds per scenario; every scenario gets at least one sample
+        self.samples = {}
+
+    def timed(self, op, func, *args):
+        """Runs one callback the way Tk would and records how long the loop was blocked."""
+        started = time.perf_counter()
+        func(*args)
+        self.app.update_idletasks()
+        self.samples.setdefault(op, []).append(time.perf_counter() - started)
+        self.app.update()  # deliver anything the callback scheduled, outside the measurement
+
+    def over_budget(self, op, started):
+        return self.samples.get(op) and time.perf_counter() - started > self.budget
+
+    def load_playlist(self, count):
+        from PIL import Image
+        import customtkinter as ctk
+        app = self.app
+        app.current_anim_id += 1
+        app.preview_cache = []
+        app.selected_index = -1
+        app.newly_added_indices = set()
+        base = Image.new("RGB", (80, 45))
+        items = []
+        for i in range(count):
+            img = base.copy()
+            img.paste((i * 37 % 256, i * 91 % 256, i * 53 % 256), (0, 0, 80, 45))
+            items.append({"path": os.path.join(tempfile.gettempdir(), "ui_bench_missing", f"clip_{i:05}.mp4"),
+                          "thumb": ctk.CTkImage(light_image=img, dark_image=img, size=(80, 45)),
+                          "name": f"clip_{i:05}.mp4", "duration": 10.0 + i % 50, "res": (1920, 1080),
+                          "fps": 30.0, "size_str": "12.3 MB"})
+        app.playlist_data = items
+        self.timed("load_render", app._render_playlist)
+
+    def scenario_render(self, repeats):
+        started = time.perf_counter()
+        for _ in range(repeats):
+            if self.over_budget("render", started): break
+            self.timed("render", self.app._render_playlist)
+
+    def scenario_select(self, steps):
+        started = time.perf_counter()
+        count = len(self.app.playlist_data)
+        for _ in range(steps):
+            if self.over_budget("select", started): break
+            self.timed("select", self.app._select_item, self.rng.randrange(count))
+
+    def scenario_drag(self, steps):
+        """Press on a row, then move over neighbouring rows (each move swaps + re-renders)."""
+        app = self.app
+        started = time.perf_counter()
+        count = len(app.playlist_data)
+        source = self.rng.randrange(max(1, count - steps - 1))
+        self.timed("drag_start", app._on_drag_start, SimpleNamespace(y_root=0), source)
+        for _ in range(steps):
+            if self.over_budget("drag_motion", started): break
+            rows = app.scroll_frame.winfo_children()
+            target = min(len(rows) - 1, (app.drag_source_idx or 0) + 1)
+            row = rows[target]
+            event = SimpleNamespace(y_root=row.winfo_rooty() + max(1, row.winfo_height() // 2))
+            self.timed("drag_motion", app._on_drag_motion, event)
+        app.drag_source_idx = None
+
+    def scenario_scroll(self, steps):
+        canvas = self.app.scroll_frame._parent_canvas
+        started = time.perf_counter()
+        canvas.yview_moveto(0)
+        for i in range(steps):
+            if self.over_budget("scroll", started): break
+            direction = 1 if (i // 20) % 2 == 0 else -1  # 20 wheel notches down, 20 up...
+            self.timed("scroll", canvas.yview_scroll, 3 * direction, "units")
+
+    def scenario_preview(self, repeats, frames=24, height=250):
+        from PIL import Image
+        images = [Image.new("RGB", (int(height * 16 / 9), height), (i * 10 % 256, 64, 128)) for i in range(frames)]
+        app = self.app
+        started = time.perf_counter()
+        for _ in range(repeats):
+            if self.over_budget("preview_loaded", started): break
+            app.current_anim_id += 1
+            self.timed("preview_loaded", app._on_preview_loaded, images, 100, app.current_anim_id)
+        app.current_anim_id += 1  # stop the animation loop
+
+    def report(self, size):
+        rows = []
+        for op, values in self.samples.items():
+            ms = [v * 1000 for v in values]
+            rows.append({"size": size, "op": op, "samples": len(ms), "p50_ms": round(percentile(ms, 50), 2),
+                         "p99_ms": round(percentile(ms, 99), 2), "max_ms": round(max(ms), 2)})
+        self.samples = {}
+        return rows
+
+
+def make_app(config_path):
+    import video_gui
+    class BenchApp(video_gui.VideoCombinerApp):
+        CONFIG_FILE = config_path  # never read or overwrite the user's settings
+        def _start_background_preload(self): pass
+    app = BenchApp()
+    app.geometry("1200x800+0+0")
+    app.update()
+    return app
+
+def run(sizes, steps=60, budget=20.0, seed=1234):
+    config_path = os.path.join(tempfile.mkdtemp(prefix="ui_bench_"), "config.json")
+    app = make_app(config_path)
+    results = []
+    try:
+        for size in sizes:
+            bench = UIBench(app, seed=seed, budget=budget)
+            bench.load_playlist(size)
+            bench.scenario_render(max(3, steps // 10))
+            bench.scenario_select(steps)
+            bench.scenario_drag(steps // 2)
+            bench.scenario_scroll(steps)
+            bench.scenario_preview(max(3, steps // 10))
+            rows = bench.report(size)
+            for r in rows:
+                print(f"{r['size']:>6} {r['op']:<16} n={r['samples']:<4} p50 {r['p50_ms']:9.2f} ms   "
+                      f"p99 {r['p99_ms']:9.2f} ms   max {r['max_ms']:9.2f} ms")
+            results.extend(rows)
+    finally:
+        app.destroy()
+        shutil.rmtree(os.path.dirname(config_path), ignore_errors=True)
+    return results
+
+def compare_to_baseline(results, baseline, tolerance=0.25):
+    """Lines + regressed keys, judged on p99 (small p99s get 2 ms of slack for timer noise)."""
+    base = {(r["size"], r["op"]): r for r in baseline.get("results", [])}
+    lines, regressions = [], []
+    for r in results:
+        key = (r["size"], r["op"])
+        label = f"{r['op']}@{r['size']}"
+        old = base.get(key)
+        if not old:
+            lines.append(f"  {label:<24} new"); continue
+        limit = old["p99_ms"] * (1 + tolerance) + 2.0
+        flag = "  << REGRESSION" if r["p99_ms"] > limit else ""
+        if flag: regressions.append(label)
+        lines.append(f"  {label:<24} p99 {old['p99_ms']:9.2f} -> {r['p99_ms']:9.2f} ms{flag}")
+    return lines, regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Time playlist / preview UI callbacks on synthetic playlists.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma list of playlist lengths")
+    parser.add_argument("--steps", type=int, default=60, help="Selections / scroll steps per size (drags: half)")
+    parser.add_argument("--budget", type=float, default=20.0, help="Max seconds per scenario and size")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--xvfb", action="store_true", help="Start a private Xvfb if there is no DISPLAY")
+    parser.add_argument("-o", "--output", default="", help="Write results JSON here")
+    parser.add_argument("--baseline", default="", help="Compare p99 latencies against a previous results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p99 growth vs. baseline (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    xvfb = start_xvfb() if args.xvfb else None
+    try:
+        sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+        results = run(sizes, steps=args.steps, budget=args.budget, seed=args.seed)
+    finally:
+        if xvfb: xvfb.terminate()
+
+    report = {"version": RESULT_VERSION, "meta": {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+        "platform": platform.platform(), "steps": args.steps, "seed": args.seed,
+    }, "results": results}
+    if args.output:
+        with open(args.output, 'w') as f: json.dump(report, f, indent=2)
+        print(f"Saved {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f: baseline = json.load(f)
+        lines, regressions = compare_to_baseline(results, baseline, args.tolerance)
+        print(f"\nCompared to {args.baseline}:")
+        print("\n".join(lines))
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,52 @@
+import time
+_STARTUP_T0 = time.perf_counter() # --profile-startup measures from here
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from moviepy import *
 import os
+import sys
 import subprocess
-import time
+import importlib.util
 import threading
 import json 
 import math
 import ctypes
 import re
-from PIL import Image
-from proglog import ProgressBarLogger
-
-# --- TRY IMPORTING VLC ---
-try:
-    import vlc
-    VLC_AVAILABLE = True
-except ImportError:
-    VLC_AVAILABLE = False
+from PIL import Image # customtkinter loads PIL anyway (CTkImage), so this one stays eager
+from ffmpeg_utils import format_progress
+from media_backends import (combine_video_clips_backend, convert_to_gif_backend, GIF_DITHER_MODES, GIF_STATS_MODES,
+                            universal_convert_backend, resize_renditions_backend, upscale_media_backend,
+                            upscale_with_ai_backend, interpolate_video_backend, crop_video_backend,
+                            extract_frame_backend, extract_frames_batch_backend, thumbnail_sheet_backend,
+                            delete_section_backend, insert_clip_backend, parse_rendition_list,
+                            parse_timestamp_list, get_file_size_string, get_preview_pil_images)
+from conversion_manifest import ConversionManifest
+from pipeline import enhance_video_ai_backend
+from batch_pool import run_parallel, default_job_count, threads_per_job, unique_output_paths
+from frame_store import FRAME_FORMATS, DEFAULT_FRAME_STORE_SETTINGS, default_ram_disk_dir
+import result_cache
+from result_cache import DEFAULT_RESULT_CACHE_SETTINGS
+from cancellation import check_cancelled
+import tracing
+from tracing import traced
+from job_scheduler import JobScheduler, DEFAULT_LIMITS, current_job, QUEUED, RUNNING, DONE, FAILED, CANCELLED
+
+# --- LAZY HEAVY IMPORTS ---
+# MoviePy, VLC and proglog are only needed once a clip is loaded, previewed or rendered.
+# They are imported on first use, or by the background preload after the window is up.
+
+# Only check that python-vlc is installed; loading libvlc waits until a player is needed
+VLC_AVAILABLE = importlib.util.find_spec("vlc") is not None
+if not VLC_AVAILABLE:
     print("Warning: 'python-vlc' not found. Fullscreen performance will be limited.")
+vlc = None
+
+def load_vlc():
+    global vlc
+    if vlc is None:
+        import vlc as vlc_module
+        vlc = vlc_module
+    return vlc
 
 # --- TRY IMPORTING TKINTERDND2 (For Drag & Drop) ---
 try:
@@ -34,703 +61,74 @@ except ImportError:
         class DnDWrapper:
             pass
 
-# --- 1. Custom Logger for Progress Bar ---
-
-class TkProgressBarLogger(ProgressBarLogger):
-    def __init__(self, update_callback):
-        super().__init__(init_state=None, bars=None, ignored_bars=None, logged_bars='all', min_time_interval=0, ignore_bars_under=0)
-        self.update_callback = update_callback
-
-    def bars_callback(self, bar, attr, value, old_value=None):
-        if bar == 't' and attr == 'index':
-            if 'total' in self.bars[bar]:
-                total = self.bars[bar]['total']
-                if total > 0:
-                    percentage = value / total
-                    self.update_callback(percentage)
-
-# --- 2. Backend Video Logic ---
-
-def combine_video_clips_backend(input_files, output_path, logger=None):
-    if not input_files: return None
-    try:
-        clips = []
-        for f in input_files:
-            if not os.path.exists(f): return None
-            clips.append(VideoFileClip(f))
-        
-        final_clip = concatenate_videoclips(clips, method="compose")
-        
-        final_clip.write_videofile(
-            output_path, 
-            codec='libx264', 
-            audio_codec='aac', 
-            temp_audiofile='temp-audio.m4a', 
-            remove_temp=True, 
-            preset='ultrafast',
-            threads=4,
-            logger=logger 
-        )
-
-        for clip in clips: clip.close()
-        return os.path.abspath(output_path)
-    except Exception as e:
-        raise e
-
-def convert_to_gif_backend(video_path, output_path, fps=10, scale=0.5, speed=1.0, logger=None):
-    try:
-        clip = VideoFileClip(video_path)
-        if speed != 1.0: clip = clip.with_speed_scaled(speed)
-        if scale != 1.0: clip = clip.resized(scale)
-        clip.write_gif(output_path, fps=fps, logger=logger)
-        clip.close()
-        return True
-    except Exception as e:
-        print(f"GIF Error: {e}")
-        return False
-    
-def universal_convert_backend(input_path, output_path, quality="High", speed="Medium", logger=None):
-    """
-    Backend with Speed/Preset control.
-    speed options: "Ultrafast", "Fast", "Medium", "Slow"
-    """
-    import subprocess
-    from PIL import Image
-    
-    input_ext = os.path.splitext(input_path)[1].lower()
-    output_ext = os.path.splitext(output_path)[1].lower()
-    image_exts = ['.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tiff', '.ico']
-    
-    # --- 1. IMAGE MODE ---
-    if input_ext in image_exts:
-        try:
-            img = Image.open(input_path)
-            if output_ext in ['.jpg', '.jpeg', '.bmp'] and img.mode in ('RGBA', 'LA'):
-                bg = Image.new("RGB", img.size, (255, 255, 255))
-                bg.paste(img, mask=img.split()[3])
-                img = bg
-            
-            q_val = 100 if quality == "High" else (85 if quality == "Medium" else 60)
-            if output_ext == '.ico': img.save(output_path, format='ICO', sizes=[(256, 256)])
-            else: img.save(output_path, quality=q_val)
-            return True, "Success"
-        except Exception as e:
-            return False, f"Image Error: {e}"
-
-    # --- 2. VIDEO MODE ---
-    if output_ext == ".gif":
-        try:
-            fps = 15 if quality == "High" else 10
-            scale = 1.0 if quality == "High" else 0.5
-            convert_to_gif_backend(input_path, output_path, fps=fps, scale=scale)
-            return True, "Success"
-        except Exception as e:
-            return False, f"GIF Error: {e}"
-
-    ffmpeg_cmd = "ffmpeg"
-    cmd = [ffmpeg_cmd, "-y", "-i", input_path]
-
-    # --- SPEED & QUALITY SETTINGS ---
-    # Map UI Speed to FFmpeg Presets
-    preset_map = {
-        "Ultrafast": "ultrafast", # Fastest encoding, larger file
-        "Fast": "fast",
-        "Medium": "medium",
-        "Slow": "slow"            # Best compression, slowest
-    }
-    preset = preset_map.get(speed, "medium")
-    
-    crf = "18" if quality == "High" else ("23" if quality == "Medium" else "28")
-
-    # Audio Extraction
-    if output_ext in ['.mp3', '.wav', '.m4a']:
-        cmd.extend(["-vn", "-map", "a"]) 
-        if output_ext == '.mp3': cmd.extend(["-c:a", "libmp3lame", "-q:a", "2" if quality=="High" else "5"])
-        elif output_ext == '.m4a': cmd.extend(["-c:a", "aac", "-b:a", "192k"])
-    # Video Conversion
-    else:
-        if output_ext == '.webm':
-            cmd.extend(["-c:v", "libvpx-vp9", "-crf", "30", "-b:v", "0"])
-        else:
-            cmd.extend(["-c:v", "libx264", "-pix_fmt", "yuv420p", "-preset", preset, "-crf", crf])
-        cmd.extend(["-c:a", "aac", "-b:a", "192k"])
-
-    cmd.append(output_path)
-
-    # Execution
-    try:
-        startupinfo = subprocess.STARTUPINFO()
-        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, startupinfo=startupinfo, text=True)
-        stdout, stderr = process.communicate()
-
-        if process.returncode != 0:
-            return False, f"FFmpeg Error:\n{stderr[-300:]}"
-
-        if os.path.exists(output_path) and os.path.getsize(output_path) == 0:
-            return False, "File created but is empty (0 bytes)."
-
-        return True, "Success"
-    except FileNotFoundError:
-        return False, "FFmpeg.exe not found."
-    except Exception as e:
-        return False, f"General Error: {e}"
-
-def resize_clip_backend(input_path, width, height, output_path, mode="stretch", anchor="center", logger=None):
-    """
-    Resizes video.
-    mode: "stretch" (distort), "fit" (black bars), "crop" (fill screen/cut edges)
-    anchor: "center", "top-left", "bottom-right" (only used for 'crop')
-    """
-    try:
-        # --- FFmpeg Command Generation ---
-        ffmpeg_cmd = "ffmpeg"
-        startupinfo = None
-        if os.name == 'nt':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-
-        filter_str = ""
-
-        if mode == "stretch":
-            # Simple stretch (distorts image)
-            filter_str = f"scale={width}:{height}"
-
-        elif mode == "fit":
-            # Fit inside + Black Bars (Letterbox)
-            # 1. Scale to fit inside box
-            # 2. Pad to fill box, centering the video
-            filter_str = (
-                f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
-                f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2"
-            )
-
-        elif mode == "crop":
-            # Crop to Fill (Zoom + Cut)
-            # 1. Scale so the SMALLEST dimension matches target (filling the box)
-            # 2. Crop the excess
-            
-            # Step 1: Scale (force_original_aspect_ratio=increase ensures we fill the box)
-            scale_part = f"scale={width}:{height}:force_original_aspect_ratio=increase"
-            
-            # Step 2: Crop
-            if anchor == "top-left":
-                # Crop from top-left (0,0)
-                crop_part = f"crop={width}:{height}:0:0"
-            elif anchor == "bottom-right":
-                # Crop from bottom-right (w-new_w, h-new_h)
-                # 'in_w' and 'in_h' refer to the size AFTER the scale filter
-                crop_part = f"crop={width}:{height}:in_w-{width}:in_h-{height}"
-            else: # center
-                # Crop from center
-                crop_part = f"crop={width}:{height}:(in_w-{width})/2:(in_h-{height})/2"
-            
-            filter_str = f"{scale_part},{crop_part}"
-
-        cmd = [
-            ffmpeg_cmd, "-y",               
-            "-i", input_path,               
-            "-vf", filter_str, 
-            "-c:v", "libx264",              
-            "-preset", "ultrafast",         
-            "-crf", "23",                   
-            "-c:a", "copy",                 
-            output_path
-        ]
-        
-        subprocess.run(cmd, check=True, startupinfo=startupinfo, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
-        return output_path
-
-    except Exception as e:
-        print(f"Direct FFmpeg failed ({e}). Switching to MoviePy fallback...")
-        
-        # --- MoviePy Fallback ---
-        try:
-            clip = VideoFileClip(input_path)
-            
-            if mode == "stretch":
-                new_clip = clip.resized(new_size=(width, height))
-            
-            elif mode == "fit":
-                # Fit logic (as before)
-                ratio_w = width / clip.w
-                ratio_h = height / clip.h
-                scale_factor = min(ratio_w, ratio_h)
-                resized = clip.resized(scale=scale_factor)
-                new_clip = CompositeVideoClip(
-                    [resized.with_position("center")], 
-                    size=(width, height), bg_color=(0,0,0)
-                )
-            
-            elif mode == "crop":
-                # Crop to Fill logic
-                ratio_w = width / clip.w
-                ratio_h = height / clip.h
-                scale_factor = max(ratio_w, ratio_h) # Scale up to fill
-                
-                resized = clip.resized(scale=scale_factor)
-                
-                # Calculate Crop Box
-                x1, y1 = 0, 0
-                if anchor == "center":
-                    x1 = (resized.w - width) / 2
-                    y1 = (resized.h - height) / 2
-                elif anchor == "bottom-right":
-                    x1 = resized.w - width
-                    y1 = resized.h - height
-                # top-left is 0,0
-                
-                new_clip = resized.cropped(x1=x1, y1=y1, width=width, height=height)
-
-            new_clip.write_videofile(
-                output_path, 
-                codec='libx264', audio_codec='aac', temp_audiofile='temp-audio-resize.m4a', 
-                remove_temp=True, preset='ultrafast', logger=logger
-            )
-            clip.close()
-            new_clip.close()
-            return output_path
-            
-        except Exception as e2:
-            raise e2
-
-def upscale_media_backend(input_path, output_path, scale_factor, width=None, height=None, algo="lanczos", sharpen=True):
-    try:
-        ffmpeg_cmd = "ffmpeg"
-        startupinfo = None
-        if os.name == 'nt':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            
-        scale_filter = ""
-        if width and height:
-            scale_filter = f"scale={width}:{height}:flags={algo}"
-        else:
-            scale_filter = f"scale=iw*{scale_factor}:ih*{scale_factor}:flags={algo}"
-            
-        if sharpen:
-            scale_filter += ",unsharp=5:5:1.0:5:5:0.0"
-
-        cmd = [ffmpeg_cmd, "-y", "-i", input_path, "-vf", scale_filter]
-        
-        ext = os.path.splitext(output_path)[1].lower()
-        if ext in ['.jpg', '.png', '.bmp']:
-            cmd.extend(["-q:v", "2"]) 
-        else:
-            cmd.extend(["-c:v", "libx264", "-preset", "slow", "-crf", "18", "-c:a", "copy"])
-            
-        cmd.append(output_path)
-        
-        subprocess.run(cmd, check=True, startupinfo=startupinfo, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
-        return output_path
-    except Exception as e:
-        raise e
-
-def upscale_with_ai_backend(input_path, output_path, scale_factor, logger=None, enhance_faces=False, exe_dir=None, tile_size=0):
-    exe_name = "realesrgan-ncnn-vulkan.exe" if os.name == 'nt' else "realesrgan-ncnn-vulkan"
-    
-    if exe_dir and os.path.exists(os.path.join(exe_dir, exe_name)):
-        exe_path = os.path.join(exe_dir, exe_name)
-    else:
-        exe_path = os.path.abspath(exe_name)
-    
-    if not os.path.exists(exe_path):
-        return False, f"Executable not found at: {exe_path}. Please set the correct path in Settings."
-
-    ext = os.path.splitext(input_path)[1].lower()
-    is_image = ext in ['.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tiff']
-
-    def run_ai_command(in_file, out_file, model, safe_mode=False):
-        cmd = [
-            exe_path,
-            "-i", in_file,
-            "-o", out_file,
-            "-n", model,
-            "-s", str(scale_factor),
-            "-f", "jpg"
-        ]
-        
-        if tile_size > 0:
-            cmd.extend(["-t", str(tile_size)])
-            if tile_size >= 400:
-                cmd.extend(["-j", "2:2:2"]) 
-            else:
-                cmd.extend(["-j", "1:2:2"])
-        elif safe_mode:
-            cmd.extend(["-t", "64", "-j", "1:1:1"])
-        else:
-            cmd.extend(["-t", "256", "-j", "1:2:2"])
-
-        print(f"AI Command (Safe={safe_mode}, Tile={tile_size}):", " ".join(cmd))
-        
-        startupinfo = subprocess.STARTUPINFO()
-        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        subprocess.run(cmd, check=True, startupinfo=startupinfo, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
-
-    if is_image:
-        try:
-            if logger: logger(0.1)
-            
-            if tile_size > 0:
-                run_ai_command(input_path, output_path, "realesrgan-x4plus", safe_mode=False)
-            else:
-                try:
-                    run_ai_command(input_path, output_path, "realesrgan-x4plus", safe_mode=False)
-                except subprocess.CalledProcessError:
-                    print("Standard AI crashed. Retrying in Safe Mode...")
-                    if logger: logger(0.2)
-                    run_ai_command(input_path, output_path, "realesr-animevideov3", safe_mode=True)
-
-            if logger: logger(0.5)
-
-            if enhance_faces:
-                bat_name = "run_codeformer.bat"
-                codeformer_cmd = None
-                if exe_dir and os.path.exists(os.path.join(exe_dir, bat_name)):
-                    codeformer_cmd = os.path.join(exe_dir, bat_name)
-                elif os.path.exists(os.path.abspath(bat_name)):
-                    codeformer_cmd = os.path.abspath(bat_name)
-
-                if codeformer_cmd:
-                    startupinfo = subprocess.STARTUPINFO()
-                    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                    subprocess.run([codeformer_cmd, output_path], check=True, startupinfo=startupinfo)
-
-            if logger: logger(1.0)
-            
-            if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                return True, "Success"
-            else:
-                return False, "AI failed to generate output file."
-
-        except Exception as e:
-            return False, f"Image Upscale Error: {str(e)}"
-
-    else:
-        temp_dir = f"TEMP_AI_{int(time.time())}"
-        in_frames = os.path.join(temp_dir, "input")
-        out_frames = os.path.join(temp_dir, "output")
-        final_frames = out_frames
-        
-        os.makedirs(in_frames, exist_ok=True)
-        os.makedirs(out_frames, exist_ok=True)
-
-        try:
-            if logger: logger(0.1)
-            
-            subprocess.run([
-                "ffmpeg", "-i", input_path, 
-                "-q:v", "2", 
-                os.path.join(in_frames, "frame_%08d.jpg")
-            ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-            if logger: logger(0.2)
-            
-            if tile_size > 0:
-                 run_ai_command(in_frames, out_frames, "realesr-animevideov3", safe_mode=False)
-            else:
-                try:
-                    run_ai_command(in_frames, out_frames, "realesr-animevideov3", safe_mode=False)
-                except subprocess.CalledProcessError:
-                    print("Video AI crashed. Retrying in Safe Mode...")
-                    run_ai_command(in_frames, out_frames, "realesr-animevideov3", safe_mode=True)
-
-            if logger: logger(0.7)
-
-            bat_name = "run_codeformer.bat"
-            codeformer_cmd = None
-            if exe_dir and os.path.exists(os.path.join(exe_dir, bat_name)):
-                 codeformer_cmd = os.path.join(exe_dir, bat_name)
-            elif os.path.exists(os.path.abspath(bat_name)):
-                 codeformer_cmd = os.path.abspath(bat_name)
-
-            if enhance_faces and codeformer_cmd:
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                subprocess.run([codeformer_cmd, out_frames], check=True, startupinfo=startupinfo)
-
-            audio_path = os.path.join(temp_dir, "audio.m4a")
-            has_audio = False
-            try:
-                subprocess.run(["ffmpeg", "-y", "-i", input_path, "-vn", "-acodec", "copy", audio_path], 
-                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                if os.path.exists(audio_path) and os.path.getsize(audio_path) > 1000:
-                    has_audio = True
-            except: pass
-
-            fps = 30
-            try:
-                clip = VideoFileClip(input_path)
-                fps = clip.fps
-                clip.close()
-            except: pass
-
-            combine_cmd = [
-                "ffmpeg", "-y", "-framerate", str(fps),
-                "-i", os.path.join(final_frames, "frame_%08d.jpg"),
-            ]
-            
-            if has_audio: combine_cmd.extend(["-i", audio_path])
-            
-            combine_cmd.extend([
-                "-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", "18",
-                "-c:a", "aac" if has_audio else "copy",
-                output_path
-            ])
-            
-            if has_audio:
-                combine_cmd.extend(["-map", "0:v:0", "-map", "1:a:0"])
-
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            subprocess.run(combine_cmd, check=True, startupinfo=startupinfo, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            
-            if logger: logger(1.0)
-            return True, "Success"
-
-        except Exception as e:
-            return False, f"Video Upscale Error: {str(e)}"
-        finally:
-            try:
-                import shutil
-                shutil.rmtree(temp_dir)
-            except: pass
-
-def interpolate_video_backend(input_path, output_path, method="ffmpeg", target_fps=60, multiplier=2, logger=None, exe_dir=None):
-    try:
-        if method == "ffmpeg":
-            filter_str = f"minterpolate=fps={target_fps}:mi_mode=mci:mc_mode=aobmc:me_mode=bidir:vsbmc=1"
-            
-            cmd = [
-                "ffmpeg", "-y", 
-                "-i", input_path,
-                "-vf", filter_str,
-                "-c:v", "libx264", "-preset", "veryfast", "-crf", "20",
-                "-c:a", "copy",
-                output_path
-            ]
-            
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            
-            subprocess.run(cmd, check=True, startupinfo=startupinfo, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
-            return True, "Success"
-
-        elif method == "rife":
-            exe_name = "rife-ncnn-vulkan.exe" if os.name == 'nt' else "rife-ncnn-vulkan"
-            
-            if exe_dir and os.path.exists(os.path.join(exe_dir, exe_name)):
-                exe_path = os.path.join(exe_dir, exe_name)
-            else:
-                exe_path = os.path.abspath(exe_name)
-
-            if not os.path.exists(exe_path):
-                return False, f"RIFE Executable not found at: {exe_path}. Please set path in Settings."
-
-            temp_dir = f"TEMP_RIFE_{int(time.time())}"
-            in_frames = os.path.join(temp_dir, "input")
-            out_frames = os.path.join(temp_dir, "output")
-            os.makedirs(in_frames, exist_ok=True)
-            os.makedirs(out_frames, exist_ok=True)
-
-            try:
-                if logger: logger(0.1)
-                
-                # Extract frames
-                subprocess.run([
-                    "ffmpeg", "-i", input_path, 
-                    os.path.join(in_frames, "frame_%08d.png")
-                ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-                if logger: logger(0.2)
-
-                # --- RIFE LOOP FOR MULTIPLIER (2x, 4x) ---
-                import shutil
-                current_mult = 1
-                target_mult = multiplier if multiplier in [2, 4] else 2
-                
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-
-                while current_mult < target_mult:
-                    # Run RIFE (Input -> Output)
-                    cmd = [exe_path, "-i", in_frames, "-o", out_frames]
-                    subprocess.run(cmd, check=True, startupinfo=startupinfo, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
-                    
-                    current_mult *= 2
-                    
-                    # If we need another pass (e.g. going to 4x), move Output back to Input
-                    if current_mult < target_mult:
-                        # Clear Input
-                        for f in os.listdir(in_frames):
-                            os.remove(os.path.join(in_frames, f))
-                        # Move Output to Input
-                        for f in os.listdir(out_frames):
-                            shutil.move(os.path.join(out_frames, f), os.path.join(in_frames, f))
-
-                if logger: logger(0.8)
-
-                # Calculate new FPS
-                orig_fps = 30
-                try:
-                    clip = VideoFileClip(input_path)
-                    orig_fps = clip.fps if clip.fps else 30
-                    clip.close()
-                except: pass
-                
-                new_fps = orig_fps * target_mult
-
-                # Handle Audio
-                audio_path = os.path.join(temp_dir, "audio.m4a")
-                has_audio = False
-                try:
-                    subprocess.run(["ffmpeg", "-y", "-i", input_path, "-vn", "-acodec", "copy", audio_path], 
-                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                    if os.path.exists(audio_path) and os.path.getsize(audio_path) > 1000:
-                        has_audio = True
-                except: pass
-
-                # Recombine
-                combine_cmd = [
-                    "ffmpeg", "-y", "-framerate", str(new_fps),
-                    "-i", os.path.join(out_frames, "%08d.png"), 
-                ]
-                
-                if has_audio: combine_cmd.extend(["-i", audio_path])
-                
-                combine_cmd.extend([
-                    "-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", "18",
-                    "-c:a", "aac" if has_audio else "copy",
-                    output_path
-                ])
-                
-                if has_audio:
-                    combine_cmd.extend(["-map", "0:v:0", "-map", "1:a:0"])
+# --- STARTUP PROFILING (--profile-startup) ---
+STARTUP_MARKS = []
 
-                subprocess.run(combine_cmd, check=True, startupinfo=startupinfo, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                
-                if logger: logger(1.0)
-                return True, "Success"
+def mark_startup(label):
+    STARTUP_MARKS.append((label, time.perf_counter()))
 
-            except Exception as e:
-                return False, f"RIFE Error: {str(e)}"
-            finally:
-                import shutil
-                try: shutil.rmtree(temp_dir)
-                except: pass
-
-    except Exception as e:
-        return False, str(e)
-
-def crop_video_backend(video_path, start_time, end_time, output_path):
-    duration = end_time - start_time
-    if duration <= 0: return None
-    try:
-        ffmpeg_cmd = "ffmpeg"
-        startupinfo = None
-        if os.name == 'nt':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-
-        cmd = [
-            ffmpeg_cmd, "-y", "-ss", str(start_time), "-i", video_path, "-t", str(duration),
-            "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", output_path
-        ]
-        subprocess.run(cmd, check=True, startupinfo=startupinfo, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
-        return output_path
-    except Exception:
-        pass
-
-    try:
-        clip = VideoFileClip(video_path)
-        trimmed = clip.subclipped(start_time, end_time)
-        trimmed.write_videofile(output_path, codec='libx264', audio_codec='aac', temp_audiofile='temp-audio.m4a', remove_temp=True, preset='ultrafast')
-        clip.close(); trimmed.close()
-        return output_path
-    except Exception as e:
-        raise e
-
-def extract_frame_backend(video_path, time_in_seconds, output_path):
-    # Safety margin: If we are at the very end, step back slightly to capture the actual last frame.
-    # We do this calculation before running FFmpeg or MoviePy.
-    try:
-        # Quick probe to get duration/fps without full load (optional, but safer to use hard logic)
-        # We'll rely on the Fallback block for precise FPS math, but for FFmpeg CLI, 
-        # just subtracting 0.1s is usually enough to save the last frame safezone.
-        pass 
-    except: pass
-
-    # --- FIX: LOGIC TO PREVENT OVERSHOOTING DURATION ---
-    # We will refine 'time_in_seconds' inside the blocks below.
-
-    # 1. Try Direct FFmpeg
-    try:
-        ffmpeg_cmd = "ffmpeg"
-        startupinfo = None
-        if os.name == 'nt':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            
-        # If we are effectively at 0 (start), keep it. 
-        # If we are > 0, we trust the time, but if it fails, we fall back to MoviePy which has the smart fix below.
-        
-        cmd = [ffmpeg_cmd, "-y", "-ss", str(time_in_seconds), "-i", video_path, "-frames:v", "1", "-q:v", "2", output_path]
-        subprocess.run(cmd, check=True, startupinfo=startupinfo, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
-        
-        # Check if FFmpeg actually created a valid file (size > 0)
-        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-            return True
-        else:
-            # If FFmpeg made an empty file (common at end of video), delete and fallback
-            if os.path.exists(output_path): os.remove(output_path)
-            raise Exception("FFmpeg produced empty file")
+def startup_report():
+    lines = ["Startup profile:", f"  {'phase':<22}{'at (ms)':>10}{'step (ms)':>11}"]
+    prev = _STARTUP_T0
+    for label, t in STARTUP_MARKS:
+        lines.append(f"  {label:<22}{(t - _STARTUP_T0) * 1000:>10.1f}{(t - prev) * 1000:>11.1f}")
+        prev = t
+    loaded = [m for m in ("moviepy", "vlc", "proglog", "numpy", "imageio") if m in sys.modules]
+    lines.append(f"  heavy modules loaded: {', '.join(loaded) or 'none'}")
+    return "\n".join(lines)
 
-    except Exception:
-        pass # Switch to MoviePy fallback
+# --- 1. Custom Logger for Progress Bar ---
 
-    # 2. MoviePy Fallback (With The Fix)
+_tk_logger_class = None
+
+def TkProgressBarLogger(update_callback):
+    """proglog is imported on the first MoviePy render, not at startup."""
+    global _tk_logger_class
+    if _tk_logger_class is None:
+        from proglog import ProgressBarLogger
+
+        class _TkProgressBarLogger(ProgressBarLogger):
+            def __init__(self, update_callback):
+                super().__init__(init_state=None, bars=None, ignored_bars=None, logged_bars='all', min_time_interval=0, ignore_bars_under=0)
+                self.update_callback = update_callback
+
+            def bars_callback(self, bar, attr, value, old_value=None):
+                # MoviePy renders in-process, so cancelling a job stops it between frames
+                check_cancelled()
+                if bar == 't' and attr == 'index':
+                    if 'total' in self.bars[bar]:
+                        total = self.bars[bar]['total']
+                        if total > 0:
+                            percentage = value / total
+                            self.update_callback(percentage)
+        _tk_logger_class = _TkProgressBarLogger
+    return _tk_logger_class(update_callback)
+
+# --- 2. Backend Video Logic lives in media_backends.py (no GUI imports) ---
+
+def load_sprite_frames(index_path, height=250, max_frames=48):
+    """Crops the tiles listed in a sprite index back into PIL frames for the mini preview."""
     try:
-        clip = VideoFileClip(video_path)
-        
-        # --- THE FIX IS HERE ---
-        # If the requested time is very close to (or past) the end, shift back by 1 frame.
-        total_dur = clip.duration
-        t = time_in_seconds
-
-        if t >= total_dur - 0.05:
-            # Calculate duration of a single frame
-            frame_dur = (1.0 / clip.fps) if (clip.fps and clip.fps > 0) else 0.05
-            # Set time to (Duration - 1 Frame) to ensure we hit valid data
-            t = max(0, total_dur - frame_dur)
-        
-        # Clamp t to be safe regardless
-        t = min(t, total_dur - 0.01)
-        if t < 0: t = 0
-            
-        clip.save_frame(output_path, t=t)
-        clip.close()
-        return True
+        with open(index_path, 'r') as f: index = json.load(f)
+        folder = os.path.dirname(index_path)
+        tiles = index.get("tiles", [])
+        step = max(1, math.ceil(len(tiles) / max_frames))
+        sheets, frames = {}, []
+        for tile in tiles[::step]:
+            if tile["sheet"] not in sheets: sheets[tile["sheet"]] = Image.open(os.path.join(folder, tile["sheet"])).convert("RGB")
+            img = sheets[tile["sheet"]].crop((tile["x"], tile["y"], tile["x"] + tile["w"], tile["y"] + tile["h"]))
+            frames.append(img.resize((int(height * tile["w"] / tile["h"]), height), Image.Resampling.LANCZOS))
+        return frames, 150
     except Exception as e:
-        messagebox.showerror("Error", f"Failed: {e}")
-        return False
+        print(f"Sprite Loader Error: {e}")
+        return [], 100
 
 # --- Helper Utils ---
 
-def get_file_size_string(path):
-    try:
-        size_bytes = os.path.getsize(path)
-        if size_bytes == 0: return "0B"
-        size_name = ("B", "KB", "MB", "GB", "TB")
-        i = int(math.floor(math.log(size_bytes, 1024)))
-        p = math.pow(1024, i)
-        s = round(size_bytes / p, 2)
-        return "%s %s" % (s, size_name[i])
-    except: return "Unknown"
-
 def extract_clip_metadata(video_path, thumb_height=60):
     data = {"thumb": None, "duration": 0, "resolution": (0, 0), "fps": 0, "size_str": get_file_size_string(video_path)}
     try:
+        from moviepy import VideoFileClip
         clip = VideoFileClip(video_path)
         data["duration"] = clip.duration
         data["resolution"] = clip.size
@@ -747,66 +145,6 @@ def extract_clip_metadata(video_path, thumb_height=60):
         print(f"Metadata Error: {e}")
     return data
 
-def get_preview_pil_images(video_path, duration=3.0, fps=8, height=250):
-    pil_images = []
-    clip = None
-    try:
-        clip = VideoFileClip(video_path, audio=False)
-        max_duration = min(duration, clip.duration)
-        total_frames = int(max_duration * fps)
-        if total_frames < 1: total_frames = 1
-        step = 1.0 / fps
-        for i in range(total_frames):
-            t = i * step
-            if t > clip.duration: break
-            frame_data = clip.get_frame(t)
-            img = Image.fromarray(frame_data).copy()
-            aspect = img.width / img.height
-            new_width = int(height * aspect)
-            img = img.resize((new_width, height), Image.Resampling.LANCZOS)
-            pil_images.append(img)
-        return pil_images, int(step * 1000)
-    except Exception as e:
-        print(f"Loader Error: {e}")
-        return [], 100
-    finally:
-        if clip:
-            try: clip.close()
-            except: pass
-
-def delete_section_backend(video_path, start_remove, end_remove, output_path):
-    try:
-        clip = VideoFileClip(video_path)
-        if start_remove <= 0:
-            final = clip.subclipped(end_remove, clip.duration)
-        elif end_remove >= clip.duration:
-            final = clip.subclipped(0, start_remove)
-        else:
-            clip1 = clip.subclipped(0, start_remove)
-            clip2 = clip.subclipped(end_remove, clip.duration)
-            final = concatenate_videoclips([clip1, clip2])
-        final.write_videofile(output_path, codec='libx264', audio_codec='aac', temp_audiofile='temp-audio.m4a', remove_temp=True, preset='ultrafast')
-        clip.close(); final.close()
-        return output_path
-    except Exception as e:
-        raise e
-
-def insert_clip_backend(main_video_path, insert_video_path, insert_time, output_path):
-    try:
-        main = VideoFileClip(main_video_path)
-        insert = VideoFileClip(insert_video_path)
-        if insert_time <= 0: final = concatenate_videoclips([insert, main])
-        elif insert_time >= main.duration: final = concatenate_videoclips([main, insert])
-        else:
-            part1 = main.subclipped(0, insert_time)
-            part2 = main.subclipped(insert_time, main.duration)
-            final = concatenate_videoclips([part1, insert, part2])
-        final.write_videofile(output_path, codec='libx264', audio_codec='aac', temp_audiofile='temp-audio.m4a', remove_temp=True, preset='ultrafast')
-        main.close(); insert.close(); final.close()
-        return output_path
-    except Exception as e:
-        raise e
-
 # --- 3. Advanced Editor Popup ---
 
 class VideoEditorPopup(ctk.CTkToplevel):
@@ -858,7 +196,7 @@ class VideoEditorPopup(ctk.CTkToplevel):
         self.vlc_player = None
         if self.use_vlc_fullscreen:
             try:
-                self.vlc_instance = vlc.Instance("--no-xlib --no-video-title-show --quiet")
+                self.vlc_instance = load_vlc().Instance("--no-xlib --no-video-title-show --quiet")
                 self.vlc_player = self.vlc_instance.media_player_new()
                 self.vlc_player.video_set_mouse_input(False)
                 self.vlc_player.video_set_key_input(False)
@@ -898,6 +236,7 @@ class VideoEditorPopup(ctk.CTkToplevel):
     def _load_video_moviepy(self, path):
         if hasattr(self, 'full_clip') and self.full_clip: self.full_clip.close()
         try:
+            from moviepy import VideoFileClip
             self.full_clip = VideoFileClip(path)
             self.duration = self.full_clip.duration
             self.end_time = self.duration
@@ -991,6 +330,7 @@ class VideoEditorPopup(ctk.CTkToplevel):
         if self.defaults and self.defaults['folder']:
              ctk.CTkButton(btn_frame, text="⚡ Quick Save", command=self._quick_save_frame, fg_color="#2980B9").pack(side="left", padx=10)
         ctk.CTkButton(btn_frame, text="💾 Save As...", command=self._save_frame_as, fg_color="purple").pack(side="left", padx=10)
+        ctk.CTkButton(btn_frame, text="🎞 Batch Export...", command=self._open_batch_export_dialog, fg_color="#16A085").pack(side="left", padx=10)
 
     def _switch_to_vlc(self):
         self.is_playing = False 
@@ -1081,6 +421,7 @@ class VideoEditorPopup(ctk.CTkToplevel):
         self._update_preview(self.current_time)
         self.after(33, self._play_loop_moviepy)
 
+    @traced("ui.editor_update_preview", cat="ui")
     def _update_preview(self, t):
         if self.active_engine != "moviepy": return
         mins = int(t // 60); secs = int(t % 60); frac = int((t - int(t)) * 100)
@@ -1183,12 +524,19 @@ class VideoEditorPopup(ctk.CTkToplevel):
 
     def _perform_crop(self):
         if self.start_time >= self.end_time: return
-        self.configure(cursor="watch"); self.update(); out = self._get_temp_path("crop")
-        try:
-            res = crop_video_backend(self.current_video_path, self.start_time, self.end_time, out)
-            self._update_current_video(res)
-        except Exception as e: messagebox.showerror("Error", str(e))
-        self.configure(cursor="")
+        self.configure(cursor="watch"); out = self._get_temp_path("crop")
+        base_title = self.title()
+        src, start, end = self.current_video_path, self.start_time, self.end_time
+        def on_progress(info):
+            self.after(0, lambda: self.title(f"{base_title} - {format_progress(info, 'Cropping')}"))
+        def worker():
+            try:
+                res = crop_video_backend(src, start, end, out, progress=on_progress)
+                done = (lambda: self._update_current_video(res))
+            except Exception as e:
+                done = (lambda e=e: messagebox.showerror("Error", str(e), parent=self))
+            self.after(0, lambda: (self.title(base_title), self.configure(cursor=""), done()))
+        threading.Thread(target=worker, daemon=True).start()
 
     def _perform_delete(self):
         self.configure(cursor="watch"); self.update(); out = self._get_temp_path("del")
@@ -1219,14 +567,78 @@ class VideoEditorPopup(ctk.CTkToplevel):
         if not self.defaults or not self.defaults['folder']: return
         name = f"{self.defaults['name']}_frame_{int(time.time())}.jpg"
         path = os.path.join(self.defaults['folder'], name)
-        if extract_frame_backend(self.current_video_path, self.current_time, path):
-            messagebox.showinfo("Saved", f"Saved to:\n{name}")
+        self._start_frame_save(path, "Saved", f"Saved to:\n{name}")
 
     def _save_frame_as(self):
         output_path = filedialog.asksaveasfilename(defaultextension=".jpg", filetypes=[("JPEG", "*.jpg")])
-        if output_path:
-            if extract_frame_backend(self.current_video_path, self.current_time, output_path):
-                messagebox.showinfo("Done", "Frame Saved!")
+        if output_path: self._start_frame_save(output_path, "Done", "Frame Saved!")
+
+    def _start_frame_save(self, path, title, message):
+        # The backend waits on FFmpeg; keep the UI thread free so running jobs can still post updates
+        video_path, at = self.current_video_path, self.current_time
+        self.configure(cursor="watch")
+        def worker():
+            try:
+                extract_frame_backend(video_path, at, path)
+                msg = (lambda: messagebox.showinfo(title, message, parent=self))
+            except Exception as e:
+                msg = (lambda e=e: messagebox.showerror("Error", str(e), parent=self))
+            self.after(0, lambda: (self.configure(cursor=""), msg()))
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _open_batch_export_dialog(self):
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Batch Frame Export")
+        dialog.geometry("420x300")
+        dialog.transient(self)
+        dialog.grab_set()
+
+        ctk.CTkLabel(dialog, text="Export Frames", font=ctk.CTkFont(size=16, weight="bold")).pack(pady=10)
+        mode_menu = ctk.CTkOptionMenu(dialog, values=["Timestamps", "Every N Seconds", "Scene Changes"])
+        mode_menu.pack(fill="x", padx=20, pady=5)
+        value_entry = ctk.CTkEntry(dialog, placeholder_text="Timestamps (5, 1:30) / seconds / scene threshold 0-1")
+        value_entry.pack(fill="x", padx=20, pady=5)
+        value_entry.insert(0, f"{self.current_time:.2f}")
+
+        def on_mode(choice):
+            value_entry.delete(0, "end")
+            value_entry.insert(0, {"Timestamps": f"{self.current_time:.2f}", "Every N Seconds": "5", "Scene Changes": "0.3"}[choice])
+        mode_menu.configure(command=on_mode)
+
+        fmt_menu = ctk.CTkOptionMenu(dialog, values=["jpg", "png"])
+        fmt_menu.pack(fill="x", padx=20, pady=5)
+
+        def start():
+            mode, text = mode_menu.get(), value_entry.get().strip()
+            kwargs = {}
+            try:
+                if mode == "Timestamps": kwargs["timestamps"] = parse_timestamp_list(text)
+                elif mode == "Every N Seconds": kwargs["interval"] = float(text)
+                else: kwargs["scene_threshold"] = float(text)
+                if not any(kwargs.values()) and mode != "Scene Changes": raise ValueError("Nothing to export")
+            except ValueError as e:
+                return messagebox.showerror("Error", str(e), parent=dialog)
+            folder = (self.defaults or {}).get('folder') or filedialog.askdirectory(parent=dialog)
+            if not folder: return
+            dialog.destroy()
+            self._start_batch_export(folder, fmt_menu.get(), kwargs)
+
+        ctk.CTkButton(dialog, text="Export", command=start, fg_color="#16A085").pack(pady=20)
+
+    def _start_batch_export(self, folder, ext, kwargs):
+        base_title = self.title()
+        name = (self.defaults or {}).get('name') or os.path.splitext(os.path.basename(self.original_video_path))[0]
+        def on_progress(info):
+            self.after(0, lambda: self.title(f"{base_title} - {format_progress(info, 'Exporting frames')}"))
+        def worker():
+            try:
+                frames = extract_frames_batch_backend(self.current_video_path, folder, name_prefix=f"{name}_frame",
+                                                      ext=ext, progress=on_progress, **kwargs)
+                msg = (lambda: messagebox.showinfo("Done", f"Exported {len(frames)} frame(s) to:\n{folder}", parent=self))
+            except Exception as e:
+                msg = (lambda e=e: messagebox.showerror("Error", f"Batch export failed: {e}", parent=self))
+            self.after(0, lambda: (self.title(base_title), msg()))
+        threading.Thread(target=worker, daemon=True).start()
 
     def _set_start(self):
         self.start_time = self.slider.get()
@@ -1286,8 +698,26 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         self.editor_window_height = 600 
         self.gif_settings = {"fps": 10, "scale": 0.5, "speed": 1.0}
         self.ai_tools_dir = "" 
+        self.frame_store_settings = dict(DEFAULT_FRAME_STORE_SETTINGS)
+        self.convert_jobs = 0 # 0 = Auto (from core count)
+        self.convert_stream_copy = True
+        self.convert_chunked = False # single long files: keyframe chunks encoded in parallel
+        self.convert_skip_up_to_date = True
+        self.convert_manifest_hash = False
+        self.resize_jobs = 0 # 0 = Auto
+        self.sheet_settings = {"type": "Contact Sheet", "columns": 5, "rows": 4, "tile_width": 320, "interval": 10, "jobs": 0}
+        self.sprite_indexes = {} # clip path -> sprite index json (feeds the mini preview)
+        self.scheduler_limits = dict(DEFAULT_LIMITS) # concurrent jobs per resource (cpu / gpu / disk)
+        self.result_cache_settings = dict(DEFAULT_RESULT_CACHE_SETTINGS)
         
         self._load_settings_from_file()
+        result_cache.configure(self.result_cache_settings)
+
+        # Every tool runs through one queue so jobs never oversubscribe the machine
+        self.scheduler = JobScheduler(self.scheduler_limits, on_change=lambda job: self.after(0, self._on_jobs_changed))
+        self.job_panel = None
+        self.job_panel_pending = False
+        self.display_job = None # the running job shown on the progress bar / status button
 
         # Animation / Threading State
         self.current_anim_id = 0 
@@ -1315,6 +745,20 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         # --- REGISTER DRAG AND DROP ---
         self._setup_dnd_events()
 
+        # Warm up MoviePy / VLC once the window has painted, so the first clip loads fast
+        self.after(300, self._start_background_preload)
+
+    def _start_background_preload(self):
+        def preload():
+            try:
+                for module in ("moviepy", "proglog"): importlib.import_module(module)
+                if self.use_vlc_fullscreen and VLC_AVAILABLE: load_vlc()
+            except Exception as e:
+                print(f"Background preload failed: {e}")
+            mark_startup("background preload")
+            if "--profile-startup" in sys.argv: print(startup_report())
+        threading.Thread(target=preload, daemon=True).start()
+
     def _setup_dnd_events(self):
         if not DND_AVAILABLE: return
 
@@ -1459,8 +903,10 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         self._add_sidebar_btn("🚀", "Upscale", self._open_upscale_tool, fg_color="#8E44AD", hover="#5B2C6F")
         self._add_sidebar_btn("💨", "Smooth / FPS", self._open_interpolation_tool, fg_color="#E67E22", hover="#D35400")
         self._add_sidebar_btn("🎬", "GIF Tool", self._open_gif_converter, fg_color="#2ECC71", hover="#27AE60")
+        self._add_sidebar_btn("🧩", "Thumb Sheets", self._open_sheet_tool, fg_color="#2874A6", hover="#1B4F72")
         self._add_sidebar_btn("🔄", "Converter", self._open_converter_tool, fg_color="#16A085", hover="#117864")
         self._add_separator()
+        self._add_sidebar_btn("📋", "Job Queue", self._open_job_panel, fg_color="#5D6D7E", hover="#34495E")
         self._add_sidebar_btn("⚙️", "Settings", self._open_settings_dialog, fg_color="#555555", hover="#333333")
         self._add_sidebar_btn("❌", "Clear All", self._clear_list, fg_color="#C0392B", hover="#922B21")
         
@@ -1559,6 +1005,8 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         self.quick_save_btn.pack(side="left", padx=10)
         self.save_as_btn = ctk.CTkButton(btn_container, text="💾 Save As...", command=self._combine_save_as, fg_color="green", hover_color="#006400", width=180, height=40)
         self.save_as_btn.pack(side="left", padx=10)
+        self.cancel_btn = ctk.CTkButton(btn_container, text="⏹ Cancel", command=self._cancel_running_jobs, fg_color="#C0392B", hover_color="#922B21", state="disabled", width=100, height=40)
+        self.cancel_btn.pack(side="left", padx=10)
         
     def _force_background_bindings(self):
         try:
@@ -1603,6 +1051,16 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
                     self.editor_window_height = data.get("editor_window_height", 600)
                     if "gif_settings" in data: self.gif_settings = data["gif_settings"]
                     self.ai_tools_dir = data.get("ai_tools_dir", "")
+                    if "frame_store" in data: self.frame_store_settings.update(data["frame_store"])
+                    self.convert_jobs = data.get("convert_jobs", 0)
+                    self.convert_stream_copy = data.get("convert_stream_copy", True)
+                    self.convert_chunked = data.get("convert_chunked", False)
+                    self.convert_skip_up_to_date = data.get("convert_skip_up_to_date", True)
+                    self.convert_manifest_hash = data.get("convert_manifest_hash", False)
+                    self.resize_jobs = data.get("resize_jobs", 0)
+                    self.sheet_settings.update(data.get("sheet_settings", {}))
+                    self.scheduler_limits.update(data.get("scheduler_limits", {}))
+                    self.result_cache_settings.update(data.get("result_cache", {}))
             except Exception: pass
 
     def _save_settings_to_file(self):
@@ -1616,7 +1074,17 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
             "use_vlc_fullscreen": self.use_vlc_fullscreen,
             "editor_window_height": self.editor_window_height,
             "gif_settings": self.gif_settings,
-            "ai_tools_dir": self.ai_tools_dir
+            "ai_tools_dir": self.ai_tools_dir,
+            "frame_store": self.frame_store_settings,
+            "convert_jobs": self.convert_jobs,
+            "convert_stream_copy": self.convert_stream_copy,
+            "convert_chunked": self.convert_chunked,
+            "convert_skip_up_to_date": self.convert_skip_up_to_date,
+            "convert_manifest_hash": self.convert_manifest_hash,
+            "resize_jobs": self.resize_jobs,
+            "sheet_settings": self.sheet_settings,
+            "scheduler_limits": self.scheduler_limits,
+            "result_cache": self.result_cache_settings
         }
         try:
             with open(self.CONFIG_FILE, 'w') as f: json.dump(data, f, indent=4)
@@ -1657,7 +1125,7 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
             
             dialog = ctk.CTkToplevel(self)
             dialog.title("Resize / Crop Video")
-            dialog.geometry("400x450") # Increased height
+            dialog.geometry("400x550") # Increased height
             dialog.transient(self)
             dialog.grab_set()
             
@@ -1715,6 +1183,20 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
             mode_menu.configure(command=on_mode_change)
             on_mode_change("Fit (Black Bars)") # Init state
 
+            # --- Extra Renditions (same decode, split filter graph) ---
+            frame_extra = ctk.CTkFrame(dialog, fg_color="transparent")
+            frame_extra.pack(fill="x", padx=20, pady=5)
+            ctk.CTkLabel(frame_extra, text="Extra Sizes:", width=80, anchor="w").pack(side="left")
+            entry_extra = ctk.CTkEntry(frame_extra, placeholder_text="e.g. 720p, 854x480 crop top-left")
+            entry_extra.pack(side="left", padx=10, fill="x", expand=True)
+
+            frame_jobs = ctk.CTkFrame(dialog, fg_color="transparent")
+            frame_jobs.pack(fill="x", padx=20, pady=5)
+            ctk.CTkLabel(frame_jobs, text="Parallel Jobs:", width=80, anchor="w").pack(side="left")
+            jobs_menu = ctk.CTkOptionMenu(frame_jobs, values=["Auto", "1", "2", "4", "8"])
+            jobs_menu.pack(side="left", padx=10, fill="x", expand=True)
+            jobs_menu.set(str(self.resize_jobs) if self.resize_jobs else "Auto")
+
             # --- Scope Section ---
             frame_scope = ctk.CTkFrame(dialog, fg_color="transparent")
             frame_scope.pack(fill="x", padx=20, pady=10)
@@ -1744,6 +1226,9 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
                 elif "Crop" in m_val: mode = "crop"
                 
                 a_val = anchor_var.get().lower().replace(" ", "-") # "Top-Left" -> "top-left"
+
+                try: extras = parse_rendition_list(entry_extra.get(), default_mode=mode, default_anchor=a_val)
+                except ValueError as e: messagebox.showerror("Error", f"{e}\nFormat: WxH or 720p, optional mode (stretch/fit/crop) and anchor."); return
                 
                 # 3. Get Scope
                 indices = []
@@ -1752,11 +1237,14 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
                 
                 if not indices: return
                 
-                if not messagebox.askyesno("Confirm", f"Resize {len(indices)} clip(s)?\nTarget: {target_w}x{target_h}\nMode: {m_val}"): return
+                extra_txt = "".join(f"\n+ {w}x{h} ({m})" for w, h, m, _ in extras)
+                if not messagebox.askyesno("Confirm", f"Resize {len(indices)} clip(s)?\nTarget: {target_w}x{target_h}\nMode: {m_val}{extra_txt}"): return
                 
+                self.resize_jobs = 0 if jobs_menu.get() == "Auto" else int(jobs_menu.get())
+                self._save_settings_to_file()
                 dialog.destroy()
                 # Pass new args to thread starter
-                self._start_resize_thread(indices, target_w, target_h, mode, a_val)
+                self._start_resize_thread(indices, target_w, target_h, mode, a_val, extras)
 
             ctk.CTkButton(dialog, text="Apply Resize", command=run_resize, fg_color="#1F618D").pack(pady=20)
             
@@ -1764,46 +1252,90 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
             self._resume_mini_preview()
 
         # --- Update Thread Starter to accept extra args ---
-    def _start_resize_thread(self, indices, w, h, mode, anchor):
-            self.progress_bar.set(0)
-            self.save_as_btn.configure(text="Resizing...", state="disabled")
-            self.quick_save_btn.configure(state="disabled")
-            threading.Thread(target=self._resize_worker, args=(indices, w, h, mode, anchor), daemon=True).start()
+    def _start_resize_thread(self, indices, w, h, mode, anchor, extras=None):
+            def on_start():
+                self.progress_bar.set(0)
+                self.save_as_btn.configure(text="Resizing...", state="disabled")
+                self.quick_save_btn.configure(state="disabled")
+            # Workers get a snapshot; results are applied to playlist_data on the UI thread
+            jobs = [(idx, dict(self.playlist_data[idx])) for idx in indices if 0 <= idx < len(self.playlist_data)]
+            self._submit_job(f"Resize {len(jobs)} clip(s) to {w}x{h}", self._resize_worker, (jobs, w, h, mode, anchor, extras or [], self.resize_jobs),
+                             {"cpu": 1}, on_start=on_start)
 
         # --- Update Worker to pass args to backend ---
-    def _resize_worker(self, indices, w, h, mode, anchor):
-            total = len(indices)
-            success_count = 0
-            for step, idx in enumerate(indices):
-                item = self.playlist_data[idx]
-                
+    def _resize_worker(self, jobs, w, h, mode, anchor, extras, max_jobs=0):
+            total = len(jobs)
+            pool_size = max_jobs or default_job_count(threads_per_job=2)
+            enc_threads = threads_per_job(min(pool_size, max(1, total)))
+
+            fractions = {}
+            state = {"done": 0, "running": 0}
+            job = current_job()
+            def refresh():
+                overall = sum(fractions.values()) / total if total else 1.0
+                text = f"Resizing {state['done']}/{total} done, {state['running']} running · {int(overall * 100)}%"
+                self._update_progress_bar_safe(overall, job, text)
+
+            # Fix every output name up front so parallel jobs never write the same file
+            sizes = [(w, h, mode, anchor)] + list(extras)
+            names = [f"RESIZED_{m}_{sw}x{sh}_{os.path.splitext(item['name'])[0]}.mp4" for _, item in jobs for sw, sh, m, _ in sizes]
+            out_paths = unique_output_paths(names, os.path.abspath("."))
+
+            def resize_one(job):
+                pos, (idx, item) = job
                 # Skip only if exact same res AND mode is stretch (since other modes might change aspect ratio)
-                if item['res'] == (w, h) and mode == "stretch": 
-                    success_count += 1; continue
-                    
-                name_no_ext = os.path.splitext(item['name'])[0]
-                new_name = f"RESIZED_{mode}_{w}x{h}_{name_no_ext}.mp4"
-                out_path = os.path.abspath(new_name)
-                
-                self.after(0, lambda p=(step/total): self.progress_bar.set(p))
-                
-                try:
-                    # CALL BACKEND WITH NEW ARGS
-                    resize_clip_backend(item['path'], w, h, out_path, mode=mode, anchor=anchor)
-                    
-                    new_meta = extract_clip_metadata(out_path)
-                    self.playlist_data[idx] = {'path': out_path, 'thumb': new_meta['thumb'], 'name': new_name, 'duration': new_meta['duration'], 'res': new_meta['resolution'], 'fps': new_meta['fps'], 'size_str': new_meta['size_str']}
-                    success_count += 1
-                except Exception as e:
-                    print(f"Resize failed: {e}")
-                    
-            self.after(0, lambda: self.progress_bar.set(1.0))
-            self.after(0, self._on_resize_complete)
+                if tuple(item['res']) == (w, h) and mode == "stretch" and not extras:
+                    fractions[idx] = 1.0
+                    return None
+
+                base = pos * len(sizes)
+                out_path = out_paths[base]
+                new_name = os.path.basename(out_path)
+
+                # Primary size replaces the clip, extra sizes come from the same decode and are added as new clips
+                renditions = [{"width": sw, "height": sh, "mode": m, "anchor": a, "output": out_paths[base + i]}
+                              for i, (sw, sh, m, a) in enumerate(sizes)]
+
+                def on_progress(info):
+                    if info.fraction is None: return
+                    fractions[idx] = info.fraction
+                    refresh()
+
+                outputs = resize_renditions_backend(item['path'], renditions, progress=on_progress, threads=enc_threads)
+                fractions[idx] = 1.0
+                new_meta = extract_clip_metadata(out_path)
+                new_entry = {'path': out_path, 'thumb': new_meta['thumb'], 'name': new_name, 'duration': new_meta['duration'], 'res': new_meta['resolution'], 'fps': new_meta['fps'], 'size_str': new_meta['size_str']}
+                return new_entry, outputs[1:]
+
+            def on_pool_progress(done, running, _total):
+                state["done"], state["running"] = done, running
+                refresh()
+
+            results = run_parallel(enumerate(jobs), resize_one, pool_size, on_pool_progress)
+            for (idx, item), (ok, val) in zip(jobs, results):
+                if not ok: print(f"Resize failed ({item['name']}): {val}")
+
+            self._show_job_progress(1.0, job)
+            self.after(0, lambda: self._apply_resize_results(jobs, results))
+
+    def _apply_resize_results(self, jobs, results):
+        """UI thread: swap resized clips into the playlist in one pass, then add extra renditions."""
+        extra_outputs = []
+        for (idx, item), (ok, val) in zip(jobs, results):
+            if not ok or val is None: continue
+            new_entry, extras = val
+            extra_outputs.extend(extras)
+            # The playlist may have been reordered while we worked; find the clip by its original path
+            if not (idx < len(self.playlist_data) and self.playlist_data[idx]['path'] == item['path']):
+                idx = next((i for i, it in enumerate(self.playlist_data) if it['path'] == item['path']), -1)
+            if idx >= 0: self.playlist_data[idx] = new_entry
+        for path in extra_outputs: self._add_clip_from_path(path, mark_new=True)
+        self._update_total_duration()
+        self._on_resize_complete()
 
     def _on_resize_complete(self):
         self._render_playlist() 
-        self.save_as_btn.configure(text="💾 Combine & Save As...", state="normal")
-        if self.default_folder: self.quick_save_btn.configure(state="normal")
+        self._restore_action_buttons()
         if self.selected_index == -1 and self.playlist_data: self._select_item(0)
         elif self.selected_index >= 0: self._select_item(self.selected_index)
         messagebox.showinfo("Done", "Resolution resizing complete!")
@@ -1813,7 +1345,7 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         
         dialog = ctk.CTkToplevel(self)
         dialog.title("🚀 High-Quality Upscaler")
-        dialog.geometry("500x620") 
+        dialog.geometry("500x720") 
         dialog.transient(self)
         dialog.grab_set()
 
@@ -1853,14 +1385,24 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
                 self.sharpen_switch.configure(state="disabled")
                 self.face_chk.configure(state="normal", text="Enhance Faces (Requires 'run_codeformer.bat')")
                 self.vram_menu.configure(state="normal")
+                self.rife_chk.configure(state="normal")
+                on_rife_change()
                 status_lbl.configure(text="ℹ️ AI Mode active.", text_color="#3498DB")
             else:
                 self.algo_menu.configure(state="normal")
                 self.sharpen_switch.configure(state="normal")
                 self.face_chk.configure(state="disabled", text="Enhance Faces (AI Only)")
                 self.vram_menu.configure(state="disabled")
+                self.rife_chk.configure(state="disabled")
+                self.rife_mult_menu.configure(state="disabled")
+                self.rife_first_switch.configure(state="disabled")
                 status_lbl.configure(text="")
 
+        def on_rife_change():
+            state = "normal" if self.rife_chain_var.get() else "disabled"
+            self.rife_mult_menu.configure(state=state)
+            self.rife_first_switch.configure(state=state)
+
         r1 = ctk.CTkRadioButton(engine_frame, text="Standard (FFmpeg) - Fast, Good for minor resizing", variable=self.engine_var, value="FFmpeg", command=on_engine_change)
         r1.pack(anchor="w", padx=20, pady=5)
         
@@ -1870,6 +1412,18 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         self.face_chk = ctk.CTkCheckBox(engine_frame, text="Enhance Faces (AI Only)", variable=self.face_enhance_var, state="disabled")
         self.face_chk.pack(anchor="w", padx=40, pady=5)
 
+        # Upscale + RIFE in one job: frames are extracted once and encoded once (videos only)
+        self.rife_chain_var = ctk.BooleanVar(value=False)
+        self.rife_first_var = ctk.BooleanVar(value=False)
+        self.rife_chk = ctk.CTkCheckBox(engine_frame, text="Also Smooth Motion (RIFE, same job)", variable=self.rife_chain_var, state="disabled", command=on_rife_change)
+        self.rife_chk.pack(anchor="w", padx=40, pady=5)
+        rife_row = ctk.CTkFrame(engine_frame, fg_color="transparent")
+        rife_row.pack(fill="x", padx=60, pady=(0, 10))
+        self.rife_mult_menu = ctk.CTkOptionMenu(rife_row, values=["2x FPS", "4x FPS"], width=90, state="disabled")
+        self.rife_mult_menu.pack(side="left")
+        self.rife_first_switch = ctk.CTkSwitch(rife_row, text="Interpolate first (faster)", variable=self.rife_first_var, state="disabled")
+        self.rife_first_switch.pack(side="left", padx=10)
+
         # 3. Settings Grid
         grid_frame = ctk.CTkFrame(dialog)
         grid_frame.pack(fill="x", padx=20, pady=10)
@@ -1917,13 +1471,18 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
             
             name, ext = os.path.splitext(os.path.basename(src))
             suffix = "_AI_x" + str(factor) if "AI" in mode else f"_Upscale_x{factor}"
+            smooth = None
+            if "AI" in mode and self.rife_chain_var.get() and ext.lower() not in ['.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tiff']:
+                smooth = {"multiplier": 4 if "4x" in self.rife_mult_menu.get() else 2, "interpolate_first": self.rife_first_var.get()}
+                suffix += f"_RIFE{smooth['multiplier']}x"
             new_name = f"{name}{suffix}{ext}"
             
             save_path = filedialog.asksaveasfilename(initialfile=new_name, defaultextension=ext)
             if not save_path: return
             
             dialog.destroy()
-            self._start_upscale_thread_v2(src, save_path, factor, mode, self.algo_menu.get(), self.sharpen_var.get(), tile_size)
+            self._start_upscale_thread_v2(src, save_path, factor, mode, self.algo_menu.get(), self.sharpen_var.get(), tile_size,
+                                          smooth=smooth, enhance_faces=self.face_enhance_var.get())
 
         ctk.CTkButton(dialog, text="Start Processing", command=run_upscale, fg_color="#8E44AD", height=40).pack(fill="x", padx=20, pady=20)
 
@@ -1931,48 +1490,58 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         self.wait_window(dialog)
         self._resume_mini_preview()
 
-    def _start_upscale_thread_v2(self, src, dest, factor, mode, algo_name, sharpen, tile_size):
-        self.save_as_btn.configure(state="disabled")
-        self.quick_save_btn.configure(state="disabled")
-        
-        # 1. Indeterminate Animation (Pulsing)
-        self.progress_bar.configure(mode="indeterminate")
-        self.progress_bar.start()
-        
-        # 2. Start Timer
-        self._start_processing_timer("Upscaling")
+    def _start_upscale_thread_v2(self, src, dest, factor, mode, algo_name, sharpen, tile_size, smooth=None, enhance_faces=False):
+        def on_start():
+            self.save_as_btn.configure(state="disabled")
+            self.quick_save_btn.configure(state="disabled")
+            
+            # 1. Indeterminate Animation (Pulsing)
+            self.progress_bar.configure(mode="indeterminate")
+            self.progress_bar.start()
+            
+            # 2. Start Timer
+            self._start_processing_timer("Upscaling")
         
-        threading.Thread(target=self._upscale_worker_v2, args=(src, dest, factor, mode, algo_name, sharpen, tile_size), daemon=True).start()
+        # AI upscaling holds the GPU and writes a lot of intermediate frames
+        resources = {"gpu": 1, "disk": 1} if "AI" in mode else {"cpu": 1}
+        label = f"Upscale x{factor}" + (f" + RIFE {smooth['multiplier']}x" if smooth else "")
+        self._submit_job(f"{label}: {os.path.basename(src)}", self._upscale_worker_v2,
+                         (src, dest, factor, mode, algo_name, sharpen, tile_size, smooth, enhance_faces), resources, on_start=on_start)
 
-    def _upscale_worker_v2(self, src, dest, factor, mode, algo_name, sharpen, tile_size):
+    def _upscale_worker_v2(self, src, dest, factor, mode, algo_name, sharpen, tile_size, smooth=None, enhance_faces=False):
         try:
-            if "AI" in mode:
+            if smooth:
+                # One frame dump, realesrgan -> RIFE on the same frames, one encode (pipeline.py)
+                enhance_video_ai_backend(src, dest, factor, smooth["multiplier"], smooth["interpolate_first"], enhance_faces=enhance_faces,
+                                         tile_size=tile_size, exe_dir=self.ai_tools_dir, frame_store=self.frame_store_settings,
+                                         progress=self._make_ffmpeg_progress("Enhancing"))
+            elif "AI" in mode:
                 # For AI, we can map the logger to determinate progress if available
                 # But typically AI init takes time, so we switch modes
+                job = current_job()
                 def ai_logger(pct):
+                    if job: job.set_progress(pct, f"Upscaling {int(pct * 100)}%")
                     # Switch to determinate once we have real progress
-                    self.after(0, lambda: self.progress_bar.configure(mode="determinate"))
-                    self.after(0, lambda: self.progress_bar.stop())
-                    self.after(0, lambda: self.progress_bar.set(pct))
+                    self._show_job_progress(pct, job)
 
-                success, msg = upscale_with_ai_backend(src, dest, factor, ai_logger, exe_dir=self.ai_tools_dir, tile_size=tile_size)
+                success, msg = upscale_with_ai_backend(src, dest, factor, ai_logger, exe_dir=self.ai_tools_dir, tile_size=tile_size, frame_store=self.frame_store_settings)
                 if not success: raise Exception(msg)
             else:
                 # FFmpeg Backend
                 algo_map = {"Lanczos (Sharp)": "lanczos", "Spline (Smooth)": "spline", "Neighbor": "neighbor"}
-                upscale_media_backend(src, dest, factor, None, None, algo_map.get(algo_name, "lanczos"), sharpen)
+                upscale_media_backend(src, dest, factor, None, None, algo_map.get(algo_name, "lanczos"), sharpen, progress=self._make_ffmpeg_progress("Upscaling"))
             
             self.after(0, lambda: self._on_upscale_success_ui(dest))
                 
         except Exception as e:
             err_msg = str(e)
+            if current_job(): current_job().fail(err_msg)
             if "Executable not found" in err_msg:
                 self.after(0, lambda: messagebox.showwarning("AI Engine Missing", "Please check AI Tools settings."))
             else:
                 self.after(0, lambda: messagebox.showerror("Error", err_msg))
         
-        # 3. Stop Timer and Reset UI
-        self.is_processing = False 
+        # 3. Reset UI (the status timer stops with the job)
         self.after(0, self._on_upscale_finished)
 
     def _on_upscale_success_ui(self, dest_path):
@@ -1995,11 +1564,7 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
                 self._resume_mini_preview() # <--- RESUME
 
     def _on_upscale_finished(self):
-        self.progress_bar.stop()
-        self.progress_bar.configure(mode="determinate")
-        self.progress_bar.set(0)
-        self.save_as_btn.configure(text="💾 Combine & Save As...", state="normal")
-        if self.default_folder: self.quick_save_btn.configure(state="normal")
+        self._restore_action_buttons()
 
     def _open_interpolation_tool(self):
         self._pause_mini_preview() # <--- PAUSE
@@ -2109,37 +1674,42 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         self._resume_mini_preview() # <--- RESUME
 
     def _start_interpolation_thread(self, src, dest, mode, fps, multiplier):
-        self.save_as_btn.configure(state="disabled")
-        self.quick_save_btn.configure(state="disabled")
-        
-        # 1. Indeterminate Animation
-        self.progress_bar.configure(mode="indeterminate")
-        self.progress_bar.start()
-        
-        # 2. Start Timer
-        self._start_processing_timer("Interpolating")
+        def on_start():
+            self.save_as_btn.configure(state="disabled")
+            self.quick_save_btn.configure(state="disabled")
+            
+            # 1. Indeterminate Animation
+            self.progress_bar.configure(mode="indeterminate")
+            self.progress_bar.start()
+            
+            # 2. Start Timer
+            self._start_processing_timer("Interpolating")
         
-        threading.Thread(target=self._interpolation_worker, args=(src, dest, mode, fps, multiplier), daemon=True).start()
+        resources = {"cpu": 1} if mode == "ffmpeg" else {"gpu": 1, "disk": 1}
+        self._submit_job(f"Interpolate to {fps} fps: {os.path.basename(src)}", self._interpolation_worker,
+                         (src, dest, mode, fps, multiplier), resources, on_start=on_start)
 
     def _interpolation_worker(self, src, dest, mode, fps, multiplier):
+        job = current_job()
         def logger(pct):
+            if job: job.set_progress(pct, f"Interpolating {int(pct * 100)}%")
             # Switch to determinate once progress starts
-            self.after(0, lambda: self.progress_bar.configure(mode="determinate"))
-            self.after(0, lambda: self.progress_bar.stop())
-            self.after(0, lambda: self.progress_bar.set(pct))
+            self._show_job_progress(pct, job)
 
         try:
-            success, msg = interpolate_video_backend(src, dest, method=mode, target_fps=fps, multiplier=multiplier, logger=logger, exe_dir=self.ai_tools_dir)
+            success, msg = interpolate_video_backend(src, dest, method=mode, target_fps=fps, multiplier=multiplier, logger=logger, exe_dir=self.ai_tools_dir, frame_store=self.frame_store_settings)
             
             if success:
                 self.after(0, lambda: self._on_upscale_success_ui(dest)) 
             else:
+                if job: job.fail(msg)
                 self.after(0, lambda: messagebox.showerror("Error", msg))
         except Exception as e:
-            self.after(0, lambda: messagebox.showerror("Error", str(e)))
+            err_msg = str(e)
+            if job: job.fail(err_msg)
+            self.after(0, lambda: messagebox.showerror("Error", err_msg))
             
-        # 3. Stop Timer and Reset
-        self.is_processing = False
+        # 3. Reset (the status timer stops with the job)
         self.after(0, self._on_upscale_finished)
         
     def _open_converter_tool(self):
@@ -2147,7 +1717,7 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         
         dialog = ctk.CTkToplevel(self)
         dialog.title("Universal Converter (Batch)")
-        dialog.geometry("550x600") # Increased height for new option
+        dialog.geometry("550x750") # Increased height for new option
         dialog.transient(self)
         dialog.grab_set()
         
@@ -2216,6 +1786,26 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
 
         ctk.CTkLabel(set_frame, text="(Ultrafast = Faster but larger file size)", text_color="gray", font=("Arial", 10)).grid(row=3, column=0, columnspan=2, pady=(0,5))
 
+        # Row 4: Parallel Jobs (Batch only)
+        ctk.CTkLabel(set_frame, text="Parallel Jobs:").grid(row=4, column=0, padx=10, pady=10, sticky="w")
+        jobs_menu = ctk.CTkOptionMenu(set_frame, values=["Auto", "1", "2", "4", "8", "16"])
+        jobs_menu.grid(row=4, column=1, padx=10, pady=10, sticky="e")
+        jobs_menu.set(str(self.convert_jobs) if self.convert_jobs else "Auto")
+
+        # Row 5: Stream Copy
+        copy_var = ctk.BooleanVar(value=self.convert_stream_copy)
+        ctk.CTkSwitch(set_frame, text="Remux without re-encoding when only the container changes (fast)", variable=copy_var).grid(row=5, column=0, columnspan=2, padx=10, pady=(0, 10), sticky="w")
+
+        # Row 6: Incremental Batch (Manifest in the output folder)
+        skip_var = ctk.BooleanVar(value=self.convert_skip_up_to_date)
+        hash_var = ctk.BooleanVar(value=self.convert_manifest_hash)
+        ctk.CTkSwitch(set_frame, text="Batch: skip up-to-date outputs", variable=skip_var).grid(row=6, column=0, padx=10, pady=(0, 10), sticky="w")
+        ctk.CTkCheckBox(set_frame, text="Verify by content hash", variable=hash_var).grid(row=6, column=1, padx=10, pady=(0, 10), sticky="e")
+
+        # Row 7: Chunked Encode (single long files use every core)
+        chunk_var = ctk.BooleanVar(value=self.convert_chunked)
+        ctk.CTkSwitch(set_frame, text="Single long video: encode keyframe chunks in parallel", variable=chunk_var).grid(row=7, column=0, columnspan=2, padx=10, pady=(0, 10), sticky="w")
+
         def update_options(first_path):
             try:
                 ext = os.path.splitext(first_path)[1].lower()
@@ -2238,6 +1828,13 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
             fmt = format_menu.get().split(" ")[0].lower()
             qual = quality_menu.get()
             spd = speed_menu.get()
+            jobs_val = jobs_menu.get()
+            self.convert_jobs = 0 if jobs_val == "Auto" else int(jobs_val)
+            self.convert_stream_copy = copy_var.get()
+            self.convert_skip_up_to_date = skip_var.get()
+            self.convert_manifest_hash = hash_var.get()
+            self.convert_chunked = chunk_var.get()
+            self._save_settings_to_file()
             
             if len(self.convert_files) == 1:
                 src = self.convert_files[0]
@@ -2265,92 +1862,279 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         self._resume_mini_preview()
         
     def _start_converter_thread(self, src_list, dest, quality, speed, is_batch=False, target_fmt=None):
-            self.save_as_btn.configure(state="disabled")
-            self.quick_save_btn.configure(state="disabled")
-            self.progress_bar.configure(mode="indeterminate")
-            self.progress_bar.start()
-            
-            # --- TIMER SETUP ---
-            self.convert_start_time = time.time()
-            self.convert_total_items = len(src_list)
-            self.convert_current_item = 0
-            self.is_converting = True
-            self._update_conversion_timer() # Start the UI timer loop
-            
-            threading.Thread(target=self._converter_worker, args=(src_list, dest, quality, speed, is_batch, target_fmt), daemon=True).start()
+            def on_start():
+                self.save_as_btn.configure(state="disabled")
+                self.quick_save_btn.configure(state="disabled")
+                self.progress_bar.configure(mode="indeterminate")
+                self.progress_bar.start()
+                self._start_processing_timer("Converting")
+            
+            src_list = list(src_list)
+            label = f"Convert {len(src_list)} file(s) to {target_fmt}" if is_batch else f"Convert {os.path.basename(src_list[0])}"
+            # Settings are captured now; the dialog may change them while this job waits in the queue
+            settings = {"jobs": self.convert_jobs, "stream_copy": self.convert_stream_copy, "chunked": self.convert_chunked,
+                        "skip_up_to_date": self.convert_skip_up_to_date, "manifest_hash": self.convert_manifest_hash}
+            self._submit_job(label, self._converter_worker, (src_list, dest, quality, speed, is_batch, target_fmt, settings),
+                             {"cpu": 1}, on_start=on_start)
             
     def _start_processing_timer(self, action_name="Processing"):
-        """Generic timer for Upscale, Interpolate, and Combine."""
-        self.process_start_time = time.time()
-        self.is_processing = True
+        """Generic timer for Upscale, Interpolate, Combine and Convert. Call from on_start; runs as long as that job does."""
+        job = self.display_job
         
         def _timer_loop():
-            if self.is_processing:
-                elapsed = int(time.time() - self.process_start_time)
-                mins, secs = divmod(elapsed, 60)
-                # Update button text: "Upscaling... (00:12)"
-                self.save_as_btn.configure(text=f"{action_name}... ({mins:02}:{secs:02})")
-                self.after(1000, _timer_loop)
+            if job is None or job.state != RUNNING: return
+            if self._owns_display(job):
+                mins, secs = divmod(int(job.elapsed), 60)
+                # Update button text: "Upscaling... (00:12)" or "Upscaling 42% · 3.1x · ETA 00:35 (00:12)"
+                status = job.status or f"{action_name}..."
+                self.save_as_btn.configure(text=f"{status} ({mins:02}:{secs:02})")
+            self.after(1000, _timer_loop)
         
         _timer_loop()
 
-    def _update_conversion_timer(self):
-            """Updates the button text with live timer and progress."""
-            if self.is_converting:
-                elapsed = int(time.time() - self.convert_start_time)
-                mins, secs = divmod(elapsed, 60)
-                
-                # Text: "Processing 1/5... (00:12)"
-                status_text = f"Processing {self.convert_current_item}/{self.convert_total_items}... ({mins:02}:{secs:02})"
-                self.save_as_btn.configure(text=status_text)
-                
-                # Schedule next update in 1 second
-                self.after(1000, self._update_conversion_timer)
-
-  # IMPORTANT: The definition line MUST include 'speed'
-    def _converter_worker(self, src_list, dest, quality, speed, is_batch, target_fmt):
-        success_count = 0
-        errors = []
+    # --- Shared Progress Interface ---
+    def _display_job(self):
+        """UI thread: the job on the progress bar. The selected / latest started one, until it stops running."""
+        job = self.display_job
+        if job is None or job.state != RUNNING:
+            running = [j for j in self.scheduler.snapshot() if j.state == RUNNING]
+            job = self.display_job = max(running, key=lambda j: j.started_at) if running else None
+        return job
+
+    def _owns_display(self, job):
+        return job is None or job is self._display_job()
+
+    def _show_job(self, job):
+        """Puts a running job on the progress bar (Job Queue 'Show' button, or the next job once the shown one ends)."""
+        self.display_job = job
+        self.progress_bar.stop()
+        self.progress_bar.configure(mode="determinate")
+        self.progress_bar.set(job.progress)
+        if job.status: self.save_as_btn.configure(text=job.status)
+
+    def _show_job_progress(self, pct, job, status=None):
+        """Thread-safe bar (and button text) update; ignored while another job owns the display."""
+        def apply():
+            if not self._owns_display(job): return
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="determinate")
+            self.progress_bar.set(pct)
+            if status: self.save_as_btn.configure(text=status)
+        self.after(0, apply)
+
+    def _update_progress_bar_safe(self, pct, job=None, status=None):
+        """Thread-safe determinate progress update (MoviePy logger / AI stages / batch tools without a status timer)."""
+        job = job or current_job()
+        if job: job.set_progress(pct, status)
+        self._show_job_progress(pct, job, status)
+
+    def _make_ffmpeg_progress(self, label, offset=0.0, span=1.0):
+        """
+        Returns a progress(FFmpegProgress) callback for the FFmpeg backends.
+        offset/span map one file into its slice of a batch on the progress bar.
+        Safe to call from worker threads.
+        """
+        job = current_job()
+        def callback(info):
+            if info.fraction is None: return
+            status = format_progress(info, label)
+            if job: job.set_progress(offset + info.fraction * span, status)
+            # The status timer puts job.status on the button
+            self._show_job_progress(offset + info.fraction * span, job)
+        return callback
+
+    # --- Job Queue ---
+    def _submit_job(self, name, worker, args=(), resources=None, priority=0, on_start=None):
+        """Queues a tool worker; on_start runs on the UI thread once the job gets its slots."""
+        def start():
+            # The latest started job takes over the progress bar; on_start sets it up
+            job = current_job()
+            def begin():
+                self.display_job = job
+                if on_start: on_start()
+            self.after(0, begin)
+        job = self.scheduler.submit(name, worker, args, resources, priority, on_start=start)
+        self.cancel_btn.configure(state="normal")
+        if job.state == QUEUED: print(f"Queued '{name}' (waiting for {', '.join(job.resources)} slot)")
+        return job
+
+    def _restore_action_buttons(self):
+        """Back to idle once no job is running; otherwise the remaining jobs keep the status."""
+        if any(j.state == RUNNING for j in self.scheduler.snapshot()): return
+        self.display_job = None
+        self.cancel_btn.configure(state="disabled")
+        self.progress_bar.stop()
+        self.progress_bar.configure(mode="determinate")
+        self.progress_bar.set(0)
+        self.save_as_btn.configure(text="💾 Combine & Save As...", state="normal")
+        if self.default_folder: self.quick_save_btn.configure(state="normal")
 
-        for i, src in enumerate(src_list):
-            self.convert_current_item = i + 1 # Update counter for the timer
-            
-            try:
-                # Determine Output Path
-                if is_batch:
-                    name = os.path.splitext(os.path.basename(src))[0].replace("_converted", "") 
-                    out_path = os.path.join(dest, f"{name}_conv.{target_fmt}")
-                else:
-                    out_path = dest
+    def _cancel_job(self, job):
+        if job.state == RUNNING and not messagebox.askyesno("Cancel Job", f"Stop '{job.name}'?\n\nThe running process is killed and its partial output deleted. Files a batch already finished are kept."):
+            return
+        self.scheduler.cancel(job)
+
+    def _cancel_running_jobs(self):
+        running = [j for j in self.scheduler.snapshot() if j.state == RUNNING]
+        if not running: return
+        names = "\n".join(f"• {j.name}" for j in running)
+        if not messagebox.askyesno("Cancel", f"Stop the running job(s)?\n\n{names}\n\nQueued jobs stay in the Job Queue."): return
+        self.scheduler.cancel_running()
+        self.save_as_btn.configure(text="Cancelling...")
+
+    def _on_jobs_changed(self):
+        # Progress updates arrive in bursts; redraw the panel at most 4x per second
+        if not self.job_panel_pending:
+            self.job_panel_pending = True
+            self.after(250, self._refresh_job_panel)
+        # The shown job ended: hand the bar to the latest job still running
+        shown = self.display_job
+        if shown is not None and shown.state != RUNNING and self._display_job(): self._show_job(self.display_job)
+        self._restore_action_buttons()
+
+    def _open_job_panel(self):
+        if self.job_panel is not None and self.job_panel.winfo_exists():
+            self.job_panel.lift(); return
+        panel = ctk.CTkToplevel(self)
+        panel.title("Job Queue")
+        panel.geometry("640x480")
+        self.job_panel = panel
+
+        top = ctk.CTkFrame(panel, fg_color="transparent")
+        top.pack(fill="x", padx=10, pady=10)
+        limit_entries = {}
+        for res in ("cpu", "gpu", "disk"):
+            ctk.CTkLabel(top, text=f"{res.upper()} slots:").pack(side="left", padx=(5, 2))
+            entry = ctk.CTkEntry(top, width=40)
+            entry.insert(0, str(self.scheduler_limits.get(res, 1)))
+            entry.pack(side="left")
+            limit_entries[res] = entry
+        def apply_limits():
+            try: limits = {res: max(1, int(e.get())) for res, e in limit_entries.items()}
+            except ValueError: return messagebox.showerror("Error", "Slots must be whole numbers.", parent=panel)
+            self.scheduler_limits.update(limits)
+            self.scheduler.set_limits(limits)
+            self._save_settings_to_file()
+        ctk.CTkButton(top, text="Apply", width=60, command=apply_limits).pack(side="left", padx=8)
+        pause_var = ctk.BooleanVar(value=self.scheduler.paused)
+        ctk.CTkSwitch(top, text="Hold Queue", variable=pause_var, command=lambda: self.scheduler.set_paused(pause_var.get())).pack(side="left", padx=8)
+        ctk.CTkButton(top, text="Clear Finished", width=100, fg_color="gray", command=self.scheduler.clear_finished).pack(side="right", padx=5)
+
+        self.job_list_frame = ctk.CTkScrollableFrame(panel)
+        self.job_list_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self._refresh_job_panel()
+
+    def _refresh_job_panel(self):
+        self.job_panel_pending = False
+        if self.job_panel is None or not self.job_panel.winfo_exists(): return
+        for w in self.job_list_frame.winfo_children(): w.destroy()
+        colors = {QUEUED: "gray", RUNNING: "#3498DB", DONE: "#2ECC71", FAILED: "#E74C3C", CANCELLED: "#7F8C8D"}
+        def fmt(seconds):
+            mins, secs = divmod(int(seconds), 60)
+            return f"{mins:02}:{secs:02}"
+        jobs = self.scheduler.snapshot()
+        if not jobs:
+            ctk.CTkLabel(self.job_list_frame, text="No jobs yet. Tools started from the sidebar show up here.", text_color="gray").pack(pady=20)
+        for job in jobs:
+            row = ctk.CTkFrame(self.job_list_frame)
+            row.pack(fill="x", pady=3)
+            head = ctk.CTkFrame(row, fg_color="transparent")
+            head.pack(fill="x", padx=5, pady=(5, 0))
+            ctk.CTkLabel(head, text=f"#{job.id} {job.name}", anchor="w", font=("Arial", 12, "bold")).pack(side="left")
+            ctk.CTkLabel(head, text=job.state.upper(), text_color=colors.get(job.state, "white"), width=80).pack(side="right")
+            if job.state == RUNNING and job is not self.display_job:
+                ctk.CTkButton(head, text="Show", width=50, command=lambda j=job: self._show_job(j)).pack(side="right", padx=2)
+            if job.active:
+                ctk.CTkButton(head, text="✖", width=28, fg_color="#C0392B", command=lambda j=job: self._cancel_job(j)).pack(side="right", padx=2)
+            if job.state == QUEUED:
+                ctk.CTkButton(head, text="▼", width=28, command=lambda j=job: self.scheduler.set_priority(j, j.priority - 1)).pack(side="right", padx=2)
+                ctk.CTkButton(head, text="▲", width=28, command=lambda j=job: self.scheduler.set_priority(j, j.priority + 1)).pack(side="right", padx=2)
+            bar = ctk.CTkProgressBar(row, height=8)
+            bar.pack(fill="x", padx=5, pady=3)
+            bar.set(job.progress)
+            timing = f"waited {fmt(job.waited)}" + (f" · ran {fmt(job.elapsed)}" if job.started_at else "")
+            detail = job.error or job.status
+            info = f"{timing} · priority {job.priority} · {', '.join(f'{k}:{v}' for k, v in job.resources.items())}"
+            ctk.CTkLabel(row, text=info + (f"\n{detail}" if detail else ""), anchor="w", justify="left",
+                         text_color="#E74C3C" if job.error else "gray", wraplength=560).pack(fill="x", padx=5, pady=(0, 5))
+        # Keep the timers ticking while something is running
+        if any(j.state == RUNNING for j in jobs) and not self.job_panel_pending:
+            self.job_panel_pending = True
+            self.after(1000, self._refresh_job_panel)
 
-                # Call Backend with Speed
-                res, msg = universal_convert_backend(src, out_path, quality, speed)
-                
-                if res: 
-                    success_count += 1
-                else: 
-                    errors.append(f"{os.path.basename(src)}: {msg}")
-                    
-            except Exception as e:
-                errors.append(f"{os.path.basename(src)}: {str(e)}")
+  # IMPORTANT: The definition line MUST include 'speed'
+    def _converter_worker(self, src_list, dest, quality, speed, is_batch, target_fmt, settings):
+        # Determine Output Paths up front (duplicate names get _2, _3... in list order)
+        if is_batch:
+            names = [f"{os.path.splitext(os.path.basename(src))[0].replace('_converted', '')}_conv.{target_fmt}" for src in src_list]
+            out_paths = unique_output_paths(names, dest)
+        else:
+            out_paths = [dest]
+
+        # Audio / image jobs are effectively single-threaded, video encoders want a few cores each
+        image_exts = ('.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tiff', '.ico')
+        light_job = target_fmt in ('mp3', 'wav', 'm4a') or all(src.lower().endswith(image_exts) for src in src_list)
+        jobs = settings["jobs"] or default_job_count(threads_per_job=1 if light_job else 4)
+        enc_threads = 0 if light_job else threads_per_job(jobs)
+        # One file has the whole machine: its chunks get the worker slots a batch would use
+        chunked = settings["chunked"] and len(src_list) == 1 and not light_job
+
+        # Incremental batches: outputs recorded in the folder manifest with the same source + settings are skipped
+        manifest = None
+        skipped = 0
+        if is_batch and settings["skip_up_to_date"]:
+            manifest = ConversionManifest(dest, use_hash=settings["manifest_hash"])
+            params = {"quality": quality, "speed": speed, "format": target_fmt, "stream_copy": settings["stream_copy"]}
+            pending = [(src, out) for src, out in zip(src_list, out_paths) if not manifest.is_up_to_date(src, out, params)]
+            skipped = len(src_list) - len(pending)
+            if skipped: print(f"Skipping {skipped} up-to-date file(s).")
+            src_list, out_paths = [p[0] for p in pending], [p[1] for p in pending]
+
+        # Per-file fractions -> one overall percentage (single files also show speed / ETA)
+        fractions = {}
+        state = {"done": 0, "running": 0, "extra": ""}
+        sched_job = current_job()
+        def status_text():
+            # The status timer shows it as "12/80 done, 4 running · 37% (00:12)"
+            text = f"{state['done']}/{len(src_list)} done, {state['running']} running"
+            return text + (f" · {state['extra']}" if state["extra"] else "")
+        if sched_job: sched_job.set_progress(status=status_text())
+        def convert_one(job):
+            src, out_path = job
+            def on_file_progress(info):
+                if info.fraction is None: return
+                fractions[out_path] = info.fraction
+                overall = sum(fractions.values()) / len(src_list)
+                state["extra"] = format_progress(info, "").strip() if len(src_list) == 1 else f"{int(overall * 100)}%"
+                if sched_job: sched_job.set_progress(overall, status_text())
+                self._show_job_progress(overall, sched_job)
+            chunk_args = {"chunked": True, "chunk_jobs": jobs} if chunked else {}
+            res, msg = universal_convert_backend(src, out_path, quality, speed, threads=enc_threads, stream_copy=settings["stream_copy"],
+                                                 progress=on_file_progress, **chunk_args)
+            fractions[out_path] = 1.0
+            if manifest:
+                if res: manifest.record(src, out_path, params)
+                else: manifest.forget(out_path)
+                manifest.save()
+            if not res: raise Exception(msg)
+            return out_path
+
+        def on_progress(done, running, total):
+            state["done"], state["running"] = done, running
+            if sched_job: sched_job.set_progress(status=status_text())
+
+        results = run_parallel(list(zip(src_list, out_paths)), convert_one, jobs, on_progress)
+
+        success_count = sum(1 for ok, _ in results if ok)
+        errors = [f"{os.path.basename(src)}: {val}" for src, (ok, val) in zip(src_list, results) if not ok]
 
         # --- FINISH ---
-        self.is_converting = False # Stop timer loop
-        
-        self.after(0, lambda: self.progress_bar.stop())
-        
-        def reset_ui():
-            self.progress_bar.configure(mode="determinate")
-            self.progress_bar.set(0)
-            self.save_as_btn.configure(text="💾 Combine & Save As...", state="normal")
-            if self.default_folder: 
-                self.quick_save_btn.configure(state="normal")
-        
-        self.after(100, reset_ui)
-        self.after(200, lambda: self._show_batch_results(success_count, len(src_list), errors, dest if is_batch else os.path.dirname(dest)))
+        self.after(100, self._restore_action_buttons)
+        self.after(200, lambda: self._show_batch_results(success_count, len(src_list), errors, dest if is_batch else os.path.dirname(dest), skipped))
 
-    def _show_batch_results(self, success, total, errors, output_dir):
+    def _show_batch_results(self, success, total, errors, output_dir, skipped=0):
         msg = f"Processed {success}/{total} files successfully."
+        if skipped: msg += f"\nSkipped {skipped} up-to-date file(s)."
         
         if errors:
             msg += "\n\nErrors:\n" + "\n".join(errors[:5]) # Show first 5 errors
@@ -2401,7 +2185,7 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         
         dialog = ctk.CTkToplevel(self)
         dialog.title("Batch GIF Converter")
-        dialog.geometry("400x450")
+        dialog.geometry("400x650")
         dialog.transient(self)
         dialog.grab_set()
         ctk.CTkLabel(dialog, text="GIF Settings", font=("Arial", 18, "bold")).pack(pady=20)
@@ -2423,52 +2207,216 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         ctk.CTkLabel(f3, text="Speed Multiplier:", width=100, anchor="w").pack(side="left")
         speed_entry = ctk.CTkEntry(f3, width=60)
         speed_entry.pack(side="right"); speed_entry.insert(0, saved_speed)
+        # --- Palette Options (FFmpeg palettegen / paletteuse) ---
+        f4 = ctk.CTkFrame(dialog, fg_color="transparent")
+        f4.pack(fill="x", padx=20, pady=5)
+        ctk.CTkLabel(f4, text="Colors (2-256):", width=100, anchor="w").pack(side="left")
+        colors_entry = ctk.CTkEntry(f4, width=60)
+        colors_entry.pack(side="right"); colors_entry.insert(0, str(self.gif_settings.get("max_colors", 256)))
+        f5 = ctk.CTkFrame(dialog, fg_color="transparent")
+        f5.pack(fill="x", padx=20, pady=5)
+        ctk.CTkLabel(f5, text="Dithering:", width=100, anchor="w").pack(side="left")
+        dither_menu = ctk.CTkOptionMenu(f5, values=GIF_DITHER_MODES, width=150)
+        dither_menu.pack(side="right"); dither_menu.set(self.gif_settings.get("dither", "sierra2_4a"))
+        f6 = ctk.CTkFrame(dialog, fg_color="transparent")
+        f6.pack(fill="x", padx=20, pady=5)
+        ctk.CTkLabel(f6, text="Palette Stats:", width=100, anchor="w").pack(side="left")
+        stats_menu = ctk.CTkOptionMenu(f6, values=GIF_STATS_MODES, width=150)
+        stats_menu.pack(side="right"); stats_menu.set(self.gif_settings.get("stats_mode", "full"))
+        two_pass_var = ctk.BooleanVar(value=self.gif_settings.get("two_pass", False))
+        ctk.CTkCheckBox(dialog, text="Two-pass palette (lower memory)", variable=two_pass_var).pack(anchor="w", padx=20, pady=5)
+        f7 = ctk.CTkFrame(dialog, fg_color="transparent")
+        f7.pack(fill="x", padx=20, pady=5)
+        ctk.CTkLabel(f7, text="Parallel Jobs:", width=100, anchor="w").pack(side="left")
+        jobs_menu = ctk.CTkOptionMenu(f7, values=["Auto", "1", "2", "4", "8", "16"], width=150)
+        jobs_menu.pack(side="right"); jobs_menu.set(str(self.gif_settings.get("jobs", 0) or "Auto"))
         def run_conversion():
             try:
                 fps = int(fps_entry.get()); scale = float(scale_entry.get()); speed = float(speed_entry.get())
+                colors = int(colors_entry.get())
                 if not (1 <= fps <= 60): raise ValueError
                 if not (0.1 <= scale <= 1.0): raise ValueError
                 if not (0.1 <= speed <= 10.0): raise ValueError
-                self.gif_settings = {"fps": fps, "scale": scale, "speed": speed}
+                if not (2 <= colors <= 256): raise ValueError
+                options = {"dither": dither_menu.get(), "max_colors": colors, "stats_mode": stats_menu.get(), "two_pass": two_pass_var.get()}
+                jobs = 0 if jobs_menu.get() == "Auto" else int(jobs_menu.get())
+                self.gif_settings = {"fps": fps, "scale": scale, "speed": speed, "jobs": jobs, **options}
                 self._save_settings_to_file()
             except:
-                messagebox.showerror("Error", "Invalid settings.\nFPS: 1-60\nScale: 0.1-1.0\nSpeed: 0.1-10.0"); return
+                messagebox.showerror("Error", "Invalid settings.\nFPS: 1-60\nScale: 0.1-1.0\nSpeed: 0.1-10.0\nColors: 2-256"); return
             dest_folder = filedialog.askdirectory(title="Select Output Folder")
             if not dest_folder: return
             dialog.destroy()
-            self._start_gif_thread(dest_folder, fps, scale, speed)
+            self._start_gif_thread(dest_folder, fps, scale, speed, options)
         ctk.CTkButton(dialog, text="Start Conversion", command=run_conversion, fg_color="#2ECC71").pack(pady=30)
         
         self.wait_window(dialog)    # <--- WAIT
         self._resume_mini_preview() # <--- RESUME
 
-    def _start_gif_thread(self, folder, fps, scale, speed):
-        self.progress_bar.set(0)
-        self.save_as_btn.configure(text="Initializing...", state="disabled")
-        self.quick_save_btn.configure(state="disabled")
-        threading.Thread(target=self._gif_worker, args=(folder, fps, scale, speed), daemon=True).start()
-
-    def _gif_worker(self, folder, fps, scale, speed):
-        total = len(self.playlist_data)
-        success_count = 0
-        for i, item in enumerate(self.playlist_data):
-            try:
-                status_msg = f"Converting GIF {i+1}/{total}... ({total - (i+1)} Remaining)"
-                self.after(0, lambda m=status_msg: self.save_as_btn.configure(text=m))
-                name = os.path.splitext(item['name'])[0] + ".gif"
-                out_path = os.path.join(folder, name)
-                self.after(0, lambda p=(i/total): self.progress_bar.set(p))
-                if convert_to_gif_backend(item['path'], out_path, fps, scale, speed): success_count += 1
-            except: pass
-        self.after(0, lambda: self.progress_bar.set(1.0))
-        self.after(0, lambda: self.save_as_btn.configure(text="💾 Combine & Save As...", state="normal"))
-        if self.default_folder: self.after(0, lambda: self.quick_save_btn.configure(state="normal"))
-        self.after(0, lambda: self._on_gif_complete(folder, success_count, total))
-
-    def _on_gif_complete(self, folder, success, total):
+    def _start_gif_thread(self, folder, fps, scale, speed, options=None):
+        def on_start():
+            self.progress_bar.set(0)
+            self.save_as_btn.configure(text="Initializing...", state="disabled")
+            self.quick_save_btn.configure(state="disabled")
+        # Snapshot the playlist on the UI thread; the worker never touches playlist_data
+        items = [dict(item) for item in self.playlist_data]
+        self._submit_job(f"GIF {len(items)} clip(s)", self._gif_worker, (items, folder, fps, scale, speed, options or {}, self.gif_settings.get("jobs", 0)),
+                         {"cpu": 1}, on_start=on_start)
+
+    def _gif_worker(self, items, folder, fps, scale, speed, options, max_jobs=0):
+        total = len(items)
+        names = [os.path.splitext(item['name'])[0] + ".gif" for item in items]
+        jobs = [(item, out_path) for item, out_path in zip(items, unique_output_paths(names, folder))]
+
+        # Largest clips first so the batch ends close to the slowest clip's time
+        def clip_size(job):
+            try: return os.path.getsize(job[0]['path'])
+            except OSError: return 0
+        ordered = sorted(jobs, key=clip_size, reverse=True)
+
+        fractions = {}
+        state = {"done": 0, "running": 0}
+        job = current_job()
+        def refresh():
+            overall = sum(fractions.values()) / total if total else 1.0
+            text = f"GIF {state['done']}/{total} done, {state['running']} running · {int(overall * 100)}%"
+            self._update_progress_bar_safe(overall, job, text)
+
+        def convert_one(job):
+            item, out_path = job
+            def on_progress(info):
+                if info.fraction is None: return
+                fractions[out_path] = info.fraction
+                refresh()
+            convert_to_gif_backend(item['path'], out_path, fps, scale, speed, progress=on_progress, raise_on_error=True, **options)
+            fractions[out_path] = 1.0
+            return out_path
+
+        def on_pool_progress(done, running, _total):
+            state["done"], state["running"] = done, running
+            refresh()
+
+        results = run_parallel(ordered, convert_one, max_jobs or default_job_count(threads_per_job=2), on_pool_progress)
+
+        # Report in playlist order
+        by_output = {job[1]: res for job, res in zip(ordered, results)}
+        success_count = sum(1 for ok, _ in results if ok)
+        errors = [f"{item['name']}: {by_output[out][1]}" for item, out in jobs if not by_output[out][0]]
+
+        self.after(0, self._restore_action_buttons)
+        self.after(0, lambda: self._on_gif_complete(folder, success_count, total, errors))
+
+    def _on_gif_complete(self, folder, success, total, errors=None):
         msg = f"Converted {success}/{total} videos to GIF!"
+        if errors:
+            msg += "\n\nErrors:\n" + "\n".join(errors[:5])
+            if len(errors) > 5: msg += "\n..."
+            messagebox.showwarning("GIF Result", msg)
+            return
         if messagebox.askyesno("Done", f"{msg}\n\nDo you want to preview the output folder?"): self._open_file_system(folder)
 
+    # --- Contact / Sprite Sheets ---
+    def _open_sheet_tool(self):
+        if not self.playlist_data:
+            messagebox.showwarning("Warning", "Please add clips to the playlist first.")
+            return
+
+        self._pause_mini_preview() # <--- PAUSE
+
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Thumbnail Sheets")
+        dialog.geometry("400x480")
+        dialog.transient(self)
+        dialog.grab_set()
+        ctk.CTkLabel(dialog, text="Sheet Settings", font=("Arial", 18, "bold")).pack(pady=20)
+        cfg = self.sheet_settings
+        def add_row(label, widget_factory):
+            f = ctk.CTkFrame(dialog, fg_color="transparent"); f.pack(fill="x", padx=20, pady=5)
+            ctk.CTkLabel(f, text=label, width=120, anchor="w").pack(side="left")
+            w = widget_factory(f); w.pack(side="right"); return w
+        type_menu = add_row("Type:", lambda f: ctk.CTkOptionMenu(f, values=["Contact Sheet", "Sprite Sheet"], width=150))
+        type_menu.set(cfg.get("type", "Contact Sheet"))
+        cols_entry = add_row("Columns:", lambda f: ctk.CTkEntry(f, width=60)); cols_entry.insert(0, str(cfg.get("columns", 5)))
+        rows_entry = add_row("Rows:", lambda f: ctk.CTkEntry(f, width=60)); rows_entry.insert(0, str(cfg.get("rows", 4)))
+        width_entry = add_row("Tile Width (px):", lambda f: ctk.CTkEntry(f, width=60)); width_entry.insert(0, str(cfg.get("tile_width", 320)))
+        interval_entry = add_row("Sprite Interval (s):", lambda f: ctk.CTkEntry(f, width=60)); interval_entry.insert(0, str(cfg.get("interval", 10)))
+        jobs_menu = add_row("Parallel Jobs:", lambda f: ctk.CTkOptionMenu(f, values=["Auto", "1", "2", "4", "8"], width=150))
+        jobs_menu.set(str(cfg.get("jobs", 0) or "Auto"))
+
+        def run_sheets():
+            try:
+                cols, rows, tile_w = int(cols_entry.get()), int(rows_entry.get()), int(width_entry.get())
+                interval = float(interval_entry.get())
+                if not (1 <= cols <= 20 and 1 <= rows <= 20 and 32 <= tile_w <= 1920 and interval > 0): raise ValueError
+            except ValueError:
+                messagebox.showerror("Error", "Invalid settings.\nColumns/Rows: 1-20\nTile Width: 32-1920\nInterval: > 0", parent=dialog); return
+            jobs = 0 if jobs_menu.get() == "Auto" else int(jobs_menu.get())
+            self.sheet_settings = {"type": type_menu.get(), "columns": cols, "rows": rows, "tile_width": tile_w, "interval": interval, "jobs": jobs}
+            self._save_settings_to_file()
+            dest_folder = filedialog.askdirectory(title="Select Output Folder")
+            if not dest_folder: return
+            dialog.destroy()
+            self._start_sheet_thread(dest_folder, dict(self.sheet_settings))
+        ctk.CTkButton(dialog, text="Generate Sheets", command=run_sheets, fg_color="#2874A6").pack(pady=25)
+
+        self.wait_window(dialog)    # <--- WAIT
+        self._resume_mini_preview() # <--- RESUME
+
+    def _start_sheet_thread(self, folder, cfg):
+        def on_start():
+            self.progress_bar.set(0)
+            self.save_as_btn.configure(text="Initializing...", state="disabled")
+            self.quick_save_btn.configure(state="disabled")
+        items = [dict(item) for item in self.playlist_data]
+        self._submit_job(f"{cfg['type']}s for {len(items)} clip(s)", self._sheet_worker, (items, folder, cfg),
+                         {"cpu": 1}, on_start=on_start)
+
+    def _sheet_worker(self, items, folder, cfg):
+        total = len(items)
+        sprite = cfg["type"] == "Sprite Sheet"
+        suffix = "_sprite.jpg" if sprite else "_contact.jpg"
+        names = [os.path.splitext(item['name'])[0] + suffix for item in items]
+        jobs = list(zip(items, unique_output_paths(names, folder)))
+
+        fractions = {}
+        state = {"done": 0, "running": 0}
+        job = current_job()
+        def refresh():
+            overall = sum(fractions.values()) / total if total else 1.0
+            text = f"Sheets {state['done']}/{total} done, {state['running']} running · {int(overall * 100)}%"
+            self._update_progress_bar_safe(overall, job, text)
+
+        def build_one(job):
+            item, out_path = job
+            def on_progress(info):
+                if info.fraction is None: return
+                fractions[out_path] = info.fraction
+                refresh()
+            _, index_path = thumbnail_sheet_backend(item['path'], out_path, cfg["columns"], cfg["rows"], cfg["tile_width"],
+                                                    interval=cfg["interval"] if sprite else None, progress=on_progress)
+            fractions[out_path] = 1.0
+            return index_path
+
+        def on_pool_progress(done, running, _total):
+            state["done"], state["running"] = done, running
+            refresh()
+
+        results = run_parallel(jobs, build_one, cfg.get("jobs", 0) or default_job_count(threads_per_job=2), on_pool_progress)
+        errors = [f"{item['name']}: {res}" for (item, _), (ok, res) in zip(jobs, results) if not ok]
+        sprite_indexes = {item['path']: res for (item, _), (ok, res) in zip(jobs, results) if ok and sprite}
+        success_count = total - len(errors)
+
+        def finish():
+            self.sprite_indexes.update(sprite_indexes)
+            self._restore_action_buttons()
+            msg = f"Generated sheets for {success_count}/{total} clips."
+            if errors:
+                msg += "\n\nErrors:\n" + "\n".join(errors[:5])
+                if len(errors) > 5: msg += "\n..."
+                messagebox.showwarning("Thumbnail Sheets", msg); return
+            if messagebox.askyesno("Done", f"{msg}\n\nDo you want to preview the output folder?"): self._open_file_system(folder)
+        self.after(0, finish)
+
     def _handle_trim_result(self, new_path):
         if not new_path or not os.path.exists(new_path): return
         selected_clip = self.playlist_data[self.selected_index]
@@ -2482,6 +2430,7 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         self._render_playlist()
         self._select_item(self.selected_index) 
 
+    @traced("ui.render_playlist", cat="ui")
     def _render_playlist(self):
         self._force_background_bindings()
         for widget in self.scroll_frame.winfo_children(): widget.destroy()
@@ -2662,27 +2611,34 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
             self._start_combine_thread(output_path)
 
     def _start_combine_thread(self, output_path):
-        self.quick_save_btn.configure(state="disabled")
-        self.save_as_btn.configure(state="disabled")
-        
-        # 1. Start with determinate (since combine usually reports progress quickly)
-        self.progress_bar.configure(mode="determinate")
-        self.progress_bar.set(0)
-        
-        # 2. Start Timer
-        self._start_processing_timer("Combining")
+        def on_start():
+            self.quick_save_btn.configure(state="disabled")
+            self.save_as_btn.configure(state="disabled")
+            
+            # 1. Start with determinate (since combine usually reports progress quickly)
+            self.progress_bar.configure(mode="determinate")
+            self.progress_bar.set(0)
+            
+            # 2. Start Timer
+            self._start_processing_timer("Combining")
         
         self.merge_logger = TkProgressBarLogger(update_callback=self._update_progress_bar_safe)
         files = [i['path'] for i in self.playlist_data]
-        threading.Thread(target=self._combine_worker, args=(files, output_path, self.merge_logger), daemon=True).start()
+        self._submit_job(f"Combine {len(files)} clip(s): {os.path.basename(output_path)}", self._combine_worker,
+                         (files, output_path, self.merge_logger), {"cpu": 1, "disk": 1}, on_start=on_start)
+
+    def _combine_worker(self, files, output_path, logger):
+        try:
+            final_path = combine_video_clips_backend(files, output_path, logger=logger)
+            error_msg = None if final_path else "One or more clips could not be found."
+        except Exception as e:
+            final_path, error_msg = None, str(e)
+        self.after(0, lambda: self._on_combine_finished(final_path, error_msg))
+        if error_msg: raise RuntimeError(error_msg) # marks the queue entry as failed
 
     def _on_combine_finished(self, final_path, error_msg):
-        # 3. Stop Timer
-        self.is_processing = False
-        
-        self.save_as_btn.configure(state="normal", text="💾 Combine & Save As...")
-        if self.default_folder: self.quick_save_btn.configure(state="normal")
-        self.progress_bar.set(0)
+        # 3. Reset (the status timer stops with the job)
+        self._restore_action_buttons()
         
         if error_msg:
             messagebox.showerror("Merge Failed", f"Error: {error_msg}")
@@ -2704,6 +2660,7 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
     def _on_item_click(self, index): self._select_item(index)
     def _on_drag_start(self, event, index):
         self.drag_source_idx = index; self._select_item(index); self.update_idletasks(); self.drag_source_idx = index; self._select_item(index)
+    @traced("ui.drag_motion", cat="ui")
     def _on_drag_motion(self, event):
             if self.drag_source_idx is None: return
             y = event.y_root; target_idx = -1; rows = self.scroll_frame.winfo_children()
@@ -2733,9 +2690,16 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
     def _load_preview_in_background(self, video_path, anim_id):
         with self.load_lock:
             if anim_id != self.current_anim_id: return
-            pil_images, delay = get_preview_pil_images(video_path, duration=self.preview_duration, fps=self.preview_fps, height=self.preview_height)
+            sprite_index = self.sprite_indexes.get(video_path)
+            if sprite_index and os.path.exists(sprite_index):
+                # A sprite sheet is already on disk: skim the whole clip without decoding it
+                pil_images, delay = load_sprite_frames(sprite_index, height=self.preview_height)
+            else: pil_images = []
+            if not pil_images:
+                pil_images, delay = get_preview_pil_images(video_path, duration=self.preview_duration, fps=self.preview_fps, height=self.preview_height)
             self.after(0, lambda: self._on_preview_loaded(pil_images, delay, anim_id))
 
+    @traced("ui.preview_loaded", cat="ui")
     def _on_preview_loaded(self, pil_images, delay, anim_id):
         if anim_id != self.current_anim_id: return 
         if not pil_images: self._recreate_preview_label(text="[Preview Failed]"); return
@@ -2765,6 +2729,7 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         self.lbl_info_name.configure(text=name, text_color="white"); self.lbl_info_size.configure(text=f"Size: {item.get('size_str', '--')}")
         self.lbl_info_res.configure(text=f"Res: {res[0]}x{res[1]}"); self.lbl_info_dur.configure(text=f"Duration: {mins:02}:{secs:02}")
 
+    @traced("ui.select_item", cat="ui")
     def _select_item(self, index):
         # Clear the "New" status if this item was marked
         if index in self.newly_added_indices:
@@ -2801,7 +2766,7 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         
         self._pause_mini_preview() # <--- PAUSE
         
-        dialog = ctk.CTkToplevel(self); dialog.title("Settings"); dialog.geometry("550x550"); dialog.transient(self); dialog.grab_set()
+        dialog = ctk.CTkToplevel(self); dialog.title("Settings"); dialog.geometry("550x650"); dialog.transient(self); dialog.grab_set()
         tabview = ctk.CTkTabview(dialog); tabview.pack(fill="both", expand=True, padx=10, pady=10)
         
         tab_gen = tabview.add("General")
@@ -2822,6 +2787,27 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         ctk.CTkLabel(tab_gen, text="After Merge Action:", font=("Arial", 14, "bold")).pack(anchor="w", padx=10, pady=(15, 5))
         self.merge_action_menu = ctk.CTkOptionMenu(tab_gen, values=["System Player", "In-App Preview"]); self.merge_action_menu.pack(pady=5, padx=10, fill="x"); self.merge_action_menu.set(self.after_merge_action)
 
+        # --- Result Cache ---
+        ctk.CTkLabel(tab_gen, text="Result Cache", font=("Arial", 14, "bold")).pack(anchor="w", padx=10, pady=(15, 5))
+        rc = self.result_cache_settings
+        rc_frame = ctk.CTkFrame(tab_gen); rc_frame.pack(fill="x", padx=10, pady=2)
+        self.result_cache_var = ctk.BooleanVar(value=rc.get("enabled", True))
+        ctk.CTkSwitch(rc_frame, text="Reuse outputs of repeated operations", variable=self.result_cache_var).pack(side="left", padx=10, pady=5)
+        self.entry_cache_gb = ctk.CTkEntry(rc_frame, width=60); self.entry_cache_gb.pack(side="right", padx=10)
+        self.entry_cache_gb.insert(0, f"{rc.get('max_gb', 10.0):g}")
+        ctk.CTkLabel(rc_frame, text="Max (GB):").pack(side="right")
+        rc_frame2 = ctk.CTkFrame(tab_gen); rc_frame2.pack(fill="x", padx=10, pady=2)
+        self.hardlink_hits_var = ctk.BooleanVar(value=rc.get("hardlink_hits", False))
+        ctk.CTkSwitch(rc_frame2, text="Hardlink hits (instant, outputs share one file)", variable=self.hardlink_hits_var).pack(side="left", padx=10, pady=5)
+        cache = result_cache.get_cache()
+        count, size = cache.usage() if cache else (0, 0)
+        def clear_result_cache():
+            c = result_cache.get_cache()
+            if c: c.clear()
+            clear_btn.configure(text="Clear (0 files)")
+        clear_btn = ctk.CTkButton(rc_frame2, text=f"Clear ({count} files, {size / 1024**3:.1f} GB)", width=150, fg_color="#555", command=clear_result_cache)
+        clear_btn.pack(side="right", padx=10)
+
         # --- AI TOOLS TAB ---
         ctk.CTkLabel(tab_ai, text="External AI Engines Location", font=("Arial", 16, "bold")).pack(pady=(10, 5))
         ctk.CTkLabel(tab_ai, text="Folder containing 'realesrgan-ncnn-vulkan' and 'rife-ncnn-vulkan'", text_color="gray", font=("Arial", 11)).pack(pady=(0, 10))
@@ -2842,6 +2828,40 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
         
         ctk.CTkButton(tab_ai, text="Reset to Default", fg_color="#555", height=24, command=lambda: self.lbl_ai_dir.configure(text="Default (Script Folder)", text_color="gray")).pack(pady=10)
 
+        # --- Intermediate Frames (Frame Store) ---
+        ctk.CTkLabel(tab_ai, text="Intermediate Frames", font=("Arial", 14, "bold")).pack(anchor="w", padx=10, pady=(10, 5))
+        fs = self.frame_store_settings
+        fmt_labels = {"auto": "Auto (JPEG for AI, PNG for RIFE)"}
+        fmt_labels.update({k: v["label"] for k, v in FRAME_FORMATS.items()})
+        self.frame_fmt_labels = fmt_labels
+
+        fmt_frame = ctk.CTkFrame(tab_ai); fmt_frame.pack(fill="x", padx=10, pady=2)
+        ctk.CTkLabel(fmt_frame, text="Format:").pack(side="left", padx=10)
+        self.entry_frame_level = ctk.CTkEntry(fmt_frame, width=50, placeholder_text="Level")
+        self.entry_frame_level.pack(side="right", padx=(5, 10))
+        if fs.get("level") is not None: self.entry_frame_level.insert(0, str(fs["level"]))
+        ctk.CTkLabel(fmt_frame, text="Level:").pack(side="right")
+        self.frame_fmt_menu = ctk.CTkOptionMenu(fmt_frame, values=list(fmt_labels.values()), width=200)
+        self.frame_fmt_menu.pack(side="right", padx=5)
+        self.frame_fmt_menu.set(fmt_labels.get(fs.get("format", "auto"), fmt_labels["auto"]))
+
+        scratch_frame = ctk.CTkFrame(tab_ai); scratch_frame.pack(fill="x", padx=10, pady=2)
+        self.lbl_scratch_dir = ctk.CTkLabel(scratch_frame, text=fs.get("scratch_dir") or "Scratch: Working Folder", text_color="gray" if not fs.get("scratch_dir") else "white")
+        self.lbl_scratch_dir.pack(side="left", padx=10, fill="x", expand=True)
+        def browse_scratch_folder():
+            d = filedialog.askdirectory()
+            if d: self.lbl_scratch_dir.configure(text=d, text_color="white")
+        ctk.CTkButton(scratch_frame, text="Browse", width=80, command=browse_scratch_folder).pack(side="right", padx=10)
+
+        ram_frame = ctk.CTkFrame(tab_ai); ram_frame.pack(fill="x", padx=10, pady=2)
+        self.ram_disk_var = ctk.BooleanVar(value=fs.get("use_ram_disk", False))
+        ram_switch = ctk.CTkSwitch(ram_frame, text="Use RAM Disk (spills to disk if full)", variable=self.ram_disk_var)
+        ram_switch.pack(side="left", padx=10, pady=5)
+        if not (fs.get("ram_disk_dir") or default_ram_disk_dir()): ram_switch.configure(state="disabled", text="RAM Disk (Not Available)")
+        self.entry_ram_limit = ctk.CTkEntry(ram_frame, width=70); self.entry_ram_limit.pack(side="right", padx=10)
+        self.entry_ram_limit.insert(0, str(fs.get("ram_limit_mb", 2048)))
+        ctk.CTkLabel(ram_frame, text="Limit (MB):").pack(side="right")
+
         # --- EDITOR TAB ---
         ctk.CTkLabel(tab_edit, text="Editor Window Size", font=("Arial", 16, "bold")).pack(pady=(10, 5))
         ed_frame = ctk.CTkFrame(tab_edit); ed_frame.pack(fill="x", padx=10, pady=5)
@@ -2907,13 +2927,48 @@ class VideoCombinerApp(ctk.CTk, TkinterDnD.DnDWrapper):
             if 300 <= eh_val <= 1200: self.editor_window_height = eh_val
         except: pass
         self.use_vlc_fullscreen = self.vlc_var.get(); self.after_merge_action = self.merge_action_menu.get()
+
+        # Frame Store
+        fmt_key = next((k for k, v in self.frame_fmt_labels.items() if v == self.frame_fmt_menu.get()), "auto")
+        self.frame_store_settings["format"] = fmt_key
+        try: self.frame_store_settings["level"] = int(self.entry_frame_level.get()) if self.entry_frame_level.get().strip() else None
+        except: pass
+        scratch_txt = self.lbl_scratch_dir.cget("text")
+        self.frame_store_settings["scratch_dir"] = "" if scratch_txt == "Scratch: Working Folder" else scratch_txt
+        self.frame_store_settings["use_ram_disk"] = self.ram_disk_var.get()
+        try:
+            ram_val = int(self.entry_ram_limit.get())
+            if ram_val >= 64: self.frame_store_settings["ram_limit_mb"] = ram_val
+        except: pass
+
+        # Result Cache
+        self.result_cache_settings["enabled"] = self.result_cache_var.get()
+        self.result_cache_settings["hardlink_hits"] = self.hardlink_hits_var.get()
+        try:
+            gb_val = float(self.entry_cache_gb.get())
+            if gb_val > 0: self.result_cache_settings["max_gb"] = gb_val
+        except: pass
+        result_cache.configure(self.result_cache_settings)
+
         self._save_settings_to_file()
         if self.default_folder: self.quick_save_btn.configure(state="normal"); messagebox.showinfo("Settings", "Defaults saved!")
         else: self.quick_save_btn.configure(state="disabled")
         dialog.destroy()
 
 if __name__ == "__main__":
+    if "--trace" in sys.argv:
+        # --trace [path]: record backend / process / UI spans, written as a Chrome trace on exit
+        idx = sys.argv.index("--trace")
+        path = sys.argv[idx + 1] if idx + 1 < len(sys.argv) and not sys.argv[idx + 1].startswith("--") else "media_studio_trace.json"
+        tracing.enable(path)
+    mark_startup("imports")
     ctk.set_appearance_mode("Dark")
     ctk.set_default_color_theme("blue")
     app = VideoCombinerApp()
+    mark_startup("window built")
+    def on_first_paint():
+        app.update_idletasks()
+        mark_startup("interactive")
+        if "--profile-startup" in sys.argv: print(startup_report())
+    app.after(0, on_first_paint)
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,360 @@
+import os
+import sys
+import json
+import time
+import select
+import signal
+import sqlite3
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from batch_pool import threads_per_job
+from job_specs import run_job_spec, validate_job_spec
+from cancellation import CancelToken, JobCancelled, set_current_token
+from media_cli import EventWriter
+import tracing
+import result_cache
+
+# --- Watch-Folder Ingest (no GUI imports) ---
+# Processes every recording that lands in a folder, headless:
+#
+#   python watch_folder.py ingest.json
+#
+#   {"watch": "/captures", "output": "/captures/processed", "jobs": 2,
+#    "steps": [{"op": "convert", "ext": ".mp4", "options": {"quality": "Medium"}},
+#              {"op": "resize", "suffix": "_720", "options": {"width": 1280, "height": 720}},
+#              {"op": "gif", "from": "source", "options": {"fps": 12, "scale": 0.5}}]}
+#
+# Each step is a job spec without input / output (job_specs.py). A step reads the
+# previous step's output, or the original file with "from": "source", and writes
+# <output>/<subfolder>/<stem><suffix><ext>. A file is picked up only once its size and
+# mtime have not changed for settle_seconds, so a recording still being written is
+# left alone. inotify (Linux) wakes the scan as soon as something changes; elsewhere
+# the folder is polled. A small SQLite database next to the outputs remembers what
+# was done, so a restart only processes new or changed files.
+
+DEFAULT_EXTENSIONS = (".mp4", ".mov", ".mkv", ".avi", ".webm", ".m4v", ".ts", ".mts")
+PARTIAL_SUFFIXES = (".part", ".tmp", ".crdownload", ".partial", ".filepart")
+STATE_DB_NAME = ".watch_state.sqlite3"
+WATCH_OPS = {"convert", "gif", "resize", "upscale", "upscale_ai", "interpolate", "crop", "pipeline", "enhance_ai"}
+
+DEFAULT_WATCH_SETTINGS = {
+    "watch": "",
+    "output": "",            # "" = <watch>/processed
+    "steps": [],
+    "recursive": False,
+    "extensions": list(DEFAULT_EXTENSIONS),
+    "settle_seconds": 5.0,   # size / mtime must hold still this long
+    "poll_seconds": 2.0,     # polling fallback interval (inotify rescans on every change)
+    "jobs": 1,               # files processed at once
+    "max_attempts": 2,       # runs per file before it stays failed (until it changes)
+    "state_db": "",          # "" = <output>/.watch_state.sqlite3
+}
+
+def load_watch_config(path):
+    with open(path, 'r', encoding="utf-8") as f: data = json.load(f)
+    config = dict(DEFAULT_WATCH_SETTINGS)
+    config.update(data)
+    return config
+
+def step_output_name(step, stem, input_ext):
+    """<stem><suffix><ext> for one step. Convert keeps the stem; other ops add _<op>."""
+    ext = step.get("ext") or (".gif" if step["op"] == "gif" else input_ext)
+    if not ext.startswith("."): ext = "." + ext
+    suffix = step.get("suffix", "" if step["op"] == "convert" else f"_{step['op']}")
+    return f"{stem}{suffix}{ext}"
+
+def validate_watch_config(config):
+    """Raises ValueError describing the first problem."""
+    if not config.get("watch") or not os.path.isdir(config["watch"]): raise ValueError(f"watch folder not found: '{config.get('watch')}'")
+    steps = config.get("steps")
+    if not isinstance(steps, list) or not steps: raise ValueError("'steps' must be a non-empty list")
+    for n, step in enumerate(steps, 1):
+        if not isinstance(step, dict) or step.get("op") not in WATCH_OPS:
+            raise ValueError(f"step {n}: op must be one of {', '.join(sorted(WATCH_OPS))}")
+        if step["op"] == "convert" and not step.get("ext"): raise ValueError(f"step {n}: convert needs an 'ext'")
+        if step["op"] == "resize" and step.get("options", {}).get("renditions"):
+            raise ValueError(f"step {n}: renditions write several files; use one resize step per size")
+        if step.get("from", "previous") not in ("previous", "source"): raise ValueError(f"step {n}: 'from' must be previous or source")
+        try: validate_job_spec({"op": step["op"], "input": "in", "output": "out", "options": step.get("options", {})})
+        except ValueError as e: raise ValueError(f"step {n}: {e}")
+    if int(config.get("jobs") or 0) < 1: raise ValueError("'jobs' must be at least 1")
+    if config.get("output") and os.path.abspath(config["output"]) == os.path.abspath(config["watch"]):
+        raise ValueError("'output' must not be the watch folder itself (outputs would be picked up again)")
+
+
+class WatchState:
+    """
+    SQLite record of every file seen: (path, size, mtime_ns) -> status, attempts,
+    outputs. A file whose size or mtime changed counts as new.
+    """
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER,
+                           status TEXT, attempts INTEGER DEFAULT 0, error TEXT, outputs TEXT, updated REAL)""")
+        # Files that were running when the daemon stopped are picked up again
+        self.db.execute("UPDATE files SET status = 'pending' WHERE status = 'running'")
+
+    def needs_work(self, path, size, mtime_ns, max_attempts):
+        with self.lock:
+            row = self.db.execute("SELECT size, mtime_ns, status, attempts FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None or (row[0], row[1]) != (size, mtime_ns): return True
+        if row[2] == "done": return False
+        return row[2] != "failed" or row[3] < max_attempts
+
+    def mark(self, path, size, mtime_ns, status, error=None, outputs=None):
+        with self.lock:
+            row = self.db.execute("SELECT size, mtime_ns, attempts FROM files WHERE path = ?", (path,)).fetchone()
+            attempts = row[2] if row and (row[0], row[1]) == (size, mtime_ns) else 0
+            if status == "running": attempts += 1
+            self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            (path, size, mtime_ns, status, attempts, error,
+                             json.dumps(outputs) if outputs is not None else None, time.time()))
+
+    def counts(self):
+        with self.lock:
+            return dict(self.db.execute("SELECT status, COUNT(*) FROM files GROUP BY status").fetchall())
+
+    def close(self):
+        with self.lock: self.db.close()
+
+
+# --- Change Notification ---
+
+_IN_ATTRIB, _IN_CLOSE_WRITE, _IN_MOVED_TO, _IN_CREATE = 0x4, 0x8, 0x80, 0x100
+_IN_NONBLOCK, _IN_CLOEXEC = 0o4000, 0o2000000
+_WATCH_MASK = _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+
+class Inotify:
+    """
+    Minimal inotify through ctypes: wait() returns True when anything changed in a
+    watched folder, or wake() was called. Raises OSError where inotify is unavailable
+    (use polling then).
+    """
+    def __init__(self):
+        if not sys.platform.startswith("linux"): raise OSError("inotify needs Linux")
+        import ctypes, ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0: raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watched = set()
+        self._wake_r, self._wake_w = os.pipe()
+
+    def add(self, folder):
+        if folder in self.watched: return
+        import ctypes
+        if self._libc.inotify_add_watch(self.fd, os.fsencode(folder), _WATCH_MASK) < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {folder}")
+        self.watched.add(folder)
+
+    def wait(self, timeout):
+        ready, _, _ = select.select([self.fd, self._wake_r], [], [], timeout)
+        if not ready: return False
+        if self._wake_r in ready: os.read(self._wake_r, 64)
+        if self.fd in ready:
+            try:
+                while os.read(self.fd, 65536): pass  # the next scan looks at everything; the events themselves are not needed
+            except BlockingIOError: pass
+        return True
+
+    def wake(self):
+        """Ends a wait() early (safe from a signal handler)."""
+        os.write(self._wake_w, b"x")
+
+    def close(self):
+        for fd in (self.fd, self._wake_r, self._wake_w): os.close(fd)
+
+
+class WatchFolder:
+    def __init__(self, config, events, defaults=None, threads=0, force_polling=False):
+        self.config = config
+        self.events = events
+        self.defaults = defaults or {}
+        self.watch_dir = os.path.abspath(config["watch"])
+        self.output_dir = os.path.abspath(config.get("output") or os.path.join(self.watch_dir, "processed"))
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.state = WatchState(config.get("state_db") or os.path.join(self.output_dir, STATE_DB_NAME))
+        self.extensions = tuple(e.lower() for e in config.get("extensions") or DEFAULT_EXTENSIONS)
+        self.settle = float(config.get("settle_seconds", 5.0))
+        self.poll = float(config.get("poll_seconds", 2.0))
+        self.max_attempts = int(config.get("max_attempts", 2))
+        self.jobs = int(config.get("jobs") or 1)
+        self.threads = threads or threads_per_job(self.jobs)
+        self.token = CancelToken()
+        self.candidates = {}  # path -> (size, mtime_ns, unchanged since)
+        self.active = set()
+        self.lock = threading.Lock()
+        self.notifier = None
+        if not force_polling:
+            try: self.notifier = Inotify()
+            except OSError as e: print(f"inotify unavailable ({e}); polling every {self.poll:g}s")
+
+    def _is_candidate(self, name):
+        lower = name.lower()
+        return not name.startswith(".") and not lower.endswith(PARTIAL_SUFFIXES) and lower.endswith(self.extensions)
+
+    def _folders(self):
+        yield self.watch_dir
+        if not self.config.get("recursive"): return
+        for root, dirs, _ in os.walk(self.watch_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and os.path.join(root, d) != self.output_dir]
+            for d in dirs: yield os.path.join(root, d)
+
+    def scan(self):
+        """Updates the settle timers; returns the files that are ready now."""
+        now = time.monotonic()
+        seen, ready = set(), []
+        for folder in self._folders():
+            if self.notifier:
+                try: self.notifier.add(folder)
+                except OSError as e: print(f"Cannot watch {folder}: {e}")
+            try: entries = list(os.scandir(folder))
+            except OSError: continue
+            for entry in entries:
+                if not self._is_candidate(entry.name): continue
+                try:
+                    if not entry.is_file(): continue
+                    st = entry.stat()
+                except OSError: continue
+                path = entry.path
+                seen.add(path)
+                with self.lock:
+                    if path in self.active: continue
+                if not self.state.needs_work(path, st.st_size, st.st_mtime_ns, self.max_attempts):
+                    self.candidates.pop(path, None)
+                    continue
+                previous = self.candidates.get(path)
+                if previous is None or previous[:2] != (st.st_size, st.st_mtime_ns):
+                    if previous is None: self.events.emit("detected", id=self._rel(path), size=st.st_size)
+                    self.candidates[path] = (st.st_size, st.st_mtime_ns, now)
+                elif st.st_size > 0 and now - previous[2] >= self.settle:
+                    ready.append((path, st.st_size, st.st_mtime_ns))
+        for path in list(self.candidates):
+            if path not in seen: del self.candidates[path]  # deleted or renamed before it settled
+        return ready
+
+    def _rel(self, path):
+        return os.path.relpath(path, self.watch_dir)
+
+    def process(self, path, size, mtime_ns):
+        """Runs every step on one settled file. Returns the outputs (raises on failure)."""
+        set_current_token(self.token)
+        file_id = self._rel(path)
+        stem, ext = os.path.splitext(os.path.basename(path))
+        out_dir = os.path.join(self.output_dir, os.path.dirname(file_id))
+        steps = self.config["steps"]
+        started = time.monotonic()
+        self.state.mark(path, size, mtime_ns, "running")
+        self.events.emit("start", id=file_id, steps=len(steps))
+        outputs, previous = [], path
+        try:
+            with tracing.span(f"watch: {file_id}", cat="job", steps=len(steps)):
+                for n, step in enumerate(steps):
+                    source = path if step.get("from") == "source" else previous
+                    spec = {"id": file_id, "op": step["op"], "input": source, "options": dict(step.get("options", {})),
+                            "output": os.path.join(out_dir, step_output_name(step, stem, os.path.splitext(source)[1]))}
+                    def on_progress(info, n=n):
+                        fraction = None if info.fraction is None else (n + info.fraction) / len(steps)
+                        self.events.progress(file_id, info._replace(fraction=fraction))
+                    run_job_spec(spec, progress=on_progress, threads=self.threads, defaults=self.defaults)
+                    outputs.append(spec["output"])
+                    previous = spec["output"]
+        except JobCancelled:
+            self.state.mark(path, size, mtime_ns, "pending", error="Cancelled", outputs=outputs)
+            self.events.emit("done", id=file_id, ok=False, error="Cancelled", elapsed=round(time.monotonic() - started, 2))
+            raise
+        except Exception as e:
+            self.state.mark(path, size, mtime_ns, "failed", error=str(e), outputs=outputs)
+            self.events.emit("done", id=file_id, ok=False, error=str(e), elapsed=round(time.monotonic() - started, 2))
+            return None
+        self.state.mark(path, size, mtime_ns, "done", outputs=outputs)
+        self.events.emit("done", id=file_id, ok=True, result=outputs, elapsed=round(time.monotonic() - started, 2))
+        return outputs
+
+    def _run(self, path, size, mtime_ns):
+        try: self.process(path, size, mtime_ns)
+        except JobCancelled: pass
+        except Exception as e: print(f"Watch job for {path} crashed: {e}")
+        finally:
+            with self.lock: self.active.discard(path)
+
+    def run(self, once=False):
+        """
+        Watches until stop(). once=True processes what is there (waiting for it to
+        settle), then returns when nothing is pending or running.
+        """
+        self.events.emit("watching", id=None, folder=self.watch_dir, output=self.output_dir,
+                         mode="inotify" if self.notifier else "polling", jobs=self.jobs)
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while not self.token.cancelled:
+                for path, size, mtime_ns in self.scan():
+                    with self.lock:
+                        # Bounded: never more queued than there are workers, the rest waits in the folder
+                        if len(self.active) >= self.jobs: break
+                        self.active.add(path)
+                    del self.candidates[path]
+                    pool.submit(self._run, path, size, mtime_ns)
+                with self.lock: busy = bool(self.active)
+                if once and not busy and not self.candidates: break
+                # Settling files need a recheck soon; with inotify an idle folder just waits for an event
+                timeout = min(1.0, self.settle) if self.candidates or busy or not self.notifier else 60.0
+                if self.notifier: self.notifier.wait(timeout)
+                else: time.sleep(min(timeout, self.poll))
+        counts = self.state.counts()
+        self.events.emit("summary", id=None, done=counts.get("done", 0), failed=counts.get("failed", 0),
+                         pending=counts.get("pending", 0), cancelled=self.token.cancelled)
+        self.state.close()
+        if self.notifier: self.notifier.close()
+
+    def stop(self):
+        self.token.cancel()
+        if self.notifier: self.notifier.wake()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Process every media file that lands in a folder.")
+    parser.add_argument("config", help="Watch config JSON (watch, output, steps, jobs, ...)")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="Files processed at once (overrides the config)")
+    parser.add_argument("--threads", type=int, default=0, help="Encoder threads per file (0 = automatic)")
+    parser.add_argument("--once", action="store_true", help="Process what is in the folder now, then exit")
+    parser.add_argument("--poll", action="store_true", help="Poll the folder even where inotify is available")
+    parser.add_argument("--ai-tools-dir", default="", help="Folder with realesrgan / rife executables")
+    parser.add_argument("--scratch-dir", default="", help="Where AI stages write intermediate frames")
+    parser.add_argument("--progress-interval", type=float, default=2.0, help="Seconds between progress events per file")
+    parser.add_argument("--cache-dir", default="", help="Result cache folder (default: per-user cache)")
+    parser.add_argument("--no-cache", action="store_true", help="Always recompute; do not read or fill the result cache")
+    parser.add_argument("--trace", default="", help="Write a Chrome trace of every file / stage here on exit")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.trace: tracing.enable(args.trace)
+    result_cache.configure({"enabled": not args.no_cache, "cache_dir": os.path.abspath(args.cache_dir) if args.cache_dir else ""})
+    events = EventWriter(sys.stdout, args.progress_interval)
+    sys.stdout = sys.stderr  # backends print; stdout carries only the event stream
+
+    try:
+        config = load_watch_config(args.config)
+        if args.jobs: config["jobs"] = args.jobs
+        validate_watch_config(config)
+    except (OSError, ValueError) as e:
+        events.emit("error", id=None, error=f"{args.config}: {e}")
+        return 2
+
+    defaults = {"exe_dir": args.ai_tools_dir or None}
+    if args.scratch_dir: defaults["frame_store"] = {"scratch_dir": os.path.abspath(args.scratch_dir)}
+    watcher = WatchFolder(config, events, defaults=defaults, threads=args.threads, force_polling=args.poll)
+
+    def on_signal(signum, frame):
+        if not watcher.token.cancelled: events.emit("cancelling", id=None, signal=signum)
+        watcher.stop()
+    signal.signal(signal.SIGINT, on_signal)
+    if hasattr(signal, "SIGTERM"): signal.signal(signal.SIGTERM, on_signal)
+
+    watcher.run(once=args.once)
+    return 130 if watcher.token.cancelled else 0
+
+if __name__ == "__main__":
+    sys.exit(main())